@@ -1,32 +1,20 @@
 # atualizar_bug.py (Versão Final com Menu para Funcionalidade)
 
-import os
+import sys
 import requests
-import json
-from dotenv import load_dotenv
+from pathlib import Path
 
-# Carrega as variáveis do arquivo .env para o ambiente
-load_dotenv()
-
-# --- Carregando credenciais de forma segura ---
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-
-# --- Verificação inicial ---
-if not all([JIRA_URL, JIRA_USER_EMAIL, JIRA_API_TOKEN]):
-    print("❌ ERRO: Verifique se as variáveis JIRA_URL, JIRA_USER_EMAIL e JIRA_API_TOKEN estão no arquivo .env.")
-    exit()
+# --- Configuração Padrão (credenciais e sessão vêm do cliente compartilhado) ---
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comum import jira_cliente
 
 def get_issue_details(issue_key):
     """Busca os detalhes atuais de uma issue no Jira."""
     print(f"🔎 Buscando detalhes do bug '{issue_key}'...")
-    api_url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}?fields=summary,status,labels,description"
-    headers = {"Accept": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
+    params = {'fields': 'summary,status,labels,description'}
     
     try:
-        response = requests.get(api_url, headers=headers, auth=auth)
+        response = jira_cliente.get(f"/rest/api/3/issue/{issue_key}", params=params)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -44,13 +32,10 @@ def update_issue_fields(issue_key, fields_to_update):
         return True
 
     print(f"\n🚀 Atualizando campos do bug '{issue_key}'...")
-    api_url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}"
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
     payload = {"fields": fields_to_update}
 
     try:
-        response = requests.put(api_url, headers=headers, auth=auth, data=json.dumps(payload))
+        response = jira_cliente.put(f"/rest/api/3/issue/{issue_key}", json=payload)
         response.raise_for_status()
         print("✅ Campos atualizados com sucesso!")
         return True
@@ -66,14 +51,11 @@ def add_comment(issue_key):
         print("Comentário não pode ser vazio.")
         return
 
-    api_url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}/comment"
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
     payload = {
         "body": {"type": "doc", "version": 1, "content": [{"type": "paragraph", "content": [{"type": "text", "text": comentario}]}]}
     }
     try:
-        response = requests.post(api_url, headers=headers, auth=auth, data=json.dumps(payload))
+        response = jira_cliente.post(f"/rest/api/3/issue/{issue_key}/comment", json=payload)
         response.raise_for_status()
         print("✅ Comentário adicionado com sucesso!")
     except requests.exceptions.RequestException as e:
@@ -81,10 +63,9 @@ def add_comment(issue_key):
 
 def change_status(issue_key):
     """Busca e permite a mudança de status (transição) de uma issue."""
-    api_url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}/transitions"
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
+    api_url = f"/rest/api/3/issue/{issue_key}/transitions"
     try:
-        response = requests.get(api_url, headers={"Accept": "application/json"}, auth=auth)
+        response = jira_cliente.get(api_url)
         response.raise_for_status()
         transitions = response.json().get('transitions', [])
         
@@ -104,7 +85,7 @@ def change_status(issue_key):
         transition_id = transitions[int(escolha)-1]['id']
         payload = {"transition": {"id": transition_id}}
         
-        response_exec = requests.post(api_url, headers={"Content-Type": "application/json"}, auth=auth, data=json.dumps(payload))
+        response_exec = jira_cliente.post(api_url, json=payload)
         response_exec.raise_for_status()
         print(f"✅ Status do bug alterado com sucesso!")
     except requests.exceptions.RequestException as e:
@@ -200,6 +181,7 @@ def main_menu(issue_key):
 
 
 if __name__ == "__main__":
+    jira_cliente.validar_configuracao(exigir_projeto=False)
     issue_id = input("➡️ Qual o ID do bug a ser atualizado? (ex: AC-123): ")
     if issue_id:
         main_menu(issue_id)
@@ -1,14 +1,13 @@
 # excluir_bug.py
 
-import os
+import sys
 import requests
-from dotenv import load_dotenv
+from pathlib import Path
 
-# Carrega as variáveis de ambiente
-load_dotenv()
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
+# --- Configuração Padrão (credenciais e sessão vêm do cliente compartilhado) ---
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comum import jira_cliente
+from comum.jira_assincrono import ErroJiraAsync
 
 def excluir_bug(issue_key):
     """
@@ -23,11 +22,8 @@ def excluir_bug(issue_key):
         print("🛑 Exclusão cancelada.")
         return
 
-    api_url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}"
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-
     try:
-        response = requests.delete(api_url, auth=auth)
+        response = jira_cliente.delete(f"/rest/api/3/issue/{issue_key}")
         response.raise_for_status() # Lança erro se status for 4xx ou 5xx
         print(f"✅ Bug {issue_key} excluído permanentemente.")
 
@@ -36,6 +32,18 @@ def excluir_bug(issue_key):
         print(f"   Verifique se o ID '{issue_key}' está correto e se você tem permissão para excluir.")
         print(f"   Resposta: {e.response.text}")
 
+async def excluir_bug_async(cliente, issue_key):
+    """
+    Versão assíncrona (e sem confirmação) de excluir_bug, para automações que já
+    confirmaram a exclusão. Retorna True se o bug foi excluído.
+    """
+    try:
+        await cliente.excluir(issue_key)
+        return True
+    except ErroJiraAsync as e:
+        print(f"❌ ERRO ao excluir o bug {issue_key}: {e}")
+        return False
+
 if __name__ == "__main__":
     issue_id = input("➡️ Qual o ID do bug a ser EXCLUÍDO? (ex: AC-123): ")
     
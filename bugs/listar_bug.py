@@ -1,15 +1,13 @@
 # listar_bugs.py (Versão 2 - Lógica Aprimorada pelo Usuário)
 
-import os
+import sys
 import requests
-from dotenv import load_dotenv
+from pathlib import Path
 
-# Carrega as variáveis de ambiente
-load_dotenv()
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
+# --- Configuração Padrão (credenciais e sessão vêm do cliente compartilhado) ---
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comum import jira_cliente
+from comum.jira_cliente import JIRA_PROJECT_KEY
 
 def listar_todos_os_bugs():
     """
@@ -21,13 +19,10 @@ def listar_todos_os_bugs():
     # Ordena pelos mais recentes primeiro
     jql_query = f'project = "{JIRA_PROJECT_KEY}" AND issuetype = Bug ORDER BY created DESC'
     
-    api_url = f"{JIRA_URL}/rest/api/3/search"
-    headers = {"Accept": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
     params = {'jql': jql_query, 'maxResults': 25} # Aumentei o limite para 25
 
     try:
-        response = requests.get(api_url, headers=headers, auth=auth, params=params)
+        response = jira_cliente.get("/rest/api/3/search", params=params)
         response.raise_for_status()
         
         issues = response.json().get('issues', [])
@@ -42,7 +37,7 @@ def listar_todos_os_bugs():
             issue_summary = issue['fields']['summary']
             # O status é um objeto, então pegamos o 'name' de dentro dele
             issue_status = issue['fields']['status']['name']
-            issue_url = f"{JIRA_URL}/browse/{issue_key}"
+            issue_url = jira_cliente.link_issue(issue_key)
             
             # Formatação para alinhar as colunas
             print(f"🔑 ID: {issue_key:<10} |  Status: {issue_status:<15} | Título: {issue_summary}")
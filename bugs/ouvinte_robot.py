@@ -0,0 +1,41 @@
+# ouvinte_robot.py - Listener do Robot Framework que reporta os testes que falharam, em lote
+#
+# Uso:
+#   robot --listener bugs/ouvinte_robot.py testes_robot/
+#
+# Cada teste reprovado é enfileirado (sem bloquear a suíte) e os bugs são criados em lote
+# em segundo plano e ao final da execução. A funcionalidade vem da tag 'funcionalidade:<nome>'
+# e a gravidade da tag 'gravidade-<nível>' do teste (padrão: ROBOT_GRAVIDADE_PADRAO).
+
+import os
+import sys
+from pathlib import Path
+
+# --- Configuração Padrão ---
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import reportar_bug
+
+ROBOT_LISTENER_API_VERSION = 3
+GRAVIDADE_PADRAO = os.getenv("ROBOT_GRAVIDADE_PADRAO", "gravidade-medio")
+
+def _tag(tags, prefixo):
+    return next((str(tag) for tag in tags if str(tag).lower().startswith(prefixo)), None)
+
+def end_test(data, result):
+    """Enfileira um bug para cada teste reprovado."""
+    if result.status != 'FAIL':
+        return
+    funcionalidade = _tag(result.tags, 'funcionalidade:')
+    passos = [str(item.name) for item in data.body if getattr(item, 'name', None)]
+    reportar_bug.enfileirar_bug(
+        resumo=f"[Automação] Falha em '{data.name}'",
+        passos="; ".join(passos) or str(data.name),
+        esperado="O teste automatizado deve passar.",
+        atual=result.message,
+        gravidade=_tag(result.tags, 'gravidade-') or GRAVIDADE_PADRAO,
+        funcionalidade=funcionalidade.split(':', 1)[1] if funcionalidade else str(data.parent.name),
+    )
+
+def close():
+    """Ao fim da execução, envia o que restou na fila."""
+    reportar_bug.descarregar_bugs()
@@ -1,31 +1,61 @@
 # reportar_bug.py (Versão 5 - Integração com Funcionalidade e Robot Framework)
 
 import os
+import sys
+import atexit
 import requests
-import json
-from dotenv import load_dotenv
+from pathlib import Path
 
-# Carrega as variáveis do arquivo .env para o ambiente
-load_dotenv()
+# --- Configuração Padrão (credenciais e sessão vêm do cliente compartilhado) ---
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comum import jira_cliente, idempotencia, fila_bugs, indice_duplicatas, adf
+from comum.transicoes import comentario_adf
+from comum.jira_assincrono import ErroJiraAsync
+from comum.jira_cliente import JIRA_PROJECT_KEY
 
-# --- Carregando credenciais de forma segura ---
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
+# Consulta o índice local de bugs abertos antes de criar um novo (0 = desativado)
+DETECTAR_DUPLICATAS = os.getenv("BUGS_DETECTAR_DUPLICATAS", "1") != "0"
 
-# --- Verificação inicial ---
-if not all([JIRA_URL, JIRA_USER_EMAIL, JIRA_API_TOKEN, JIRA_PROJECT_KEY]):
-    print("ERRO: Verifique se JIRA_URL, JIRA_USER_EMAIL, JIRA_API_TOKEN e JIRA_PROJECT_KEY estão no .env")
-    # A verificação da GEMINI_API_KEY foi removida daqui pois não é usada neste script.
-    # Se for usar, adicione-a de volta.
+def _procurar_no_indice(resumo, descricao):
+    if not DETECTAR_DUPLICATAS:
+        return None
+    try:
+        return indice_duplicatas.indice_padrao().procurar(resumo, descricao)
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Não foi possível atualizar o índice de duplicatas: {e}")
+        return None
 
-def reportar_bug(resumo, passos, esperado, atual, gravidade, funcionalidade=None):
+def procurar_duplicata(resumo, atual):
     """
-    Cria um card de bug no Jira com base nos parâmetros fornecidos.
-    Esta função é projetada para ser importada e usada por outros scripts (ex: Robot Framework).
-    Retorna a chave do bug (ex: 'AC-124') em caso de sucesso, ou None em caso de falha.
+    Procura no índice local um bug aberto com o mesmo resumo/resultado atual.
+    Retorna (chave, resumo, similaridade) ou None. Falhas ao atualizar o índice não impedem o reporte.
     """
+    return _procurar_no_indice(resumo, f"*Resultado Atual:*\n{atual}")
+
+def _duplicata_do_payload(payload):
+    """Chave do bug aberto parecido com o do payload, ou None (roda na thread do RelatorEmLote)."""
+    fields = payload['fields']
+    duplicata = _procurar_no_indice(fields.get('summary', ''), adf.para_texto(fields.get('description')))
+    return duplicata[0] if duplicata else None
+
+def _indexar_criado(issue_key, payload):
+    if DETECTAR_DUPLICATAS:
+        fields = payload['fields']
+        indice_duplicatas.registrar_criado(issue_key, fields.get('summary', ''), adf.para_texto(fields.get('description')))
+
+def registrar_ocorrencia(issue_key, passos, atual):
+    """Comenta no bug existente a nova ocorrência da falha. Retorna True em caso de sucesso."""
+    texto = f"Nova ocorrência reportada.\nPassos: {passos}\nResultado Atual: {atual}"
+    try:
+        response = jira_cliente.post(f"/rest/api/3/issue/{issue_key}/comment", json={"body": comentario_adf(texto)})
+        response.raise_for_status()
+        return True
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Falha ao comentar a nova ocorrência em {issue_key}: {e}")
+        return False
+
+def montar_payload_bug(resumo, passos, esperado, atual, gravidade, funcionalidade=None):
+    """Monta o payload de criação do bug (compartilhado pelas versões síncrona e assíncrona)."""
     # Formata a descrição
     passos_formatados = "\n".join([f"{i+1}. {passo.strip()}" for i, passo in enumerate(passos.split(';'))])
     descricao_texto = f"""
@@ -49,13 +79,7 @@ def reportar_bug(resumo, passos, esperado, atual, gravidade, funcionalidade=None
         label_func = f"funcionalidade:{funcionalidade.lower().replace(' ', '_')}"
         labels.append(label_func)
     
-    print(f"\n🚀 Reportando bug para a funcionalidade '{funcionalidade}' com a etiqueta '{labels}'...")
-    
-    api_url = f"{JIRA_URL}/rest/api/3/issue"
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-    
-    payload = {
+    return {
         "fields": {
             "project": {"key": JIRA_PROJECT_KEY},
             "summary": resumo,
@@ -68,28 +92,99 @@ def reportar_bug(resumo, passos, esperado, atual, gravidade, funcionalidade=None
             "labels": labels
         }
     }
+
+def reportar_bug(resumo, passos, esperado, atual, gravidade, funcionalidade=None):
+    """
+    Cria um card de bug no Jira com base nos parâmetros fornecidos.
+    Esta função é projetada para ser importada e usada por outros scripts (ex: Robot Framework).
+    Retorna a chave do bug (ex: 'AC-124') em caso de sucesso, ou None em caso de falha.
+    """
+    jira_cliente.validar_configuracao(encerrar=False)
+    duplicata = procurar_duplicata(resumo, atual)
+    if duplicata:
+        issue_key, resumo_existente, similaridade = duplicata
+        print(f"\n🔁 Bug parecido já aberto: {issue_key} - '{resumo_existente}' (similaridade {similaridade:.0%}).")
+        if registrar_ocorrencia(issue_key, passos, atual):
+            print(f"   ✅ Nova ocorrência registrada como comentário em {jira_cliente.link_issue(issue_key)}")
+            return issue_key
+
+    payload = montar_payload_bug(resumo, passos, esperado, atual, gravidade, funcionalidade)
+    labels = payload['fields']['labels']
+    print(f"\n🚀 Reportando bug para a funcionalidade '{funcionalidade}' com a etiqueta '{labels}'...")
     
     try:
-        response = requests.post(api_url, headers=headers, auth=auth, data=json.dumps(payload))
-        response.raise_for_status()
-        
-        issue_data = response.json()
-        issue_key = issue_data['key']
-        issue_url = f"{JIRA_URL}/browse/{issue_key}"
-        
-        print("\n" + "="*50)
-        print("🎉 SUCESSO! Bug criado.")
-        print(f"   ID do Bug: {issue_key}")
-        print(f"   URL: {issue_url}")
-        print("="*50)
-        return issue_key
-
+        # Reenvia em falhas de rede/5xx sem duplicar o bug (etiqueta de idempotência)
+        issue_key = idempotencia.criar_issue(payload)
     except requests.exceptions.RequestException as e:
         print(f"\n❌ ERRO: Falha ao criar o bug no Jira.")
-        print(f"   Status Code: {e.response.status_code if e.response else 'N/A'}")
-        print(f"   Resposta: {e.response.text if e.response else str(e)}")
+        print(f"   Status Code: {e.response.status_code if e.response is not None else 'N/A'}")
+        print(f"   Resposta: {e.response.text if e.response is not None else str(e)}")
         return None
 
+    print("\n" + "="*50)
+    print("🎉 SUCESSO! Bug criado.")
+    print(f"   ID do Bug: {issue_key}")
+    print(f"   URL: {jira_cliente.link_issue(issue_key)}")
+    print("="*50)
+    # Só em memória (sem atualizar o índice pelo Jira): o bug já existe, então isto não altera o retorno
+    _indexar_criado(issue_key, payload)
+    return issue_key
+
+async def reportar_bug_async(cliente, resumo, passos, esperado, atual, gravidade, funcionalidade=None):
+    """
+    Versão assíncrona de reportar_bug, para disparar vários reportes em paralelo
+    com um ClienteJiraAsync (comum/jira_assincrono.py).
+    Retorna a chave do bug em caso de sucesso, ou None em caso de falha.
+    """
+    payload = montar_payload_bug(resumo, passos, esperado, atual, gravidade, funcionalidade)
+    try:
+        issue_key = await idempotencia.criar_issue_async(cliente, payload)
+        print(f"🎉 Bug criado: {issue_key} - {resumo}")
+        return issue_key
+    except ErroJiraAsync as e:
+        print(f"❌ ERRO: Falha ao criar o bug '{resumo}' no Jira: {e}")
+        return None
+
+# --- Reporte em Lote (Robot Framework) ---
+# Durante a suíte, use 'Enfileirar Bug' (não bloqueia o teste) e, no Suite Teardown,
+# 'Descarregar Bugs'; ou registre bugs/ouvinte_robot.py como listener (--listener).
+_relator = None
+
+def _relator_padrao():
+    global _relator
+    if _relator is None:
+        # A busca por duplicatas roda na thread de envio, nunca na de quem enfileira
+        _relator = fila_bugs.RelatorEmLote(procurar_existente=_duplicata_do_payload, ao_criar=_indexar_criado)
+        atexit.register(_relator.encerrar)
+    return _relator
+
+def enfileirar_bug(resumo, passos, esperado, atual, gravidade, funcionalidade=None):
+    """
+    Versão não bloqueante de reportar_bug: coloca o bug na fila e retorna na hora.
+    Os bugs são criados em lote em segundo plano; falhas idênticas (mesmo resumo,
+    resultado atual e funcionalidade) viram um único bug com a contagem de ocorrências, e
+    falhas parecidas com um bug já aberto (consultado também em segundo plano) viram um
+    comentário nele.
+    """
+    # Como biblioteca do Robot, só avisa (uma vez) se faltar configuração, sem derrubar a suíte
+    jira_cliente.validar_configuracao(encerrar=False)
+    payload = montar_payload_bug(resumo, passos, esperado, atual, gravidade, funcionalidade)
+    _relator_padrao().enfileirar(fila_bugs.assinatura(resumo, atual, funcionalidade), payload)
+
+def descarregar_bugs():
+    """
+    Envia os bugs ainda na fila e registra as recorrências (ideal para o Suite Teardown).
+    Retorna {chave_do_bug: ocorrências}.
+    """
+    global _relator
+    if _relator is None:
+        return {}
+    relator, _relator = _relator, None
+    atexit.unregister(relator.encerrar)
+    resultado = relator.encerrar()
+    print(f"📦 Reporte em lote: {len(resultado['bugs'])} bugs reportados (novos ou já abertos), {len(resultado['falhas'])} com erro.")
+    return resultado['bugs']
+
 def obter_detalhes_pela_entrevista():
     """
     Conduz uma entrevista com o usuário para coletar os detalhes do bug para reporte manual.
@@ -131,6 +226,7 @@ def main_interativo():
     """
     Função principal para execução interativa via terminal.
     """
+    jira_cliente.validar_configuracao()
     detalhes = obter_detalhes_pela_entrevista()
     
     if detalhes:
@@ -1,101 +1,102 @@
-import os
-import pandas as pd
-from jira import JIRA
-from dotenv import load_dotenv
+import sys
+import requests
+from pathlib import Path
 
-# Carrega as variáveis de ambiente do arquivo .env
-load_dotenv()
-
-# --- Configurações da Conexão com o Jira ---
-JIRA_SERVER = os.getenv("JIRA_URL")
-JIRA_USERNAME = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
-
-# Verifica se as variáveis foram carregadas
-if not all([JIRA_SERVER, JIRA_USERNAME, JIRA_API_TOKEN, JIRA_PROJECT_KEY]):
-    print("Erro: Verifique se as variáveis JIRA_URL, JIRA_USER_EMAIL, JIRA_API_TOKEN, JIRA_PROJECT_KEY estão no arquivo .env.")
-    exit()
-
-# Conecta-se ao Jira
-try:
-    jira_client = JIRA(
-        server=JIRA_SERVER,
-        basic_auth=(JIRA_USERNAME, JIRA_API_TOKEN)
-    )
-    print(f"Conexão com o Jira ({JIRA_SERVER}) bem-sucedida!")
-except Exception as e:
-    print(f"Erro ao conectar com o Jira: {e}")
-    exit()
-
-# --- Definição da Busca (JQL) ---
-jql_query = f'project = "{JIRA_PROJECT_KEY}" AND issuetype = Bug ORDER BY created DESC'
-print(f"Buscando bugs com a query: {jql_query}")
-
-issues = jira_client.search_issues(jql_query, maxResults=False)
+# --- Configuração Padrão (credenciais e sessão vêm do cliente compartilhado) ---
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comum import campos, armazem, rotulos, jira_cliente
+from comum.planilha import PlanilhaEmFluxo, ESTILO_CABECALHO_PANDAS
+from comum.exportacao import ExportacaoParticionada
+from comum.jira_cliente import JIRA_URL, JIRA_PROJECT_KEY
 
 # --- Extração e Processamento dos Dados ---
-bugs_list = []
-for issue in issues:
-    labels = issue.fields.labels
+def extrair_dados_do_bug(issue):
+    """Converte uma issue da API em uma linha do relatório, classificando as etiquetas."""
+    fields = issue['fields']
+    classificacao = rotulos.classificar_rotulos(fields.get('labels', []))
     
-    criticidade_encontrada = 'Não definida'
-    endpoint_encontrado = 'Não definido'
-    outras_etiquetas = []
-
-    # Primeiro, classifica as etiquetas em listas separadas
-    etiquetas_criticidade = []
-    etiquetas_endpoint_explicito = []
-    etiquetas_candidatas = []
-
-    for label in labels:
-        if label.lower().startswith(('gravidade-', 'criticidade-')):
-            etiquetas_criticidade.append(label)
-        elif label.lower().startswith(('funcionalidade_', 'endpoint_')):
-            etiquetas_endpoint_explicito.append(label)
-        else:
-            etiquetas_candidatas.append(label)
+    # Criticidade: a primeira etiqueta 'gravidade-' (ou 'criticidade-') encontrada
+    gravidades = classificacao.get('gravidade', [])
+    criticidade_encontrada = gravidades[0].replace('_', ' ').capitalize() if gravidades else 'Não definida'
 
-    # Processa a criticidade (pega a primeira que encontrar)
-    if etiquetas_criticidade:
-        criticidade_encontrada = etiquetas_criticidade[0].split('-', 1)[1].replace('_', ' ').capitalize()
+    # Endpoint: prioriza o explícito ('endpoint' e depois 'funcionalidade', com ':' ou '_'),
+    # senão pega a primeira etiqueta fora da taxonomia
+    candidatas = list(classificacao.get(rotulos.SEM_CATEGORIA, []))
+    explicitos = [(categoria, valor) for categoria in ('endpoint', 'funcionalidade') for valor in classificacao.get(categoria, [])]
+    endpoint_encontrado = 'Não definido'
+    if explicitos:
+        endpoint_encontrado = explicitos[0][1]
+        explicitos = explicitos[1:]  # Se houver mais de um explícito, os demais vão para "outras"
+    elif candidatas:
+        endpoint_encontrado = candidatas.pop(0)
 
-    # Processa o endpoint: prioriza o explícito, senão pega o primeiro candidato
-    if etiquetas_endpoint_explicito:
-        endpoint_encontrado = etiquetas_endpoint_explicito[0].split('_', 1)[1]
-        outras_etiquetas.extend(etiquetas_candidatas) # O que sobrou vai para outras
-        outras_etiquetas.extend(etiquetas_endpoint_explicito[1:]) # Se houver mais de um explícito
-    elif etiquetas_candidatas:
-        # Pega o primeiro candidato como endpoint e o resto vai para "outras"
-        endpoint_encontrado = etiquetas_candidatas[0]
-        outras_etiquetas.extend(etiquetas_candidatas[1:])
+    # O que sobrou (inclusive risco e prioridade) vai para "outras", no formato canônico
+    outras_etiquetas = candidatas + [rotulos.rotulo_canonico(categoria, valor) for categoria, valor in explicitos]
+    outras_etiquetas += [rotulos.rotulo_canonico(categoria, valor)
+                         for categoria in ('risco', 'prioridade') for valor in classificacao.get(categoria, [])]
+    outras_etiquetas += [rotulos.rotulo_canonico('gravidade', valor) for valor in gravidades[1:]]
 
-    bugs_list.append({
-        'Chave': issue.key,
-        'Resumo': issue.fields.summary,
-        'Status': issue.fields.status.name,
+    return {
+        'Chave': issue['key'],
+        'Resumo': fields['summary'],
+        'Status': fields['status']['name'],
         'Criticidade': criticidade_encontrada,
         'Endpoint/Módulo': endpoint_encontrado,
         'Outras Etiquetas': ', '.join(outras_etiquetas),
-        'Responsável': issue.fields.assignee.displayName if issue.fields.assignee else 'Não atribuído',
-        'Relator': issue.fields.reporter.displayName,
-        'Criado em': issue.fields.created.split('T')[0],
-    })
+        'Responsável': fields['assignee']['displayName'] if fields.get('assignee') else 'Não atribuído',
+        'Relator': (fields.get('reporter') or {}).get('displayName', ''),
+        'Criado em': fields['created'].split('T')[0],
+    }
 
-if not bugs_list:
-    print("Nenhum bug encontrado com os critérios fornecidos.")
-else:
-    # --- Criação e Exportação para EXCEL ---
-    df_bugs = pd.DataFrame(bugs_list)
-    output_filename = 'relatorio_de_bugs.xlsx'
-    
-    colunas_ordenadas = [
-        'Chave', 'Resumo', 'Status', 'Criticidade', 'Endpoint/Módulo', 
-        'Responsável', 'Relator', 'Criado em', 'Outras Etiquetas'
-    ]
-    df_bugs = df_bugs[colunas_ordenadas]
+# --- Exportação para EXCEL ---
+output_filename = 'relatorio_de_bugs.xlsx'
+colunas_ordenadas = [
+    'Chave', 'Resumo', 'Status', 'Criticidade', 'Endpoint/Módulo', 
+    'Responsável', 'Relator', 'Criado em', 'Outras Etiquetas'
+]
+
+def exportar_bugs(cache=False):
+    """
+    Busca os bugs do projeto (ou os lê do armazém local, com cache=True) e os exporta para
+    o Excel e para as partições mensais de BI.
+    """
+    cache = armazem.cache_ativo(cache)
+    if not cache:
+        jira_cliente.validar_configuracao()
+
+    # --- Definição da Busca (JQL) ---
+    jql_query = f'project = "{JIRA_PROJECT_KEY}" AND issuetype = Bug ORDER BY created DESC'
+    print(f"Buscando bugs com a query: {jql_query}")
+
+    # Percorre todas as páginas da busca (ou o armazém local), escrevendo cada bug na planilha assim que chega
+    if cache:
+        origem = armazem.iterar_issues("Bug")
+    else:
+        origem = campos.buscar_projetado("exportar_bugs", jql_query)
+    planilha = PlanilhaEmFluxo(output_filename, 'Sheet1', colunas_ordenadas, estilo_cabecalho=ESTILO_CABECALHO_PANDAS)
+    # Cópia particionada por mês de criação (Parquet/CSV gzip) para os jobs de BI
+    particoes = ExportacaoParticionada("bugs", colunas_ordenadas)
+    try:
+        for issue in origem:
+            linha = extrair_dados_do_bug(issue)
+            planilha.escrever(linha)
+            particoes.escrever(linha, issue['fields'].get('created'))
+    except requests.exceptions.RequestException as e:
+        particoes.descartar()
+        print(f"Erro ao buscar bugs no Jira ({JIRA_URL}): {e}")
+        return
+
+    if not planilha.linhas:
+        print("Nenhum bug encontrado com os critérios fornecidos.")
+    else:
+        planilha.fechar()
+
+        print(f"\nRelatório de bugs exportado com sucesso!")
+        print(f"{planilha.linhas} bugs foram salvos no arquivo Excel '{output_filename}'")
 
-    df_bugs.to_excel(output_filename, index=False)
+    resumo = particoes.fechar()
+    print(f"Exportação particionada: {len(resumo['gravadas'])} mês(es) regravado(s), "
+          f"{resumo['inalteradas']} inalterado(s), {len(resumo['removidas'])} removido(s).")
 
-    print(f"\nRelatório de bugs exportado com sucesso!")
-    print(f"{len(bugs_list)} bugs foram salvos no arquivo Excel '{output_filename}'")
\ No newline at end of file
+if __name__ == "__main__":
+    exportar_bugs(cache="--cache" in sys.argv)
@@ -1,20 +1,14 @@
 # mapa_cobertura.py
 
-import os
+import sys
 import requests
-from dotenv import load_dotenv
 from pathlib import Path
-from collections import defaultdict
 
 # --- Configuração Padrão ---
 script_dir = Path(__file__).parent
-env_path = script_dir.parent / '.env'
-load_dotenv(dotenv_path=env_path)
-
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import campos, armazem, analise
+from comum.jira_cliente import JIRA_PROJECT_KEY
 
 # --- Lógica de Ordenação (quanto maior o número, mais importante) ---
 TEST_STATUS_ORDER = {
@@ -25,78 +19,55 @@ TEST_STATUS_ORDER = {
     "aprovado": 1
 }
 
-def buscar_casos_de_teste():
-    """Busca todos os Casos de Teste do projeto."""
+def buscar_casos_de_teste(cache=False):
+    """Busca todos os Casos de Teste do projeto, entregando-os página a página (gerador)."""
+    if armazem.cache_ativo(cache):
+        print("🗄️  Lendo os Casos de Teste do armazém local...")
+        return armazem.iterar_issues("Caso de Teste")
     print(f"🔎 Buscando todos os Casos de Teste no projeto '{JIRA_PROJECT_KEY}' para mapeamento...")
     jql_query = f'project = "{JIRA_PROJECT_KEY}" AND issuetype = "Caso de Teste" ORDER BY created DESC'
-    api_url = f"{JIRA_URL}/rest/api/3/search"
-    headers = {"Accept": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-    params = {'jql': jql_query, 'fields': 'summary,status,labels', 'maxResults': 1000}
+    return campos.buscar_projetado("mapa_cobertura", jql_query)
 
-    try:
-        response = requests.get(api_url, headers=headers, auth=auth, params=params)
-        response.raise_for_status()
-        return response.json().get('issues', [])
-    except requests.exceptions.RequestException as e:
-        print(f"\n❌ ERRO ao buscar dados do Jira: {e}")
-        return None
+def agrupar_testes(quadro):
+    """
+    Agrupa os casos de teste por endpoint ({endpoint: quadro}), cada grupo ordenado pelo score
+    de status (mais importante primeiro). Sem etiqueta de endpoint, o teste vai para "Sem Endpoint Definido".
+    """
+    quadro = quadro.assign(endpoint=analise.preencher(quadro["endpoint"], "Sem Endpoint Definido"),
+                           risco=analise.preencher(quadro["risco"], "N/D"))
+    # Ordena os testes uma única vez; cada grupo herda a ordem
+    ordenados = analise.ordenar(quadro, analise.mapear_status(quadro, TEST_STATUS_ORDER))
+    return dict(tuple(ordenados.groupby("endpoint", observed=True, sort=False)))
 
-def gerar_mapa_de_cobertura():
+def gerar_mapa_de_cobertura(cache=False):
     """
     Coleta e agrupa os casos de teste por endpoint, exibindo um relatório.
     """
-    casos_de_teste = buscar_casos_de_teste()
-
-    if casos_de_teste is None:
+    # Carrega os testes conforme as páginas chegam em um quadro colunar; as agregações são vetorizadas
+    try:
+        quadro = analise.carregar(buscar_casos_de_teste(cache))
+    except requests.exceptions.RequestException as e:
+        print(f"\n❌ ERRO ao buscar dados do Jira: {e}")
         return
 
-    # Usamos defaultdict para facilitar o agrupamento
-    endpoints = defaultdict(list)
-
-    # Processa e agrupa os testes
-    for teste in casos_de_teste:
-        fields = teste['fields']
-        labels = fields.get('labels', [])
-        
-        endpoint_label = next((l for l in labels if l.startswith('endpoint:')), None)
-        
-        # Se não encontrar a etiqueta de endpoint, agrupa em "Sem Endpoint Definido"
-        endpoint_name = endpoint_label.replace('endpoint:', '') if endpoint_label else "Sem Endpoint Definido"
-
-        risco_label = next((l.replace('risco-', '') for l in labels if l.startswith('risco-')), 'N/D')
-        
-        status_name = fields['status']['name']
-        status_score = TEST_STATUS_ORDER.get(status_name.lower(), 0)
-
-        endpoints[endpoint_name].append({
-            "id": teste['key'],
-            "titulo": fields['summary'],
-            "status": status_name,
-            "risco": risco_label.capitalize(),
-            "score": status_score
-        })
-
     print("\n\n" + "="*60)
     print("🗺️  MAPA DE COBERTURA DE TESTES POR ENDPOINT")
     print("="*60)
 
-    if not endpoints:
+    if quadro.empty:
         print("Nenhum caso de teste com etiqueta de endpoint encontrado.")
         return
-        
+
     # Imprime o relatório agrupado e ordenado
-    for endpoint, testes in sorted(endpoints.items()):
+    grupos = agrupar_testes(quadro)
+    for endpoint in sorted(grupos):
         print(f"\n➡️ Endpoint: {endpoint}")
         print("-"*50)
         
-        # Ordena os testes dentro do grupo pelo score de status (mais importante primeiro)
-        testes_ordenados = sorted(testes, key=lambda t: t['score'], reverse=True)
-        
-        for teste in testes_ordenados:
-            print(f"  - [{teste['status']:<11}] [Risco: {teste['risco']:<7}] {teste['id']}: {teste['titulo']}")
+        for teste in grupos[endpoint].itertuples(index=False):
+            print(f"  - [{teste.status:<11}] [Risco: {teste.risco.capitalize():<7}] {teste.chave}: {teste.resumo}")
             
     print("\n" + "="*60)
 
 if __name__ == "__main__":
-    gerar_mapa_de_cobertura()
\ No newline at end of file
+    gerar_mapa_de_cobertura(cache="--cache" in sys.argv)
\ No newline at end of file
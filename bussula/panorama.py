@@ -1,51 +1,80 @@
-# panorama.py (v2 - Com Priorização)
+# panorama.py (v3 - Snapshot Único com Priorização)
 
 import os
+import sys
 import requests
-from dotenv import load_dotenv
 from pathlib import Path
-from collections import Counter
 
 # --- Configuração Padrão ---
 script_dir = Path(__file__).parent
-env_path = script_dir.parent / '.env'
-load_dotenv(dotenv_path=env_path)
-
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import campos, armazem, analise
+from comum.jira_cliente import JIRA_PROJECT_KEY
 
 # --- Lógica de Priorização (podemos ajustar aqui) ---
-# Damos um "peso" para cada etiqueta, quanto maior, mais importante
-RISK_ORDER = {"risco-critico": 4, "risco-alto": 3, "risco-medio": 2, "risco-baixo": 1}
-PRIORITY_ORDER = {"prioridade-alta": 3, "prioridade-media": 2, "prioridade-baixa": 1}
+# Os pesos das etiquetas de risco e prioridade ficam em comum/rotulos.py (ORDEM); o score, em comum/analise.py
 # Status dos casos de teste que não significam "pronto"
 TEST_STATUS_ORDER = {"reprovado": 4, "bloqueado": 3, "em andamento": 2, "a fazer": 1}
 STATUS_CONCLUIDO = ["concluído", "feito", "done", "aprovado"]
-
-
-def buscar_issues_por_tipo(issue_type):
-    """Função genérica para buscar todas as issues de um determinado tipo no projeto."""
-    print(f"🔎 Buscando dados para '{issue_type}'...")
-    jql_query = f'project = "{JIRA_PROJECT_KEY}" AND issuetype = "{issue_type}"'
-    api_url = f"{JIRA_URL}/rest/api/3/search"
-    headers = {"Accept": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-    params = {'jql': jql_query, 'fields': '*all', 'maxResults': 1000}
-
+TIPOS_PANORAMA = ("Bug", "Caso de Teste")
+TOP_DESTAQUES = 5
+
+
+def buscar_snapshot(cache=False):
+    """
+    Busca Bugs e Casos de Teste em uma única consulta paginada e projetada (gerador).
+    O filtro de "não concluídos" não vai para o JQL porque o resumo geral também conta
+    os itens concluídos; assim, uma única passada atende as duas seções.
+    """
+    if armazem.cache_ativo(cache):
+        print("🗄️  Lendo Bugs e Casos de Teste do armazém local...")
+        return (issue for issue in armazem.iterar_issues()
+                if issue['fields'].get('issuetype', {}).get('name') in TIPOS_PANORAMA)
+    print(f"🔎 Buscando Bugs e Casos de Teste do projeto '{JIRA_PROJECT_KEY}'...")
+    tipos_jql = ", ".join(f'"{tipo}"' for tipo in TIPOS_PANORAMA)
+    jql_query = f'project = "{JIRA_PROJECT_KEY}" AND issuetype in ({tipos_jql}) ORDER BY created DESC'
+    return campos.buscar_projetado("panorama", jql_query)
+
+def resumir_tipo(quadro, tipo, score):
+    """
+    Total, contagem por status e os TOP_DESTAQUES itens abertos de maior score de um tipo.
+    Retorna (total, {status: quantidade}, quadro dos destaques); nos empates, o que chegou primeiro fica na frente.
+    """
+    mascara = quadro["tipo"] == tipo
+    do_tipo = quadro[mascara]
+    por_status = do_tipo.groupby("status", observed=True, sort=False).size()
+    abertos = mascara & ~analise.status_em(quadro, STATUS_CONCLUIDO)
+    destaques = analise.ordenar(quadro[abertos], score[abertos]).head(TOP_DESTAQUES)
+    return len(do_tipo), {status: int(total) for status, total in por_status.items()}, destaques
+
+def montar_panorama(issues):
+    """
+    Calcula o panorama a partir das issues (Bugs e Casos de Teste): total, contagem por status
+    e destaques abertos de cada tipo, em um dicionário serializável em JSON.
+    """
+    quadro = analise.carregar(issues)
+    quadro = quadro.assign(risco=analise.preencher(quadro["risco"], "N/D"),
+                           prioridade=analise.preencher(quadro["prioridade"], "N/D"))
+    total_bugs, status_bugs, bugs = resumir_tipo(quadro, "Bug", analise.score_criticidade(quadro))
+    total_testes, status_testes, testes = resumir_tipo(quadro, "Caso de Teste", analise.mapear_status(quadro, TEST_STATUS_ORDER))
+
+    destaques_bugs = [{"chave": bug.chave, "resumo": bug.resumo, "risco": bug.risco, "prioridade": bug.prioridade}
+                      for bug in bugs.itertuples(index=False)]
+    destaques_testes = [{"chave": teste.chave, "resumo": teste.resumo, "status": teste.status}
+                        for teste in testes.itertuples(index=False)]
+    return {
+        "bugs": {"total": total_bugs, "por_status": status_bugs, "destaques": destaques_bugs},
+        "casos_de_teste": {"total": total_testes, "por_status": status_testes, "destaques": destaques_testes},
+    }
+
+def gerar_panorama(cache=False):
+    """Coleta todos os dados em um único snapshot e imprime o relatório do panorama do projeto."""
     try:
-        response = requests.get(api_url, headers=headers, auth=auth, params=params)
-        response.raise_for_status()
-        return response.json().get('issues', [])
+        panorama = montar_panorama(buscar_snapshot(cache))
     except requests.exceptions.RequestException as e:
-        print(f"\n❌ ERRO ao buscar dados do Jira para '{issue_type}': {e}")
-        return None
-
-def gerar_panorama():
-    """Coleta todos os dados e imprime o relatório do panorama do projeto."""
-    bugs = buscar_issues_por_tipo("Bug")
-    casos_de_teste = buscar_issues_por_tipo("Caso de Teste")
+        print(f"\n❌ ERRO ao buscar dados do Jira: {e}")
+        return
+    bugs, casos_de_teste = panorama["bugs"], panorama["casos_de_teste"]
 
     print("\n\n" + "="*60)
     print(f"📊 PANORAMA DO PROJETO: App Cinema ({JIRA_PROJECT_KEY})")
@@ -53,75 +82,47 @@ def gerar_panorama():
     print("="*60)
 
     # --- Seção de Destaques de Bugs ---
-    if bugs:
-        # Filtra apenas bugs que não estão concluídos
-        bugs_abertos = [b for b in bugs if b['fields']['status']['name'].lower() not in STATUS_CONCLUIDO]
-        
-        # Calcula o "score" de criticidade de cada bug
-        def get_bug_score(bug):
-            labels = bug['fields']['labels']
-            risk_score = max([RISK_ORDER.get(l, 0) for l in labels] or [0])
-            priority_score = max([PRIORITY_ORDER.get(l, 0) for l in labels] or [0])
-            # Damos um peso maior para o Risco
-            return (risk_score * 10) + priority_score
-
-        bugs_abertos.sort(key=get_bug_score, reverse=True)
-
-        print("\n🔥 BUGS CRÍTICOS ABERTOS (TOP 5)")
+    if bugs["total"]:
+        print(f"\n🔥 BUGS CRÍTICOS ABERTOS (TOP {TOP_DESTAQUES})")
         print("-"*35)
-        if not bugs_abertos:
+        if not bugs["destaques"]:
             print("   Nenhum bug aberto. Bom trabalho!")
         else:
-            for bug in bugs_abertos[:5]:
-                labels = bug['fields']['labels']
-                risk = next((l.replace('risco-', '') for l in labels if l in RISK_ORDER), 'N/D')
-                priority = next((l.replace('prioridade-', '') for l in labels if l in PRIORITY_ORDER), 'N/D')
-                print(f"- [{bug['key']}] {bug['fields']['summary']}")
-                print(f"  (Risco: {risk.capitalize()} | Prioridade: {priority.capitalize()})")
+            for bug in bugs["destaques"]:
+                print(f"- [{bug['chave']}] {bug['resumo']}")
+                print(f"  (Risco: {bug['risco'].capitalize()} | Prioridade: {bug['prioridade'].capitalize()})")
 
     # --- Seção de Destaques de Testes ---
-    if casos_de_teste:
-        testes_pendentes = [t for t in casos_de_teste if t['fields']['status']['name'].lower() not in STATUS_CONCLUIDO]
-
-        def get_test_score(test):
-            status = test['fields']['status']['name'].lower()
-            return TEST_STATUS_ORDER.get(status, 0)
-        
-        testes_pendentes.sort(key=get_test_score, reverse=True)
-
+    if casos_de_teste["total"]:
         print("\n⚠️ CASOS DE TESTE QUE REQUEREM ATENÇÃO")
         print("-"*35)
-        if not testes_pendentes:
+        if not casos_de_teste["destaques"]:
             print("   Todos os testes foram aprovados!")
         else:
-            for teste in testes_pendentes[:5]:
-                print(f"- [{teste['key']}] {teste['fields']['summary']} (Status: {teste['fields']['status']['name']})")
+            for teste in casos_de_teste["destaques"]:
+                print(f"- [{teste['chave']}] {teste['resumo']} (Status: {teste['status']})")
 
 
     print("\n\n--- Resumo Geral ---")
     
     # --- Seção de Resumo de Bugs ---
-    if bugs is not None:
-        print("\n🐞 ANÁLISE GERAL DE BUGS")
-        print("-"*30)
-        print(f"- Total de Bugs: {len(bugs)}")
-        status_counts = Counter(bug['fields']['status']['name'] for bug in bugs)
-        print("- Bugs por Status:")
-        for status, count in status_counts.items():
-            print(f"  - {status}: {count}")
+    print("\n🐞 ANÁLISE GERAL DE BUGS")
+    print("-"*30)
+    print(f"- Total de Bugs: {bugs['total']}")
+    print("- Bugs por Status:")
+    for status, count in bugs["por_status"].items():
+        print(f"  - {status}: {count}")
 
     # --- Seção de Resumo de Casos de Teste ---
-    if casos_de_teste is not None:
-        print("\n✅ ANÁLISE GERAL DE CASOS DE TESTE")
-        print("-"*30)
-        print(f"- Total de Casos de Teste: {len(casos_de_teste)}")
-        status_counts_testes = Counter(teste['fields']['status']['name'] for teste in casos_de_teste)
-        print("- Testes por Status:")
-        for status, count in status_counts_testes.items():
-            print(f"  - {status}: {count}")
+    print("\n✅ ANÁLISE GERAL DE CASOS DE TESTE")
+    print("-"*30)
+    print(f"- Total de Casos de Teste: {casos_de_teste['total']}")
+    print("- Testes por Status:")
+    for status, count in casos_de_teste["por_status"].items():
+        print(f"  - {status}: {count}")
     
     print("\n" + "="*60)
 
 
 if __name__ == "__main__":
-    gerar_panorama()
\ No newline at end of file
+    gerar_panorama(cache="--cache" in sys.argv)
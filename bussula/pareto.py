@@ -1,87 +1,72 @@
 # pareto.py (v5 - Análise de Volume de Teste Corrigida)
 
-import os
+import sys
 import requests
-from dotenv import load_dotenv
 from pathlib import Path
-from collections import defaultdict
 
 # --- Configuração Padrão ---
 script_dir = Path(__file__).parent
-env_path = script_dir.parent / '.env'
-load_dotenv(dotenv_path=env_path)
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import campos, armazem, analise
+from comum.jira_cliente import JIRA_PROJECT_KEY
 
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
-
-def buscar_issues(jql, mensagem):
-    """Função genérica para buscar issues no Jira."""
+def buscar_issues(jql, mensagem, tipo=None, cache=False):
+    """
+    Função genérica para buscar issues no Jira (gerador que percorre todas as páginas).
+    Com o armazém local ativo, lê as issues do 'tipo' informado sem acessar o Jira.
+    """
     print(f"🔎 {mensagem}")
-    api_url = f"{JIRA_URL}/rest/api/3/search"
-    headers = {"Accept": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-    params = {'jql': jql, 'fields': 'labels', 'maxResults': 1000}
+    if tipo and armazem.cache_ativo(cache):
+        return armazem.iterar_issues(tipo)
+    return campos.buscar_projetado("pareto", jql)
+
+def tabela_pareto(quadro):
+    """Tabela de Pareto do quadro agrupado por endpoint ou, sem ele, por funcionalidade (mesma precedência do mapa de bugs)."""
+    return analise.pareto(quadro.assign(grupo=analise.preencher(quadro["grupo"], "Outros (Sem Contexto)")), "grupo")
 
+def realizar_analise_pareto(issues, titulo_analise, titulo_foco, titulo_outros):
+    """Função genérica que realiza e imprime a análise de Pareto."""
     try:
-        response = requests.get(api_url, headers=headers, auth=auth, params=params)
-        response.raise_for_status()
-        return response.json().get('issues', [])
+        quadro = analise.carregar(issues)
     except requests.exceptions.RequestException as e:
         print(f"\n❌ ERRO ao buscar dados do Jira: {e}")
-        if e.response: print(f"   Resposta do servidor: {e.response.text}")
-        return None
+        if e.response is not None: print(f"   Resposta do servidor: {e.response.text}")
+        return
+    total_itens = len(quadro)
 
-def realizar_analise_pareto(issues, titulo_analise, titulo_foco, titulo_outros):
-    """Função genérica que realiza e imprime a análise de Pareto."""
-    if not issues:
+    if not total_itens:
         print("\nNenhum item foi encontrado para analisar.")
         return
 
-    total_itens = len(issues)
-    agrupador = defaultdict(int)
-
-    for item in issues:
-        labels = item['fields'].get('labels', [])
-        chave_grupo = "Outros (Sem Contexto)"
-        label_encontrada = next((l for l in labels if l.startswith('funcionalidade:') or l.startswith('endpoint:')), None)
-        if label_encontrada:
-            chave_grupo = label_encontrada.replace('funcionalidade:', '').replace('endpoint:', '')
-        agrupador[chave_grupo] += 1
+    tabela = tabela_pareto(quadro)
+    focos, outros = tabela[tabela["foco"]], tabela[~tabela["foco"]]
+    percentual_focos = focos["percentual"].sum()
 
     print("\n\n" + "="*60)
     print(f"📊 {titulo_analise}")
     print("="*60)
     print(f"Base de análise: {total_itens} itens encontrados no total.\n")
-    grupos_ordenados = sorted(agrupador.items(), key=lambda item: item[1], reverse=True)
-    percentual_acumulado = 0
-    focos_identificados = False
 
     print(f"🔥 {titulo_foco}")
     print("-"*60)
-    for chave, contagem in grupos_ordenados:
-        percentual_individual = (contagem / total_itens) * 100
-        if percentual_acumulado < 80 and not focos_identificados:
-            percentual_acumulado += percentual_individual
-        else:
-            if not focos_identificados:
-                print("-"*60)
-                print(f"🎯 As áreas acima representam {percentual_acumulado:.1f}% de todos os itens.")
-                print(f"\nⓘ {titulo_outros}")
-                print("-"*60)
-                focos_identificados = True
-        print(f"- {chave.upper():<35} | Contagem: {contagem:<3} ({percentual_individual:.1f}%)")
-    if not focos_identificados and percentual_acumulado > 0:
+    imprimir_grupos(focos)
+    print("-"*60)
+    print(f"🎯 As áreas acima representam {percentual_focos:.1f}% de todos os itens.")
+    if len(outros):
+        print(f"\nⓘ {titulo_outros}")
         print("-"*60)
-        print(f"🎯 As áreas acima representam {percentual_acumulado:.1f}% de todos os itens.")
+        imprimir_grupos(outros)
     print("\n" + "="*60)
 
-def analisar_bugs():
+def imprimir_grupos(tabela):
+    for chave, linha in zip(tabela.index, tabela.itertuples(index=False)):
+        print(f"- {str(chave).upper():<35} | Contagem: {linha.contagem:<3} ({linha.percentual:.1f}%)")
+
+def analisar_bugs(cache=False):
     """Prepara e executa a análise de Pareto para o VOLUME de Bugs."""
     jql = f'project = "{JIRA_PROJECT_KEY}" AND issuetype = Bug'
     mensagem = f"Analisando todos os Bugs no projeto '{JIRA_PROJECT_KEY}'..."
-    bugs = buscar_issues(jql, mensagem)
+    bugs = buscar_issues(jql, mensagem, tipo="Bug", cache=cache)
     realizar_analise_pareto(
         bugs,
         "ANÁLISE DE PARETO POR VOLUME DE BUGS",
@@ -89,14 +74,14 @@ def analisar_bugs():
         "Outras áreas com bugs"
     )
 
-def analisar_cobertura_de_testes():
+def analisar_cobertura_de_testes(cache=False):
     """
     Prepara e executa a análise de Pareto para o VOLUME de Casos de Teste.
     """
     # JQL SIMPLES: Busca todos os casos de teste, exatamente como o mapa_cobertura.py
     jql = f'project = "{JIRA_PROJECT_KEY}" AND issuetype = "Caso de Teste"'
     mensagem = f"Analisando todos os Casos de Teste do projeto '{JIRA_PROJECT_KEY}'..."
-    todos_os_testes = buscar_issues(jql, mensagem)
+    todos_os_testes = buscar_issues(jql, mensagem, tipo="Caso de Teste", cache=cache)
 
     # Executa a análise de Pareto com a lista COMPLETA de testes, sem filtrar por status.
     realizar_analise_pareto(
@@ -106,8 +91,8 @@ def analisar_cobertura_de_testes():
         "Outras áreas com cobertura de testes"
     )
 
-def menu_principal():
-    """Exibe o menu principal para o usuário escolher a análise."""
+def menu_principal(cache=False):
+    """Exibe o menu principal para o usuário escolher a análise (cache=True: lê do armazém local)."""
     while True:
         print("\n--- Análise de Pareto (Princípio 80/20) ---")
         print("Qual análise você deseja realizar?")
@@ -118,9 +103,9 @@ def menu_principal():
         escolha = input("➡️ Escolha uma opção: ")
 
         if escolha == '1':
-            analisar_bugs()
+            analisar_bugs(cache)
         elif escolha == '2':
-            analisar_cobertura_de_testes()
+            analisar_cobertura_de_testes(cache)
         elif escolha == '0':
             print("👋 Saindo.")
             break
@@ -128,4 +113,4 @@ def menu_principal():
             print("❌ Opção inválida. Tente novamente.")
 
 if __name__ == "__main__":
-    menu_principal()
\ No newline at end of file
+    menu_principal(cache="--cache" in sys.argv)
\ No newline at end of file
@@ -0,0 +1,278 @@
+# servico.py - Serviço HTTP local da Bússola: relatórios em JSON a partir de um snapshot sempre aquecido
+#
+# Uso:
+#   python bussula/servico.py               # ou: python jira_qa.py servico
+#   curl http://127.0.0.1:8787/panorama
+#
+# O serviço mantém o armazém local (SQLite) sincronizado de forma incremental em segundo plano.
+# A cada sincronização que traz mudanças, monta um novo snapshot com todos os relatórios já
+# calculados e serializados e o troca de uma só vez: as requisições, concorrentes ou não, leem
+# sempre um snapshot completo e consistente, sem acessar o Jira nem recalcular nada.
+
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+import requests
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+from pathlib import Path
+
+# --- Configuração Padrão ---
+script_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(script_dir.parent))
+sys.path.insert(0, str(script_dir))
+from comum import armazem, analise
+from comum.jira_cliente import JIRA_PROJECT_KEY
+import panorama
+import pareto
+import mapa_bugs
+import mapa_cobertura
+import exportar_bugs
+import exportar_testes_excel
+
+# --- Configuração do Serviço ---
+HOST = os.getenv("BUSSOLA_SERVICO_HOST", "127.0.0.1")
+PORTA = int(os.getenv("BUSSOLA_SERVICO_PORTA", 8787))
+INTERVALO = float(os.getenv("BUSSOLA_SERVICO_INTERVALO", 300))  # segundos entre sincronizações
+
+# --- Relatórios em JSON ---
+
+def _registros(tabela, colunas):
+    """Linhas de um DataFrame como dicionários com tipos nativos (prontos para o json)."""
+    return [dict(zip(colunas, linha)) for linha in tabela[list(colunas)].astype(object).itertuples(index=False)]
+
+def _pareto(quadro):
+    tabela = pareto.tabela_pareto(quadro)
+    grupos = [{"grupo": str(grupo), "contagem": int(linha.contagem), "percentual": round(float(linha.percentual), 2),
+               "acumulado": round(float(linha.acumulado), 2), "foco": bool(linha.foco)}
+              for grupo, linha in zip(tabela.index, tabela.itertuples(index=False))]
+    return {
+        "total_itens": len(quadro),
+        "percentual_focos": round(float(tabela.loc[tabela["foco"], "percentual"].sum()), 2) if len(tabela) else 0,
+        "grupos": grupos,
+    }
+
+def _mapa_bugs(quadro):
+    if quadro.empty:
+        return {"grupos": []}
+    resumo, bugs_por_grupo = mapa_bugs.agrupar_bugs(quadro)
+    return {"grupos": [
+        {"grupo": str(grupo), "total": int(linha.total), "abertos": int(linha.abertos),
+         "bugs": _registros(bugs_por_grupo[grupo], ("chave", "resumo", "status", "concluido"))}
+        for grupo, linha in zip(resumo.index, resumo.itertuples(index=False))
+    ]}
+
+def _mapa_cobertura(quadro):
+    if quadro.empty:
+        return {"endpoints": []}
+    grupos = mapa_cobertura.agrupar_testes(quadro)
+    return {"endpoints": [
+        {"endpoint": str(endpoint), "testes": _registros(grupos[endpoint], ("chave", "resumo", "status", "risco"))}
+        for endpoint in sorted(grupos)
+    ]}
+
+def montar_relatorios(bugs, casos_de_teste):
+    """Calcula todos os relatórios a partir das listas de issues. Retorna {rota: objeto JSON}."""
+    quadro_bugs = analise.carregar(bugs)
+    quadro_testes = analise.carregar(casos_de_teste)
+    return {
+        "/panorama": panorama.montar_panorama(bugs + casos_de_teste),
+        "/pareto/bugs": _pareto(quadro_bugs),
+        "/pareto/casos_de_teste": _pareto(quadro_testes),
+        "/mapa_bugs": _mapa_bugs(quadro_bugs),
+        "/mapa_cobertura": _mapa_cobertura(quadro_testes),
+        "/exportacoes/bugs": {"colunas": exportar_bugs.colunas_ordenadas,
+                              "linhas": [exportar_bugs.extrair_dados_do_bug(issue) for issue in bugs]},
+        "/exportacoes/casos_de_teste": {"colunas": exportar_testes_excel.COLUNAS_PARTICIONADAS,
+                                        "linhas": [exportar_testes_excel.linha_do_caso_de_teste(issue) for issue in casos_de_teste]},
+    }
+
+class Snapshot:
+    """
+    Relatórios de um mesmo estado do armazém, já serializados em JSON. Imutável depois de
+    criado: as threads do servidor só leem bytes prontos, então dispensam trava.
+    """
+
+    def __init__(self, versao):
+        self.versao = versao
+        self.gerado_em = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        bugs, casos_de_teste = [], []
+        for issue in armazem.iterar_issues():
+            tipo = issue['fields'].get('issuetype', {}).get('name')
+            if tipo == "Bug":
+                bugs.append(issue)
+            elif tipo == "Caso de Teste":
+                casos_de_teste.append(issue)
+        self.quantidades = {"bugs": len(bugs), "casos_de_teste": len(casos_de_teste)}
+        self.respostas = {
+            rota: json.dumps({"projeto": JIRA_PROJECT_KEY, "versao": versao, "gerado_em": self.gerado_em, **dados},
+                             ensure_ascii=False).encode('utf-8')
+            for rota, dados in montar_relatorios(bugs, casos_de_teste).items()
+        }
+        # ETag pelo conteúdo já serializado: a versão recomeça em 1 a cada reinício e não identifica os dados
+        self.etags = {rota: f'"{hashlib.blake2b(corpo, digest_size=16).hexdigest()}"' for rota, corpo in self.respostas.items()}
+
+class ServicoBussola:
+    """Mantém o snapshot atual e o renova (sincronização incremental) em segundo plano."""
+
+    def __init__(self, intervalo=INTERVALO):
+        self.intervalo = intervalo
+        self.snapshot = None
+        self.ultima_sincronizacao = None
+        self.ultimo_erro = None
+        self._versao = 0
+        self._refazer_snapshot = True  # continua ligado se o cálculo falhar depois de uma sincronização com mudanças
+        self._trava_atualizacao = threading.Lock()
+        self._parar = threading.Event()
+
+    def atualizar(self, completo=False):
+        """
+        Sincroniza o armazém e, se algo mudou (ou ainda não há snapshot), troca o snapshot.
+        Uma atualização por vez; se a sincronização ou o cálculo falhar, o snapshot anterior
+        continua sendo servido e o erro fica em 'ultimo_erro' (ver /saude).
+        Retorna o resultado da sincronização (ou None em caso de erro).
+        """
+        with self._trava_atualizacao:
+            try:
+                resultado = armazem.sincronizar(completo=completo)
+                self.ultima_sincronizacao = time.time()
+                self.ultimo_erro = None
+            except requests.exceptions.RequestException as e:
+                self.ultimo_erro = str(e)
+                print(f"❌ ERRO ao sincronizar com o Jira (servindo o último snapshot): {e}")
+                resultado = None
+            if resultado and (resultado['gravadas'] or resultado['removidas']):
+                self._refazer_snapshot = True
+            if self._refazer_snapshot:
+                inicio = time.perf_counter()
+                snapshot = Snapshot(self._versao + 1)
+                self._versao, self.snapshot = snapshot.versao, snapshot
+                self._refazer_snapshot = False
+                print(f"🔄 Snapshot v{self._versao}: {self.snapshot.quantidades['bugs']} bugs e "
+                      f"{self.snapshot.quantidades['casos_de_teste']} casos de teste "
+                      f"({time.perf_counter() - inicio:.1f}s para calcular os relatórios).")
+            return resultado
+
+    def registrar_erro(self, erro):
+        """Guarda (para o /saude) um erro inesperado da atualização: armazém, cálculo dos relatórios..."""
+        self.ultimo_erro = f"{type(erro).__name__}: {erro}"
+        print(f"❌ ERRO inesperado ao atualizar o snapshot (servindo o último snapshot): {self.ultimo_erro}")
+
+    def _laco(self):
+        # Nenhum erro pode encerrar a thread: o serviço ficaria servindo um snapshot congelado
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.atualizar()
+            except Exception as e:
+                self.registrar_erro(e)
+
+    def iniciar(self):
+        """Monta o primeiro snapshot e inicia a sincronização periódica."""
+        self.atualizar()
+        threading.Thread(target=self._laco, name="sincronizacao-bussola", daemon=True).start()
+
+    def parar(self):
+        self._parar.set()
+
+    def saude(self):
+        snapshot = self.snapshot
+        return {
+            "projeto": JIRA_PROJECT_KEY,
+            "versao": snapshot.versao if snapshot else None,
+            "gerado_em": snapshot.gerado_em if snapshot else None,
+            "issues": snapshot.quantidades if snapshot else {},
+            "ultima_sincronizacao": (datetime.fromtimestamp(self.ultima_sincronizacao, timezone.utc).isoformat(timespec='seconds')
+                                     if self.ultima_sincronizacao else None),
+            "ultimo_erro": self.ultimo_erro,
+            "rotas": sorted(snapshot.respostas) if snapshot else [],
+        }
+
+# --- Servidor HTTP ---
+
+class ManipuladorBussola(BaseHTTPRequestHandler):
+    """Rotas: GET /saude, GET /<relatório> (ver Snapshot.respostas) e POST /atualizar."""
+    servico = None
+    protocol_version = "HTTP/1.1"  # keep-alive para dashboards que consultam com frequência
+
+    def _responder(self, status, corpo, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(corpo)
+
+    def _json(self, status, dados):
+        self._responder(status, json.dumps(dados, ensure_ascii=False).encode('utf-8'))
+
+    def do_GET(self):
+        rota = urlparse(self.path).path.rstrip('/') or '/'
+        if rota in ("/", "/saude"):
+            self._json(200, self.servico.saude())
+            return
+        snapshot = self.servico.snapshot  # uma única leitura: a resposta inteira vem do mesmo snapshot
+        if snapshot is None:
+            self._json(503, {"erro": "Snapshot ainda não disponível. Tente novamente em instantes."})
+            return
+        corpo = snapshot.respostas.get(rota)
+        if corpo is None:
+            self._json(404, {"erro": f"Rota desconhecida: {rota}", "rotas": sorted(snapshot.respostas)})
+            return
+        etag = snapshot.etags[rota]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._responder(200, corpo, etag)
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        # Descarta um eventual corpo para não corromper a próxima requisição da conexão (keep-alive)
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        rota = urlparse(self.path).path.rstrip('/')
+        if rota != "/atualizar":
+            self._json(404, {"erro": f"Rota desconhecida: {rota}"})
+            return
+        try:
+            resultado = self.servico.atualizar()
+        except Exception as e:
+            self.servico.registrar_erro(e)
+            self._json(500, {"erro": self.servico.ultimo_erro, **self.servico.saude()})
+            return
+        if resultado is None:
+            self._json(502, {"erro": self.servico.ultimo_erro, **self.servico.saude()})
+            return
+        self._json(200, {**resultado, **self.servico.saude()})
+
+    def log_message(self, formato, *args):
+        pass  # dashboards consultam com frequência; os eventos relevantes são as sincronizações
+
+def main():
+    """Inicia o serviço e atende até Ctrl+C."""
+    servico = ServicoBussola()
+    print(f"🗄️  Preparando o snapshot do projeto '{JIRA_PROJECT_KEY}' (armazém: {armazem.CAMINHO_BANCO})...")
+    servico.iniciar()
+    ManipuladorBussola.servico = servico
+    servidor = ThreadingHTTPServer((HOST, PORTA), ManipuladorBussola)
+    servidor.daemon_threads = True
+    print(f"🚀 Serviço da Bússola em http://{HOST}:{PORTA} (sincroniza a cada {INTERVALO:.0f}s). Ctrl+C para sair.")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Encerrando o serviço.")
+    finally:
+        servico.parar()
+        servidor.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# sincronizar.py - Atualiza o armazém local (SQLite) usado pelos relatórios da Bússola
+
+import sys
+import requests
+from datetime import datetime
+from pathlib import Path
+
+# --- Configuração Padrão ---
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import armazem
+from comum.jira_cliente import JIRA_PROJECT_KEY
+
+def main():
+    """Executa a sincronização incremental (ou completa, com --completo)."""
+    completo = "--completo" in sys.argv
+    ultima = armazem.ultima_sincronizacao()
+    if ultima and not completo:
+        print(f"🔄 Sincronizando '{JIRA_PROJECT_KEY}' desde {datetime.fromtimestamp(ultima):%d/%m/%Y %H:%M}...")
+    else:
+        print(f"🔄 Sincronização completa do projeto '{JIRA_PROJECT_KEY}'...")
+
+    try:
+        resultado = armazem.sincronizar(completo=completo)
+    except requests.exceptions.RequestException as e:
+        print(f"\n❌ ERRO ao sincronizar com o Jira: {e}")
+        return
+
+    print(f"✅ {resultado['gravadas']} issues atualizadas e {resultado['removidas']} removidas.")
+    print(f"   Armazém local: {armazem.CAMINHO_BANCO}")
+    print("   Use BUSSOLA_FONTE=cache (ou --cache) para gerar os relatórios a partir dele.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# comum - Módulos compartilhados pelos scripts de bugs, testes e Bússola.
@@ -0,0 +1,302 @@
+# adf.py - Conversão de ADF (Atlassian Document Format) para texto simples ou Markdown, com cache
+
+import os
+import marshal
+import hashlib
+import threading
+from collections import OrderedDict
+
+# --- Configuração ---
+TAMANHO_CACHE = int(os.getenv("ADF_CACHE_TAMANHO", 4096))  # descrições convertidas mantidas em memória
+
+# Nós que ficam dentro de uma linha; os demais são blocos
+NOS_EM_LINHA = {"text", "hardBreak", "mention", "emoji", "inlineCard", "date", "status", "placeholder", "mediaInline"}
+BLOCOS_DE_TEXTO = {"paragraph", "heading", "codeBlock"}
+MARCAS_MARKDOWN = {"strong": "**", "em": "_", "strike": "~~", "code": "`"}
+
+# --- Conversão ---
+
+def _indentar(texto, prefixo):
+    """Aplica o prefixo na primeira linha e alinha as seguintes (itens de lista com várias linhas)."""
+    recuo = " " * len(prefixo)
+    linhas = texto.split("\n")
+    return "\n".join([prefixo + linhas[0]] + [recuo + linha if linha else linha for linha in linhas[1:]])
+
+def _texto_com_marcas(no, markdown):
+    texto = no.get("text", "")
+    if not markdown or not texto:
+        return texto
+    marcas = no.get("marks")
+    if not marcas:
+        return texto
+    # Espaços nas pontas ficam fora dos símbolos: "**Passos: **" não é negrito em Markdown
+    miolo = texto.strip()
+    if not miolo:
+        return texto
+    antes, depois = texto[:len(texto) - len(texto.lstrip())], texto[len(texto.rstrip()):]
+    href = None
+    for marca in marcas:
+        tipo = marca.get("type")
+        if tipo in MARCAS_MARKDOWN:
+            simbolo = MARCAS_MARKDOWN[tipo]
+            miolo = f"{simbolo}{miolo}{simbolo}"
+        elif tipo == "link":
+            href = (marca.get("attrs") or {}).get("href")
+    if href:
+        miolo = f"[{miolo}]({href})"
+    return f"{antes}{miolo}{depois}"
+
+def _em_linha(no, markdown):
+    """Texto de um nó em linha (sem filhos)."""
+    tipo, attrs = no.get("type"), no.get("attrs") or {}
+    if tipo == "text":
+        return _texto_com_marcas(no, markdown)
+    if tipo == "hardBreak":
+        return "\n"
+    if tipo in ("mention", "emoji", "status", "placeholder"):
+        return attrs.get("text") or attrs.get("shortName") or ""
+    if tipo == "inlineCard":
+        return attrs.get("url", "")
+    if tipo == "date":
+        return str(attrs.get("timestamp", ""))
+    return ""
+
+def _renderizar(no, partes, markdown, separador):
+    """Monta o texto de um nó a partir do texto já convertido dos seus filhos ('partes')."""
+    tipo, attrs = no.get("type"), no.get("attrs") or {}
+
+    if tipo in BLOCOS_DE_TEXTO:
+        texto = "".join(partes)
+        if tipo == "heading" and markdown:
+            return f"{'#' * int(attrs.get('level', 1))} {texto}"
+        if tipo == "codeBlock" and markdown:
+            return f"```{attrs.get('language') or ''}\n{texto}\n```"
+        return texto
+    if tipo in ("bulletList", "orderedList", "taskList"):
+        inicio = int(attrs.get("order", 1))
+        itens = []
+        for posicao, item in enumerate(partes):
+            if tipo == "orderedList":
+                prefixo = f"{inicio + posicao}. "
+            elif tipo == "taskList":
+                prefixo = ""  # o taskItem já traz a caixa de seleção
+            else:
+                prefixo = "- "
+            itens.append(_indentar(item, prefixo) if prefixo else item)
+        return "\n".join(itens)
+    if tipo == "listItem":
+        return "\n".join(parte for parte in partes if parte)
+    if tipo == "taskItem":
+        caixa = "[x] " if attrs.get("state") == "DONE" else "[ ] "
+        return _indentar("".join(partes), caixa)
+    if tipo in ("tableCell", "tableHeader"):
+        return " ".join(parte.replace("\n", " ") for parte in partes if parte)
+    if tipo == "tableRow":
+        return f"| {' | '.join(partes)} |" if markdown else " | ".join(partes)
+    if tipo == "table":
+        if markdown and partes:
+            colunas = partes[0].count(" | ") + 1
+            return "\n".join([partes[0], "|" + " --- |" * colunas, *partes[1:]])
+        return "\n".join(partes)
+    if tipo == "blockquote" and markdown:
+        return "\n".join(f"> {linha}" if linha else ">" for linha in separador.join(p for p in partes if p).split("\n"))
+    if tipo == "rule":
+        return "---" if markdown else ""
+    if tipo == "expand" and attrs.get("title"):
+        partes = [attrs["title"], *partes]
+    # doc, panel, expand, layout...: blocos separados por 'separador'. No modo texto os parágrafos
+    # vazios são mantidos (viram uma linha a mais), como faziam os leitores antigos de cada script
+    if markdown:
+        return separador.join(parte for parte in partes if parte)
+    return separador.join(partes)
+
+def _texto_rapido(adf, separador="\n"):
+    """
+    Atalho do modo texto para documentos só com parágrafos de texto puro (o formato gravado pelos
+    scripts deste projeto): mesmo resultado de converter(), sem pilha nem hash. None se não se aplica.
+    """
+    paragrafos = []
+    for bloco in adf.get("content") or ():
+        if bloco.get("type") != "paragraph":
+            return None
+        itens = bloco.get("content") or ()
+        if len(itens) == 1 and itens[0].get("type") == "text" and not itens[0].get("marks"):
+            paragrafos.append(itens[0].get("text", ""))
+        elif all(item.get("type") == "text" for item in itens):
+            paragrafos.append("".join(item.get("text", "") for item in itens))
+        else:
+            return None
+    return separador.join(paragrafos).strip()
+
+def converter(adf, markdown=False, separador="\n"):
+    """
+    Converte um documento ADF em texto (markdown=False) ou Markdown, sem recursão: uma pilha
+    explícita percorre a árvore e, ao fechar cada nó, o texto dos filhos é juntado uma única vez
+    (sem concatenações repetidas). Cobre parágrafos, títulos, listas aninhadas, blocos de código,
+    tabelas, citações, quebras de linha e marcas (negrito, itálico, código, tachado, link).
+    No modo texto, 'separador' vai entre os blocos; o Markdown sempre usa uma linha em branco.
+    """
+    if not adf:
+        return ""
+    if markdown:
+        separador = "\n\n"
+    else:
+        texto = _texto_rapido(adf, separador)
+        if texto is not None:
+            return texto
+    pilha = [adf]
+    valores = []  # texto já convertido; ao fechar um nó, os últimos N são os dos seus filhos
+    while pilha:
+        no = pilha.pop()
+        if type(no) is tuple:  # fechamento: (nó, quantidade de filhos)
+            no, quantidade = no
+            partes = valores[-quantidade:]
+            del valores[-quantidade:]
+            valores.append(_renderizar(no, partes, markdown, separador))
+            continue
+        filhos = no.get("content")
+        if filhos:
+            pilha.append((no, len(filhos)))
+            pilha.extend(reversed(filhos))
+        elif no.get("type") == "text" and not markdown:
+            valores.append(no.get("text", ""))
+        elif no.get("type") in NOS_EM_LINHA:
+            valores.append(_em_linha(no, markdown))
+        else:
+            valores.append(_renderizar(no, [], markdown, separador))
+    return valores[0].strip() if valores else ""
+
+# --- Cache ---
+
+class _CacheLRU:
+    """Cache LRU (thread-safe) das conversões, indexado pelo hash do conteúdo do documento."""
+
+    def __init__(self, tamanho):
+        self._tamanho = tamanho
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave):
+        with self._trava:
+            valor = self._itens.get(chave)
+            if valor is None:
+                self.faltas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, chave, valor):
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            if len(self._itens) > self._tamanho:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+            self.acertos = self.faltas = 0
+
+_cache = _CacheLRU(TAMANHO_CACHE)
+
+def _chave(adf, markdown, separador):
+    # marshal serializa dicts/listas/strings em C, bem mais rápido que json.dumps (só vale neste processo)
+    return hashlib.blake2b(marshal.dumps(adf), digest_size=16).digest(), markdown, separador
+
+def _converter_com_cache(adf, markdown, separador="\n"):
+    if not adf:
+        return ""
+    if not markdown:
+        # Documentos simples convertem mais rápido do que o hash do cache seria calculado
+        texto = _texto_rapido(adf, separador)
+        if texto is not None:
+            return texto
+    if TAMANHO_CACHE <= 0:
+        return converter(adf, markdown, separador)
+    try:
+        chave = _chave(adf, markdown, separador)
+    except ValueError:  # aninhamento profundo demais para o marshal: converte sem cache
+        return converter(adf, markdown, separador)
+    texto = _cache.obter(chave)
+    if texto is None:
+        texto = converter(adf, markdown, separador)
+        _cache.guardar(chave, texto)
+    return texto
+
+def para_texto(adf, separador="\n"):
+    """
+    Texto simples de um documento ADF, com 'separador' entre os blocos (quebra de linha, ou
+    "\n\n" para uma linha em branco entre os parágrafos). Usa o cache.
+    """
+    return _converter_com_cache(adf, False, separador)
+
+def para_markdown(adf):
+    """Markdown de um documento ADF (blocos separados por linha em branco). Usa o cache."""
+    return _converter_com_cache(adf, True)
+
+def estatisticas_cache():
+    return {"acertos": _cache.acertos, "faltas": _cache.faltas}
+
+# --- Micro-benchmark ---
+
+def _documento_exemplo(numero):
+    """Descrição típica de um Caso de Teste/Bug: parágrafos, lista aninhada, código e tabela."""
+    texto = lambda t, *marcas: {"type": "text", "text": t, **({"marks": [{"type": m} for m in marcas]} if marcas else {})}
+    paragrafo = lambda *itens: {"type": "paragraph", "content": list(itens)}
+    return {"type": "doc", "version": 1, "content": [
+        paragrafo(texto("Pré-condições: ", "strong"), texto(f"usuário {numero} autenticado na aplicação.")),
+        {"type": "orderedList", "attrs": {"order": 1}, "content": [
+            {"type": "listItem", "content": [paragrafo(texto(f"Acessar a tela {numero % 7}")),
+                {"type": "bulletList", "content": [
+                    {"type": "listItem", "content": [paragrafo(texto("Preencher e-mail"), {"type": "hardBreak"}, texto("e senha", "em"))]},
+                    {"type": "listItem", "content": [paragrafo(texto("Clicar em "), texto("Entrar", "code"))]}]}]},
+            {"type": "listItem", "content": [paragrafo(texto("Validar o redirecionamento " * 5))]}]},
+        {"type": "codeBlock", "attrs": {"language": "json"}, "content": [texto('{"status": 200, "token": "..."}')]},
+        {"type": "table", "content": [
+            {"type": "tableRow", "content": [{"type": "tableHeader", "content": [paragrafo(texto(c))]} for c in ("Campo", "Valor")]},
+            {"type": "tableRow", "content": [{"type": "tableCell", "content": [paragrafo(texto(c))]} for c in ("email", f"u{numero}@ex.com")]}]},
+        paragrafo(texto("Resultado esperado: ", "strong"), texto("HTTP 200 e token JWT no corpo da resposta. " * 3)),
+    ]}
+
+def _versao_antiga(adf):
+    """Conversão anterior (só parágrafos do primeiro nível, com +=), para comparação."""
+    texto = ""
+    for bloco in adf.get("content", []):
+        if bloco.get("type") == "paragraph":
+            for item in bloco.get("content", []):
+                if item.get("type") == "text":
+                    texto += item.get("text", "")
+            texto += "\n"
+    return texto.strip()
+
+def _documento_simples(numero):
+    """Descrição no formato gravado pelos scripts deste projeto: um único parágrafo de texto."""
+    texto = f"*Passos:*\n1. Acessar a tela {numero % 7}\n2. Enviar o formulário\n\n*Resultado Esperado:*\nHTTP 200"
+    return {"type": "doc", "version": 1, "content": [{"type": "paragraph", "content": [{"type": "text", "text": texto}]}]}
+
+def benchmark(quantidade=20000, distintos=2000):
+    """Mede a conversão de 'quantidade' descrições, das quais 'distintos' são diferentes entre si."""
+    import time
+
+    def medir(nome, funcao, documentos):
+        inicio = time.perf_counter()
+        for documento in documentos:
+            funcao(documento)
+        decorrido = time.perf_counter() - inicio
+        print(f"  {nome:<38} {decorrido:7.3f}s  ({decorrido / quantidade * 1e6:6.1f} µs/descrição)")
+
+    cenarios = (("listas aninhadas, código e tabela", _documento_exemplo), ("um parágrafo (formato deste projeto)", _documento_simples))
+    for descricao, gerar in cenarios:
+        documentos = [gerar(i % distintos) for i in range(quantidade)]
+        print(f"⏱️  {quantidade} descrições ({distintos} distintas), ADF com {descricao}:")
+        medir("anterior (só parágrafos, +=)", _versao_antiga, documentos)
+        medir("converter (sem cache)", converter, documentos)
+        _cache.limpar()
+        medir("para_texto (cache LRU por hash)", para_texto, documentos)
+        print(f"  cache: {estatisticas_cache()}\n")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,112 @@
+# analise.py - Motor de agregação colunar (pandas) das análises da Bússola
+
+from functools import lru_cache
+import pandas as pd
+from comum import rotulos
+
+# --- Configuração ---
+LIMITE_PARETO = 80  # percentual acumulado que define as áreas de foco
+
+def _categorica(valores):
+    """Coluna categórica com as categorias na ordem em que aparecem (empates mantêm a ordem de chegada)."""
+    return pd.Categorical(valores, categories=pd.unique(pd.Series([v for v in valores if v is not None], dtype=object)))
+
+def _unificar_grafias(valores):
+    """Valores que só diferem em maiúsculas/minúsculas passam a usar a primeira grafia encontrada (um único grupo)."""
+    grafias = {}
+    return [grafias.setdefault(rotulos.chave_grupo(valor), valor) for valor in valores]
+
+_COLUNAS_ROTULOS = ("grupo", "endpoint", "risco", "prioridade", "nivel_risco", "nivel_prioridade")
+
+@lru_cache(maxsize=8192)
+def _colunas_dos_rotulos(labels):
+    """Valores das colunas derivadas das etiquetas; as combinações se repetem muito entre issues."""
+    classificacao = rotulos.classificar_rotulos(labels)
+    return (
+        rotulos.primeiro(classificacao, 'endpoint', 'funcionalidade'),
+        rotulos.primeiro(classificacao, 'endpoint'),
+        rotulos.primeiro(classificacao, 'risco'),
+        rotulos.primeiro(classificacao, 'prioridade'),
+        rotulos.nivel(classificacao, 'risco'),
+        rotulos.nivel(classificacao, 'prioridade'),
+    )
+
+def carregar(issues):
+    """
+    Carrega as issues em um DataFrame colunar: uma única passada extrai as colunas (etiquetas já
+    classificadas pela taxonomia de comum/rotulos.py) e o resto das análises é vetorizado.
+    Colunas: chave, resumo, status, tipo, grupo (endpoint ou, sem ele, funcionalidade),
+    endpoint, risco, prioridade (primeiro valor) e nivel_risco, nivel_prioridade (pesos de rotulos.ORDEM).
+    """
+    chaves, resumos, status, tipos, derivadas = [], [], [], [], []
+    for issue in issues:
+        fields = issue.get('fields', {})
+        chaves.append(issue.get('key'))
+        resumos.append(fields.get('summary'))
+        status.append((fields.get('status') or {}).get('name'))
+        tipos.append((fields.get('issuetype') or {}).get('name'))
+        derivadas.append(_colunas_dos_rotulos(tuple(fields.get('labels') or ())))
+    colunas = dict(zip(_COLUNAS_ROTULOS, map(list, zip(*derivadas)))) if derivadas else {nome: [] for nome in _COLUNAS_ROTULOS}
+    colunas.update(chave=chaves, resumo=resumos, status=status, tipo=tipos)
+    for nome in ("grupo", "endpoint"):
+        colunas[nome] = _unificar_grafias(colunas[nome])
+
+    quadro = pd.DataFrame({
+        "chave": pd.Series(colunas["chave"], dtype=object),
+        "resumo": pd.Series(colunas["resumo"], dtype=object),
+        "nivel_risco": pd.Series(colunas["nivel_risco"], dtype="int8"),
+        "nivel_prioridade": pd.Series(colunas["nivel_prioridade"], dtype="int8"),
+    })
+    for nome in ("status", "tipo", "grupo", "endpoint", "risco", "prioridade"):
+        quadro[nome] = _categorica(colunas[nome])
+    return quadro
+
+def preencher(coluna, padrao):
+    """Troca os valores ausentes de uma coluna categórica por 'padrao' (ex: "Sem Endpoint Definido")."""
+    if padrao not in coluna.cat.categories:
+        coluna = coluna.cat.add_categories([padrao])
+    return coluna.fillna(padrao)
+
+def status_em(quadro, nomes):
+    """Máscara das issues cujo status (sem diferenciar maiúsculas) está em 'nomes'. Compara só as categorias."""
+    nomes = {nome.lower() for nome in nomes}
+    categorias = [c for c in quadro["status"].cat.categories if c.lower() in nomes]
+    return quadro["status"].isin(categorias)
+
+def mapear_status(quadro, pesos, padrao=0):
+    """Peso de cada issue segundo o status (ex: TEST_STATUS_ORDER), calculado uma vez por categoria."""
+    por_categoria = {c: pesos.get(c.lower(), padrao) for c in quadro["status"].cat.categories}
+    return quadro["status"].map(por_categoria).astype("float").fillna(padrao).astype("int64")
+
+def score_criticidade(quadro):
+    """Score de criticidade a partir das etiquetas: o risco pesa mais que a prioridade."""
+    return quadro["nivel_risco"].astype("int64") * 10 + quadro["nivel_prioridade"]
+
+def ordenar(quadro, score):
+    """Ordena pelo score (maior primeiro), mantendo a ordem de chegada nos empates."""
+    return quadro.assign(score=score).sort_values("score", ascending=False, kind="stable")
+
+def concentracao(quadro, coluna, abertos):
+    """
+    Total e abertos por valor da 'coluna', do grupo com mais issues para o com menos.
+    'abertos' é uma máscara booleana (ex: ~status_em(quadro, STATUS_CONCLUIDO)).
+    """
+    tabela = pd.DataFrame({"grupo": quadro[coluna], "aberto": abertos.astype("int64")})
+    resumo = tabela.groupby("grupo", observed=True, sort=True)["aberto"].agg(total="size", abertos="sum")
+    return resumo.sort_values("total", ascending=False, kind="stable")
+
+def pareto(quadro, coluna, limite=LIMITE_PARETO):
+    """
+    Análise de Pareto da 'coluna': contagem, percentual e percentual acumulado por grupo, do maior
+    para o menor. 'foco' marca os grupos que entram antes de o acumulado atingir o limite.
+    """
+    contagem = quadro.groupby(coluna, observed=True, sort=True).size()
+    contagem = contagem.sort_values(ascending=False, kind="stable")
+    percentual = contagem / len(quadro) * 100
+    acumulado = percentual.cumsum()
+    return pd.DataFrame({
+        "contagem": contagem,
+        "percentual": percentual,
+        "acumulado": acumulado,
+        "foco": (acumulado - percentual) < limite,
+    })
@@ -0,0 +1,153 @@
+# armazem.py - Armazenamento local (SQLite) das issues do projeto, com sincronização incremental
+
+import os
+import json
+import math
+import time
+import sqlite3
+from comum import busca, campos, jira_cliente
+from comum.jira_cliente import JIRA_PROJECT_KEY, raiz_projeto
+
+# --- Configuração do Armazém ---
+CAMINHO_BANCO = os.getenv("BUSSOLA_CACHE_DB", str(raiz_projeto / '.cache' / 'bussola.sqlite3'))
+TIPOS_SINCRONIZADOS = ("Bug", "Caso de Teste")
+# Campos que cobrem todos os relatórios e exportadores da Bússola (mais os usados pelo próprio armazém)
+CAMPOS_SINCRONIZADOS, EXPAND_SINCRONIZADO = campos.planejar(
+    *campos.CAMPOS_POR_RELATORIO, extras=("issuetype", "updated")
+)
+# Folga (em minutos) somada à janela incremental para cobrir relógios dessincronizados
+MARGEM_MINUTOS = 5
+LOTE_GRAVACAO = 500
+
+def cache_ativo(cache=False):
+    """
+    Indica se os relatórios devem ler do armazém local: 'cache' vem da linha de comando
+    (--cache, lido por cada script da Bússola) e BUSSOLA_FONTE=cache liga para todos.
+    """
+    return cache or os.getenv("BUSSOLA_FONTE", "").lower() == "cache"
+
+def conectar(caminho=None):
+    """Abre o banco local, criando o arquivo e as tabelas na primeira vez."""
+    caminho = caminho or CAMINHO_BANCO
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript("""
+        CREATE TABLE IF NOT EXISTS issues (
+            chave TEXT PRIMARY KEY,
+            tipo TEXT NOT NULL,
+            criado TEXT,
+            atualizado TEXT,
+            dados TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_issues_tipo ON issues (tipo, criado);
+        CREATE TABLE IF NOT EXISTS metadados (
+            chave TEXT PRIMARY KEY,
+            valor TEXT
+        );
+    """)
+    return conexao
+
+def _ler_metadado(conexao, chave):
+    linha = conexao.execute("SELECT valor FROM metadados WHERE chave = ?", (chave,)).fetchone()
+    return linha[0] if linha else None
+
+def _gravar_metadado(conexao, chave, valor):
+    conexao.execute("INSERT OR REPLACE INTO metadados (chave, valor) VALUES (?, ?)", (chave, str(valor)))
+
+def _jql_base(tipos):
+    tipos_jql = ", ".join(f'"{t}"' for t in tipos)
+    return f'project = "{JIRA_PROJECT_KEY}" AND issuetype in ({tipos_jql})'
+
+def _gravar_issues(conexao, issues):
+    """Grava (upsert) as issues em lotes e retorna a quantidade gravada."""
+    total = 0
+    lote = []
+    for issue in issues:
+        fields = issue.get('fields', {})
+        lote.append((
+            issue['key'],
+            (fields.get('issuetype') or {}).get('name', ''),
+            fields.get('created'),
+            fields.get('updated'),
+            json.dumps(fields, ensure_ascii=False),
+        ))
+        if len(lote) >= LOTE_GRAVACAO:
+            conexao.executemany("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?)", lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        conexao.executemany("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?)", lote)
+        total += len(lote)
+    return total
+
+def _remover_excluidas(conexao, jql, tipos):
+    """
+    Remove do armazém as issues dos 'tipos' sincronizados que não existem mais no Jira.
+    Só percorre as chaves remotas quando o total remoto (filtrado pelos tipos) difere do
+    total local dos mesmos tipos; linhas de outros tipos não entram na conta nem são removidas.
+    """
+    response = jira_cliente.get(busca.ENDPOINT_BUSCA, params={'jql': jql, 'maxResults': 0})
+    response.raise_for_status()
+    total_remoto = response.json().get('total')
+    marcadores = ", ".join("?" for _ in tipos)
+    total_local = conexao.execute(f"SELECT COUNT(*) FROM issues WHERE tipo IN ({marcadores})", tuple(tipos)).fetchone()[0]
+    if total_remoto is not None and total_remoto == total_local:
+        return 0
+
+    chaves_remotas = {issue['key'] for issue in busca.iterar_issues_paralelo(jql, fields='issuetype')}
+    chaves_locais = {linha[0] for linha in conexao.execute(f"SELECT chave FROM issues WHERE tipo IN ({marcadores})", tuple(tipos))}
+    excluidas = chaves_locais - chaves_remotas
+    conexao.executemany("DELETE FROM issues WHERE chave = ?", [(chave,) for chave in excluidas])
+    return len(excluidas)
+
+def sincronizar(completo=False, tipos=TIPOS_SINCRONIZADOS, caminho=None):
+    """
+    Atualiza o armazém local. Na primeira vez (ou com completo=True) baixa tudo;
+    depois busca apenas as issues com 'updated' desde a última sincronização.
+    Retorna um dicionário com as contagens de gravadas e removidas.
+    """
+    conexao = conectar(caminho)
+    try:
+        jql = _jql_base(tipos)
+        inicio = time.time()
+        ultima = _ler_metadado(conexao, 'ultima_sincronizacao')
+
+        jql_busca = jql
+        if ultima and not completo:
+            # JQL relativa ("-Nm") evita depender do fuso horário configurado no perfil do Jira
+            minutos = math.ceil((inicio - float(ultima)) / 60) + MARGEM_MINUTOS
+            jql_busca = f'{jql} AND updated >= "-{minutos}m"'
+
+        issues = busca.iterar_issues_paralelo(jql_busca, fields=CAMPOS_SINCRONIZADOS, expand=EXPAND_SINCRONIZADO)
+        with conexao:
+            gravadas = _gravar_issues(conexao, issues)
+            removidas = _remover_excluidas(conexao, jql, tipos)
+            _gravar_metadado(conexao, 'ultima_sincronizacao', inicio)
+        return {"gravadas": gravadas, "removidas": removidas}
+    finally:
+        conexao.close()
+
+def iterar_issues(tipo=None, caminho=None):
+    """
+    Gera as issues do armazém no mesmo formato da API ({'key': ..., 'fields': {...}}),
+    das mais recentes para as mais antigas. Filtra pelo tipo quando informado.
+    """
+    conexao = conectar(caminho)
+    try:
+        if tipo:
+            cursor = conexao.execute("SELECT chave, dados FROM issues WHERE tipo = ? ORDER BY criado DESC", (tipo,))
+        else:
+            cursor = conexao.execute("SELECT chave, dados FROM issues ORDER BY criado DESC")
+        for chave, dados in cursor:
+            yield {'key': chave, 'fields': json.loads(dados)}
+    finally:
+        conexao.close()
+
+def ultima_sincronizacao(caminho=None):
+    """Retorna o timestamp (epoch) da última sincronização, ou None se nunca sincronizou."""
+    conexao = conectar(caminho)
+    try:
+        valor = _ler_metadado(conexao, 'ultima_sincronizacao')
+        return float(valor) if valor else None
+    finally:
+        conexao.close()
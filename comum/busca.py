@@ -0,0 +1,354 @@
+# busca.py - Busca paginada (streaming) de issues no Jira
+
+import os
+import re
+import queue
+import threading
+import requests
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError, SSLError
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from comum import jira_cliente
+from comum.concorrencia import em_ordem, colocar_ate_cancelar
+
+# --- Configuração da Busca ---
+# "/rest/api/3/search" pagina por startAt/total; "/rest/api/3/search/jql" pagina por nextPageToken.
+# O iterador entende os dois formatos de resposta.
+ENDPOINT_BUSCA = os.getenv("JIRA_ENDPOINT_BUSCA", "/rest/api/3/search")
+TAMANHO_PAGINA = int(os.getenv("JIRA_TAMANHO_PAGINA", 100))
+# Leitura incremental das páginas (requer ijson): as issues são montadas uma a uma a partir do
+# corpo da resposta, sem carregar a página inteira. "0" volta ao response.json().
+BUSCA_EM_FLUXO = os.getenv("JIRA_BUSCA_EM_FLUXO", "1") != "0"
+TAMANHO_BLOCO_LEITURA = 64 * 1024
+# Compressão pedida explicitamente nas buscas (a decodificação é feita pelo urllib3 durante a leitura)
+HEADERS_BUSCA = {"Accept-Encoding": "gzip"}
+
+def _juntar(valor):
+    """Aceita 'a,b' ou ['a', 'b'] e devolve sempre o formato de parâmetro da API."""
+    if valor is None or isinstance(valor, str):
+        return valor
+    return ",".join(valor)
+
+def _montar_params(jql, fields, expand, tamanho_pagina):
+    params = {'jql': jql, 'maxResults': tamanho_pagina}
+    if fields:
+        params['fields'] = _juntar(fields)
+    if expand:
+        params['expand'] = _juntar(expand)
+    return params
+
+# --- Contabilização da Transferência ---
+# Total de bytes de páginas de busca recebidos neste processo (usado para medir a projeção de campos)
+_trava_bytes = threading.Lock()
+_bytes_recebidos = 0
+
+def bytes_recebidos():
+    """Retorna o total de bytes de páginas de busca recebidos até agora."""
+    return _bytes_recebidos
+
+def _contabilizar(quantidade):
+    global _bytes_recebidos
+    with _trava_bytes:
+        _bytes_recebidos += quantidade
+
+def _buscar_pagina(params):
+    response = jira_cliente.get(ENDPOINT_BUSCA, params=params, headers=HEADERS_BUSCA)
+    response.raise_for_status()
+    _contabilizar(len(response.content))
+    return response.json()
+
+# --- Leitura Incremental (streaming) ---
+_METADADOS_PAGINA = ('startAt', 'maxResults', 'total', 'nextPageToken', 'isLast')
+_ijson = None
+
+def _carregar_ijson():
+    """Importa o ijson (opcional) uma única vez; sem ele as páginas são lidas com response.json()."""
+    global _ijson, BUSCA_EM_FLUXO
+    if _ijson is None and BUSCA_EM_FLUXO:
+        try:
+            import ijson
+            _ijson = ijson
+        except ImportError:
+            print("⚠️ ijson não instalado: as páginas de busca serão carregadas inteiras (response.json()).")
+            BUSCA_EM_FLUXO = False
+    return _ijson
+
+def _em_fluxo():
+    return BUSCA_EM_FLUXO and _carregar_ijson() is not None
+
+def projecao_de(fields):
+    """
+    Converte o parâmetro 'fields' em (incluidos, excluidos) para filtrar o objeto 'fields' de cada
+    issue. incluidos=None mantém todos (ex: '*all', '*navigable'); '-campo' entra em excluidos.
+    """
+    incluidos, excluidos = set(), set()
+    for campo in (_juntar(fields) or "").split(","):
+        campo = campo.strip()
+        if not campo:
+            continue
+        if campo.startswith('-'):
+            excluidos.add(campo[1:])
+        elif campo.startswith('*'):
+            incluidos = None
+        elif incluidos is not None:
+            incluidos.add(campo)
+    return (incluidos or None), excluidos
+
+class _LeitorContado:
+    """
+    Lê o corpo (já descomprimido) da resposta em blocos, contando os bytes entregues ao parser.
+    Como o response.raw é lido direto, as falhas do urllib3 são convertidas aqui nas mesmas
+    exceções do requests que o iter_content/response.json() lançariam.
+    """
+
+    def __init__(self, response):
+        self._response = response
+        self._bruto = response.raw
+        self.lidos = 0
+
+    def read(self, tamanho=TAMANHO_BLOCO_LEITURA):
+        try:
+            bloco = self._bruto.read(tamanho, decode_content=True)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e, response=self._response) from e
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e, response=self._response) from e
+        except DecodeError as e:
+            raise requests.exceptions.ContentDecodingError(e, response=self._response) from e
+        except SSLError as e:
+            raise requests.exceptions.SSLError(e, response=self._response) from e
+        self.lidos += len(bloco)
+        return bloco
+
+class PaginaEmFluxo:
+    """
+    Uma página de busca lida de forma incremental: iterar gera as issues conforme o corpo chega,
+    mantendo só os campos projetados. Os metadados de paginação (total, nextPageToken, isLast...)
+    podem vir depois da lista de issues, então 'metadados' só fica completo ao fim da iteração.
+    A memória de pico acompanha o tamanho de uma issue, não o da página.
+    """
+
+    def __init__(self, params, projecao=(None, ())):
+        self.params = dict(params)
+        self.incluidos, self.excluidos = projecao
+        self.metadados = {}
+        self.quantidade = 0
+
+    def _projetar(self, issue):
+        fields = issue.get('fields')
+        if isinstance(fields, dict) and (self.incluidos is not None or self.excluidos):
+            issue['fields'] = {campo: valor for campo, valor in fields.items()
+                               if (self.incluidos is None or campo in self.incluidos) and campo not in self.excluidos}
+        return issue
+
+    def _eventos(self, ijson, leitor):
+        """Eventos do parser; os metadados de paginação (chaves de primeiro nível) são anotados no caminho."""
+        for evento in ijson.parse(leitor, use_float=True):
+            if evento[0] in _METADADOS_PAGINA:
+                self.metadados[evento[0]] = evento[2]
+            yield evento
+
+    def __iter__(self):
+        ijson = _carregar_ijson()
+        response = jira_cliente.get(ENDPOINT_BUSCA, params=self.params, headers=HEADERS_BUSCA, stream=True)
+        try:
+            response.raise_for_status()
+            leitor = _LeitorContado(response)
+            try:
+                # Cada issue é montada pelo backend do ijson (em C, quando disponível) e entregue na hora
+                for issue in ijson.items(self._eventos(ijson, leitor), 'issues.item'):
+                    self.quantidade += 1
+                    yield self._projetar(issue)
+            except ijson.JSONError as e:
+                # Corpo que não é JSON (ex: página HTML de um proxy): mesma família de erro do response.json()
+                raise requests.exceptions.InvalidJSONError(f"Resposta da busca não é um JSON válido: {e}",
+                                                           response=response) from e
+            finally:
+                _contabilizar(leitor.lidos)
+        finally:
+            response.close()
+
+def _proximo_inicio(params, metadados, quantidade, inicio):
+    """
+    Prepara 'params' para a próxima página e devolve o novo startAt, ou None na última página.
+    Entende a paginação por token (API nova) e a clássica por startAt/total.
+    """
+    token = metadados.get('nextPageToken')
+    if token:
+        params['nextPageToken'] = token
+        return inicio
+    if 'isLast' in metadados:
+        return None
+    inicio += quantidade
+    if not quantidade or inicio >= (metadados.get('total') or 0):
+        return None
+    params['startAt'] = inicio
+    return inicio
+
+def iterar_paginas(jql, fields=None, expand=None, tamanho_pagina=TAMANHO_PAGINA):
+    """
+    Gera as páginas de uma busca JQL, uma requisição por vez, até a última página.
+    Cada página é o JSON devolvido pela API; apenas uma fica em memória por vez.
+    Lança requests.exceptions.RequestException em caso de falha.
+    """
+    params = _montar_params(jql, fields, expand, tamanho_pagina)
+
+    inicio = 0
+    while inicio is not None:
+        pagina = _buscar_pagina(params)
+        yield pagina
+        inicio = _proximo_inicio(params, pagina, len(pagina.get('issues', [])), inicio)
+
+def iterar_issues(jql, fields=None, expand=None, tamanho_pagina=TAMANHO_PAGINA):
+    """
+    Gera as issues de uma busca JQL à medida que chegam, sem limite de quantidade.
+    Com JIRA_BUSCA_EM_FLUXO, cada página é lida de forma incremental (PaginaEmFluxo) e só
+    os campos pedidos em 'fields' são mantidos em cada issue.
+    """
+    if not _em_fluxo():
+        for pagina in iterar_paginas(jql, fields=fields, expand=expand, tamanho_pagina=tamanho_pagina):
+            yield from pagina.get('issues', [])
+        return
+
+    params = _montar_params(jql, fields, expand, tamanho_pagina)
+    projecao = projecao_de(fields)
+    inicio = 0
+    while inicio is not None:
+        pagina = PaginaEmFluxo(params, projecao)
+        yield from pagina
+        inicio = _proximo_inicio(params, pagina.metadados, pagina.quantidade, inicio)
+
+# --- Busca Concorrente ---
+# Número de requisições simultâneas usado pelos relatórios da Bússola.
+WORKERS_PADRAO = int(os.getenv("BUSSOLA_WORKERS", 4))
+# Quantidade de faixas de data (campo created) para dividir buscas grandes; 0 desativa.
+FAIXAS_PADRAO = int(os.getenv("BUSSOLA_FAIXAS", 0))
+
+_REGEX_ORDER_BY = re.compile(r'\s+ORDER\s+BY\s+(.+)$', re.IGNORECASE)
+
+def separar_order_by(jql):
+    """Separa o filtro JQL da cláusula ORDER BY. Retorna (filtro, ordenacao_ou_None)."""
+    m = _REGEX_ORDER_BY.search(jql)
+    if not m:
+        return jql.strip(), None
+    return jql[:m.start()].strip(), m.group(1).strip()
+
+def iterar_issues_paralelo(jql, fields=None, expand=None, workers=None, faixas=None,
+                           tamanho_pagina=TAMANHO_PAGINA):
+    """
+    Versão concorrente de iterar_issues, com resultados sempre na mesma ordem (estável).
+    - Com faixas > 0 (ou na API por token, que não informa o total), divide o JQL em
+      faixas de data de criação e busca cada faixa em paralelo.
+    - Caso contrário, lê a primeira página e busca as demais (startAt) em paralelo.
+    """
+    workers = WORKERS_PADRAO if workers is None else workers
+    faixas = FAIXAS_PADRAO if faixas is None else faixas
+    if workers <= 1:
+        yield from iterar_issues(jql, fields=fields, expand=expand, tamanho_pagina=tamanho_pagina)
+        return
+
+    filtro, ordenacao = separar_order_by(jql)
+    # Sem ORDER BY o Jira não garante a ordem entre páginas; a chave torna o resultado estável.
+    jql = f"{filtro} ORDER BY {ordenacao or 'key ASC'}"
+    if faixas > 0:
+        yield from _iterar_por_faixas(jql, fields, expand, workers, faixas, tamanho_pagina)
+        return
+
+    params = _montar_params(jql, fields, expand, tamanho_pagina)
+    projecao = projecao_de(fields)
+    if _em_fluxo():
+        # As páginas em paralelo ficam em memória até a vez delas, mas já projetadas e sem o corpo bruto
+        pagina = PaginaEmFluxo(params, projecao)
+        primeira = {'issues': list(pagina), **pagina.metadados}
+    else:
+        primeira = _buscar_pagina(params)
+    if 'total' not in primeira:
+        # API por token: as páginas dependem umas das outras, então dividimos por data.
+        yield from _iterar_por_faixas(jql, fields, expand, workers, max(workers, 2), tamanho_pagina)
+        return
+
+    issues = primeira.get('issues', [])
+    yield from issues
+    total = primeira.get('total', 0)
+    passo = len(issues) or tamanho_pagina
+    inicios = range(len(issues), total, passo) if issues else []
+
+    def buscar(inicio):
+        if _em_fluxo():
+            return list(PaginaEmFluxo({**params, 'startAt': inicio}, projecao))
+        return _buscar_pagina({**params, 'startAt': inicio}).get('issues', [])
+
+    for pagina in em_ordem(buscar, inicios, workers):
+        yield from pagina
+
+def _limites_de_criacao(filtro):
+    """Retorna as datas (date) da issue mais antiga e da mais recente do filtro, ou None."""
+    datas = []
+    for direcao in ("ASC", "DESC"):
+        pagina = next(iterar_paginas(f"{filtro} ORDER BY created {direcao}", fields='created', tamanho_pagina=1))
+        issues = pagina.get('issues', [])
+        if not issues:
+            return None
+        datas.append(date.fromisoformat(issues[0]['fields']['created'][:10]))
+    return datas[0], datas[1]
+
+def montar_faixas(filtro, inicio, fim, quantidade):
+    """
+    Divide o intervalo [inicio, fim] em até 'quantidade' JQLs por data de criação.
+    A primeira e a última faixa ficam abertas, então nenhuma issue fica de fora
+    mesmo com diferença de fuso horário entre o Jira e as datas devolvidas.
+    """
+    dias = (fim - inicio).days + 1
+    quantidade = max(1, min(quantidade, dias))
+    cortes = sorted({inicio + timedelta(days=(dias * i) // quantidade) for i in range(1, quantidade)})
+    if not cortes:
+        return [filtro]
+    faixas = [f'({filtro}) AND created < "{cortes[0].isoformat()}"']
+    for de, ate in zip(cortes, cortes[1:]):
+        faixas.append(f'({filtro}) AND created >= "{de.isoformat()}" AND created < "{ate.isoformat()}"')
+    faixas.append(f'({filtro}) AND created >= "{cortes[-1].isoformat()}"')
+    return faixas
+
+def _iterar_por_faixas(jql, fields, expand, workers, quantidade, tamanho_pagina):
+    """Busca cada faixa de data em paralelo e entrega as faixas em sequência (ordem estável)."""
+    filtro, ordenacao = separar_order_by(jql)
+    limites = _limites_de_criacao(filtro)
+    if limites is None:
+        return
+    faixas = montar_faixas(filtro, limites[0], limites[1], quantidade)
+    # Com a busca em ordem decrescente de criação, as faixas mais recentes vêm primeiro.
+    if re.match(r'created\s+DESC', ordenacao or '', re.IGNORECASE):
+        faixas.reverse()
+    if ordenacao:
+        faixas = [f"{faixa} ORDER BY {ordenacao}" for faixa in faixas]
+
+    cancelado = threading.Event()
+    filas = [queue.Queue(maxsize=tamanho_pagina * 2) for _ in faixas]
+    fim_da_faixa = object()
+
+    def produzir(indice):
+        fila = filas[indice]
+        def colocar(item):
+            return colocar_ate_cancelar(fila, item, cancelado)
+        try:
+            for issue in iterar_issues(faixas[indice], fields=fields, expand=expand, tamanho_pagina=tamanho_pagina):
+                if not colocar(issue):
+                    return
+            colocar(fim_da_faixa)
+        except Exception as erro:
+            colocar(erro)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for indice in range(len(faixas)):
+            executor.submit(produzir, indice)
+        try:
+            for fila in filas:
+                while True:
+                    item = fila.get()
+                    if item is fim_da_faixa:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+        finally:
+            cancelado.set()
@@ -0,0 +1,89 @@
+# cache_transicoes.py - Cache em disco das transições de workflow por (projeto, tipo, status)
+
+import os
+import json
+import threading
+from comum.jira_cliente import raiz_projeto
+
+# --- Configuração ---
+CAMINHO_CACHE = os.getenv("JIRA_CACHE_TRANSICOES", str(raiz_projeto / '.cache' / 'transicoes.json'))
+
+class CacheTransicoes:
+    """
+    Guarda, para cada estado de workflow (projeto, tipo de issue, status atual), a lista de
+    transições disponíveis (id, nome e status de destino). Issues no mesmo estado compartilham
+    o mesmo workflow, então a consulta a /transitions só é feita uma vez por estado.
+    Como condições do workflow (permissões, responsável) podem variar por issue, quem usa o
+    cache deve invalidar o estado quando uma transição falhar.
+    """
+
+    def __init__(self, caminho=CAMINHO_CACHE):
+        self._caminho = caminho
+        self._trava = threading.Lock()
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                self._estados = json.load(arquivo)
+        except (OSError, ValueError):
+            self._estados = {}
+        # Estados consultados no Jira durante este processo (não precisam ser reconfirmados)
+        self._confirmados = set()
+
+    @staticmethod
+    def _chave(projeto, tipo, status):
+        return f"{projeto}|{tipo}|{status}".lower()
+
+    def obter(self, projeto, tipo, status):
+        """Retorna a lista de transições do estado, ou None se ainda não estiver no cache."""
+        with self._trava:
+            return self._estados.get(self._chave(projeto, tipo, status))
+
+    def registrar(self, projeto, tipo, status, transicoes):
+        """Grava as transições (no formato da API) do estado e persiste o arquivo."""
+        resumidas = [{"id": t['id'], "name": t['name'], "to": {"name": t.get('to', {}).get('name', '')}}
+                     for t in transicoes]
+        chave = self._chave(projeto, tipo, status)
+        with self._trava:
+            self._estados[chave] = resumidas
+            self._confirmados.add(chave)
+            self._salvar()
+
+    def confirmado(self, projeto, tipo, status):
+        """Indica se o estado já foi consultado no Jira durante este processo."""
+        with self._trava:
+            return self._chave(projeto, tipo, status) in self._confirmados
+
+    def invalidar(self, projeto, tipo, status):
+        """Descarta o estado (ex: depois de uma transição recusada pelo Jira)."""
+        chave = self._chave(projeto, tipo, status)
+        with self._trava:
+            self._confirmados.discard(chave)
+            if self._estados.pop(chave, None) is not None:
+                self._salvar()
+
+    def _salvar(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self._caminho)), exist_ok=True)
+        temporario = f"{self._caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(self._estados, arquivo, ensure_ascii=False, indent=1)
+        os.replace(temporario, self._caminho)
+
+_cache_padrao = None
+_trava_padrao = threading.Lock()
+
+def cache_padrao():
+    """Retorna o cache compartilhado do processo, carregando o arquivo na primeira chamada."""
+    global _cache_padrao
+    if _cache_padrao is None:
+        with _trava_padrao:
+            if _cache_padrao is None:
+                _cache_padrao = CacheTransicoes()
+    return _cache_padrao
+
+def estado_da_issue(issue):
+    """Extrai (projeto, tipo, status) de uma issue buscada com fields project, issuetype e status."""
+    fields = issue.get('fields', {})
+    return (
+        (fields.get('project') or {}).get('key', ''),
+        (fields.get('issuetype') or {}).get('name', ''),
+        (fields.get('status') or {}).get('name', ''),
+    )
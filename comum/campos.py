@@ -0,0 +1,74 @@
+# campos.py - Projeção mínima de campos para as buscas dos relatórios da Bússola
+
+import os
+import requests
+from comum import busca
+
+# --- Campos declarados por relatório ---
+# Cada relatório lista apenas os campos que realmente lê. Nomes que são opções de
+# 'expand' da API (ex: renderedFields, changelog) vão para o parâmetro expand.
+CAMPOS_POR_RELATORIO = {
+    "panorama": ("summary", "status", "labels", "issuetype"),
+    "pareto": ("labels",),
+    "mapa_bugs": ("summary", "status", "labels"),
+    "mapa_cobertura": ("summary", "status", "labels"),
+    "exportar_bugs": ("summary", "status", "labels", "assignee", "reporter", "created"),
+    "exportar_testes_excel": ("summary", "description", "labels", "status", "created"),
+}
+OPCOES_EXPAND = {"renderedFields", "names", "schema", "transitions", "operations", "editmeta", "changelog"}
+
+# Amostra usada para estimar o tamanho de uma página com fields=*all
+TAMANHO_AMOSTRA = 5
+# Desligada por padrão: a medição faz uma busca extra com fields=*all a cada relatório
+MEDIR_ECONOMIA = os.getenv("BUSSOLA_MEDIR_ECONOMIA", "0") == "1"
+
+def planejar(*relatorios, extras=()):
+    """
+    Monta a menor requisição que atende todos os relatórios informados.
+    Retorna (fields, expand) no formato de parâmetro da API; expand pode ser None.
+    """
+    fields, expand = [], []
+    for nome in relatorios:
+        for campo in (*CAMPOS_POR_RELATORIO[nome], *extras):
+            destino = expand if campo in OPCOES_EXPAND else fields
+            if campo not in destino:
+                destino.append(campo)
+    return ",".join(fields), (",".join(expand) or None)
+
+def _bytes_por_issue_sem_projecao(jql):
+    """Mede o tamanho médio de uma issue buscada com fields=*all (uma página pequena)."""
+    antes = busca.bytes_recebidos()
+    pagina = next(busca.iterar_paginas(jql, fields='*all', tamanho_pagina=TAMANHO_AMOSTRA))
+    quantidade = len(pagina.get('issues', []))
+    return (busca.bytes_recebidos() - antes) / quantidade if quantidade else 0
+
+def _formatar_bytes(valor):
+    for unidade in ("B", "KB", "MB"):
+        if abs(valor) < 1024:
+            return f"{valor:.0f} {unidade}"
+        valor /= 1024
+    return f"{valor:.1f} GB"
+
+def buscar_projetado(relatorio, jql, extras=(), **kwargs):
+    """
+    Busca as issues (em paralelo) pedindo apenas os campos do relatório e, ao final,
+    informa quantos bytes a projeção economizou em relação a fields=*all.
+    """
+    fields, expand = planejar(relatorio, extras=extras)
+    antes = busca.bytes_recebidos()
+    quantidade = 0
+    for issue in busca.iterar_issues_paralelo(jql, fields=fields, expand=expand, **kwargs):
+        quantidade += 1
+        yield issue
+
+    if not MEDIR_ECONOMIA or not quantidade:
+        return
+    recebidos = busca.bytes_recebidos() - antes
+    try:
+        estimado = _bytes_por_issue_sem_projecao(jql) * quantidade
+    except requests.exceptions.RequestException:
+        return  # A medição é apenas informativa; o relatório já foi atendido.
+    economia = estimado - recebidos
+    percentual = (economia / estimado * 100) if estimado else 0
+    print(f"📉 Projeção de campos ({relatorio}): {_formatar_bytes(recebidos)} recebidos em vez de "
+          f"~{_formatar_bytes(estimado)} com fields=*all (economia de {_formatar_bytes(economia)}, {percentual:.0f}%).")
@@ -0,0 +1,65 @@
+# concorrencia.py - Utilitários de execução concorrente compartilhados
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+def em_ordem(funcao, argumentos, workers):
+    """
+    Executa funcao(arg) em paralelo e entrega os resultados na ordem dos argumentos.
+    Mantém no máximo 2x workers tarefas adiantadas, limitando a memória usada;
+    'argumentos' pode ser um gerador, consumido aos poucos.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pendentes = deque()
+        for argumento in argumentos:
+            pendentes.append(executor.submit(funcao, argumento))
+            if len(pendentes) >= workers * 2:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
+
+def colocar_ate_cancelar(fila, item, cancelado, intervalo=0.5):
+    """Coloca 'item' na fila limitada, esperando por espaço até que 'cancelado' seja sinalizado."""
+    while not cancelado.is_set():
+        try:
+            fila.put(item, timeout=intervalo)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def ler_em_segundo_plano(iteravel, tamanho_fila=1000):
+    """
+    Consome 'iteravel' em uma thread separada e entrega os itens por uma fila limitada.
+    A leitura avança enquanto o consumidor trabalha, mas para quando a fila enche
+    (backpressure), então a memória fica limitada a 'tamanho_fila' itens.
+    Exceções da leitura são relançadas no consumidor.
+    """
+    fila = queue.Queue(maxsize=tamanho_fila)
+    cancelado = threading.Event()
+    fim = object()
+
+    def produzir():
+        try:
+            for item in iteravel:
+                if not colocar_ate_cancelar(fila, item, cancelado):
+                    return
+            colocar_ate_cancelar(fila, fim, cancelado)
+        except Exception as erro:
+            colocar_ate_cancelar(fila, erro, cancelado)
+
+    leitor = threading.Thread(target=produzir, daemon=True)
+    leitor.start()
+    try:
+        while True:
+            item = fila.get()
+            if item is fim:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        cancelado.set()
+        leitor.join()
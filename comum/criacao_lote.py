@@ -0,0 +1,104 @@
+# criacao_lote.py - Criação de issues em lote pelo endpoint /rest/api/3/issue/bulk
+
+import os
+import time
+import requests
+from itertools import islice
+from comum import jira_cliente, idempotencia
+from comum.concorrencia import em_ordem
+
+# --- Configuração ---
+TAMANHO_LOTE = 50  # Limite de issues por requisição imposto pela API do Jira
+WORKERS_LOTE = int(os.getenv("JIRA_WORKERS_LOTE", 4))
+
+def _descrever_erro(erro):
+    """Transforma o bloco 'elementErrors' da resposta em uma mensagem legível."""
+    detalhes = erro.get('elementErrors', {})
+    mensagens = list(detalhes.get('errorMessages', []))
+    mensagens += [f"{campo}: {msg}" for campo, msg in detalhes.get('errors', {}).items()]
+    return "; ".join(mensagens) or f"HTTP {erro.get('status', '?')}"
+
+def agrupar(itens, tamanho):
+    """Agrupa um iterável em listas de até 'tamanho' elementos, sem carregar tudo na memória."""
+    iterador = iter(itens)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+def _enviar_uma_vez(lote):
+    """
+    Envia um lote de (referencia, payload) uma vez. Retorna (resultados, ambiguo), onde
+    'resultados' traz (referencia, chave_criada_ou_None, erro_ou_None) na ordem do lote e
+    'ambiguo' indica que a falha pode ter ocorrido depois do Jira gravar as issues.
+    """
+    corpo = {"issueUpdates": [payload for _, payload in lote]}
+    try:
+        response = jira_cliente.post("/rest/api/3/issue/bulk", json=corpo)
+        dados = response.json() if response.content else {}
+    except (requests.exceptions.RequestException, ValueError) as e:
+        return [(referencia, None, str(e)) for referencia, _ in lote], True
+
+    ambiguo = idempotencia.resposta_ambigua(response.status_code)
+    if ambiguo or (not dados.get('issues') and not dados.get('errors')):
+        mensagem = f"HTTP {response.status_code}: {response.text[:200]}"
+        return [(referencia, None, mensagem) for referencia, _ in lote], ambiguo
+
+    # Os erros trazem o índice do item que falhou; as issues criadas vêm na ordem dos demais.
+    falhas = {erro.get('failedElementNumber'): _descrever_erro(erro) for erro in dados.get('errors', [])}
+    criadas = iter(dados.get('issues', []))
+    resultados = []
+    for indice, (referencia, _) in enumerate(lote):
+        if indice in falhas:
+            resultados.append((referencia, None, falhas[indice]))
+        else:
+            criada = next(criadas, None)
+            if criada:
+                resultados.append((referencia, criada['key'], None))
+            else:
+                resultados.append((referencia, None, "Sem resposta do Jira para o item"))
+    return resultados, False
+
+def enviar_lote(lote, tentativas=idempotencia.TENTATIVAS):
+    """
+    Envia um lote de (referencia, payload) e retorna uma lista de
+    (referencia, chave_criada_ou_None, erro_ou_None), na ordem do lote.
+    Falhas de rede/5xx são reenviadas com backoff; antes de cada reenvio, as etiquetas
+    de idempotência mostram quais itens já foram gravados, e só o restante é reenviado.
+    No fim, a etiqueta é removida das issues criadas.
+    """
+    rotulos = [idempotencia.marcar(payload) for _, payload in lote]
+    resultados = [(referencia, None, "Lote não enviado") for referencia, _ in lote]
+    pendentes = list(range(len(lote)))
+    for tentativa in range(tentativas):
+        if tentativa:
+            time.sleep(idempotencia.espera(tentativa))
+            try:
+                existentes = idempotencia.buscar_existentes([rotulos[i] for i in pendentes])
+            except requests.exceptions.RequestException:
+                continue  # Sem como confirmar, não reenvia às cegas nesta rodada
+            for i in pendentes:
+                if rotulos[i] in existentes:
+                    resultados[i] = (lote[i][0], existentes[rotulos[i]], None)
+            pendentes = [i for i in pendentes if rotulos[i] not in existentes]
+            if not pendentes:
+                break
+        parciais, ambiguo = _enviar_uma_vez([lote[i] for i in pendentes])
+        for i, resultado in zip(pendentes, parciais):
+            resultados[i] = resultado
+        if not ambiguo:
+            break
+    criadas = [(resultado[1], rotulo) for resultado, rotulo in zip(resultados, rotulos) if resultado[1]]
+    for _ in em_ordem(lambda item: idempotencia.remover_rotulo(*item), criadas, WORKERS_LOTE):
+        pass
+    return resultados
+
+def criar_em_lote(itens, tamanho_lote=TAMANHO_LOTE, workers=WORKERS_LOTE):
+    """
+    Cria issues em lotes enviados em paralelo.
+    'itens' é um iterável de (referencia, payload) - a referência (ex: linha do CSV)
+    volta junto com o resultado. Gera (referencia, chave_ou_None, erro_ou_None) na ordem de entrada.
+    """
+    for resultados in em_ordem(enviar_lote, agrupar(itens, tamanho_lote), workers):
+        yield from resultados
@@ -0,0 +1,93 @@
+# exclusao.py - Exclusão em massa (por JQL ou lista de chaves), concorrente e auditada
+
+import os
+import json
+import threading
+import requests
+from datetime import datetime, timezone
+from comum import busca, jira_cliente
+from comum.jira_cliente import raiz_projeto
+from comum.concorrencia import em_ordem
+
+# --- Configuração ---
+WORKERS_EXCLUSAO = int(os.getenv("JIRA_WORKERS_EXCLUSAO", 8))
+CAMINHO_AUDITORIA = os.getenv("JIRA_AUDITORIA_EXCLUSOES", str(raiz_projeto / 'auditoria' / 'exclusoes.jsonl'))
+CAMPOS_AUDITORIA = 'summary,issuetype,status'
+
+def _buscar_issue(issue_key):
+    """Busca os dados de auditoria de uma chave; retorna None se ela não existir (404)."""
+    response = jira_cliente.get(f"/rest/api/3/issue/{issue_key}", params={'fields': CAMPOS_AUDITORIA})
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+def listar_alvos(jql=None, chaves=None, workers=WORKERS_EXCLUSAO):
+    """
+    Retorna a lista completa de issues a excluir (com resumo, tipo e status, para a auditoria).
+    A lista é carregada antes de qualquer exclusão: apagar durante a paginação faria a busca pular issues.
+    Chaves inexistentes (ou sem permissão de leitura) simplesmente não aparecem no resultado.
+    """
+    if jql:
+        return list(busca.iterar_issues_paralelo(jql, fields=CAMPOS_AUDITORIA))
+    # Uma JQL "key in (...)" falharia inteira por causa de uma única chave inexistente
+    unicas = dict.fromkeys(c.strip().upper() for c in chaves if c.strip())
+    return [issue for issue in em_ordem(_buscar_issue, unicas, workers) if issue]
+
+class RegistroAuditoria:
+    """Arquivo JSONL (uma linha por issue) com o que foi excluído, por quem e quando."""
+
+    def __init__(self, caminho=CAMINHO_AUDITORIA):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.caminho = caminho
+        self._arquivo = open(caminho, 'a', encoding='utf-8')
+        self._trava = threading.Lock()
+
+    def registrar(self, issue, excluida, detalhe=None):
+        fields = issue.get('fields', {})
+        linha = {
+            "quando": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "usuario": jira_cliente.JIRA_USER_EMAIL,
+            "chave": issue['key'],
+            "tipo": (fields.get('issuetype') or {}).get('name'),
+            "status": (fields.get('status') or {}).get('name'),
+            "resumo": fields.get('summary'),
+            "excluida": excluida,
+        }
+        if detalhe:
+            linha["erro"] = detalhe
+        with self._trava:
+            self._arquivo.write(json.dumps(linha, ensure_ascii=False) + "\n")
+            self._arquivo.flush()  # Cada exclusão fica registrada mesmo se o processo for interrompido
+
+    def fechar(self):
+        self._arquivo.close()
+
+def excluir_issue(issue_key, excluir_subtarefas=False):
+    """Exclui uma issue. Lança requests.exceptions.RequestException em caso de falha."""
+    params = {'deleteSubtasks': 'true'} if excluir_subtarefas else None
+    response = jira_cliente.delete(f"/rest/api/3/issue/{issue_key}", params=params)
+    response.raise_for_status()
+
+def excluir_em_massa(alvos, workers=WORKERS_EXCLUSAO, excluir_subtarefas=False, caminho_auditoria=CAMINHO_AUDITORIA):
+    """
+    Exclui as issues de 'alvos' (vindas de listar_alvos) em paralelo, dentro do limitador
+    compartilhado, registrando cada uma no log de auditoria.
+    Gera (chave, excluida, detalhe_do_erro_ou_None) na ordem de 'alvos'.
+    """
+    auditoria = RegistroAuditoria(caminho_auditoria)
+
+    def excluir(issue):
+        try:
+            excluir_issue(issue['key'], excluir_subtarefas)
+        except requests.exceptions.RequestException as e:
+            detalhe = f"HTTP {e.response.status_code}: {e.response.text[:200]}" if e.response is not None else str(e)
+            auditoria.registrar(issue, False, detalhe)
+            return issue['key'], False, detalhe
+        auditoria.registrar(issue, True)
+        return issue['key'], True, None
+
+    try:
+        yield from em_ordem(excluir, alvos, workers)
+    finally:
+        auditoria.fechar()
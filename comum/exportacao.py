@@ -0,0 +1,154 @@
+# exportacao.py - Exportação particionada por mês de criação (Parquet + CSV gzip), regravando só o que mudou
+
+import os
+import io
+import csv
+import gzip
+import json
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime, timezone
+from comum.jira_cliente import raiz_projeto
+
+# --- Configuração ---
+DIR_EXPORTACAO = os.getenv("BUSSOLA_DIR_EXPORTACAO", str(raiz_projeto / 'exportacoes'))
+FORMATOS = tuple(f.strip() for f in os.getenv("BUSSOLA_FORMATOS", "parquet,csv").split(",") if f.strip())
+SEM_DATA = "sem-data"
+_MODULO = 2 ** 256
+
+def mes_de(data):
+    """Partição de uma data ISO do Jira ('2024-05-10T12:00:00.000-0300' -> '2024-05')."""
+    return data[:7] if data and len(data) >= 7 else SEM_DATA
+
+def _impressao_linha(valores):
+    conteudo = json.dumps(valores, ensure_ascii=False, default=str)
+    return int.from_bytes(hashlib.sha256(conteudo.encode('utf-8')).digest(), 'big')
+
+def _pyarrow():
+    """Importa o pyarrow (opcional); sem ele, a exportação segue apenas em CSV."""
+    try:
+        import pyarrow
+        import pyarrow.csv
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+class ExportacaoParticionada:
+    """
+    Grava um conjunto de linhas em <DIR_EXPORTACAO>/<conjunto>/mes=AAAA-MM/, em Parquet e CSV gzip.
+    As linhas chegam em fluxo e vão para arquivos temporários por mês. Ao fechar, a impressão
+    digital de cada partição (soma dos hashes das linhas, independente da ordem) é comparada
+    com a do manifesto: só as partições alteradas são regravadas, as que sumiram são removidas
+    e as demais ficam intactas (com a mesma data de modificação para os jobs de BI).
+    """
+
+    def __init__(self, conjunto, colunas, diretorio=DIR_EXPORTACAO, formatos=FORMATOS):
+        self.conjunto = conjunto
+        self.colunas = list(colunas)
+        self.formatos = formatos
+        self._destino = os.path.join(diretorio, conjunto)
+        self._caminho_manifesto = os.path.join(self._destino, 'manifesto.json')
+        os.makedirs(self._destino, exist_ok=True)
+        self._temporario = tempfile.mkdtemp(prefix='.parcial-', dir=self._destino)
+        self._arquivos = {}     # mês -> (arquivo, csv.writer)
+        self._impressoes = {}   # mês -> [soma dos hashes, linhas]
+
+    def _escritor(self, mes):
+        if mes not in self._arquivos:
+            # mtime=0 deixa o .gz idêntico entre execuções com o mesmo conteúdo
+            bruto = gzip.GzipFile(os.path.join(self._temporario, f"{mes}.csv.gz"), 'wb', mtime=0)
+            arquivo = io.TextIOWrapper(bruto, encoding='utf-8', newline='')
+            escritor = csv.writer(arquivo)
+            escritor.writerow(self.colunas)
+            self._arquivos[mes] = (arquivo, escritor)
+            self._impressoes[mes] = [0, 0]
+        return self._arquivos[mes][1]
+
+    def escrever(self, linha, criado_em):
+        """Acrescenta uma linha ({coluna: valor}) à partição do mês de 'criado_em'."""
+        mes = mes_de(criado_em)
+        valores = ["" if linha.get(coluna) is None else linha.get(coluna) for coluna in self.colunas]
+        self._escritor(mes).writerow(valores)
+        impressao = self._impressoes[mes]
+        impressao[0] = (impressao[0] + _impressao_linha(valores)) % _MODULO
+        impressao[1] += 1
+
+    def _ler_manifesto(self, formatos):
+        try:
+            with open(self._caminho_manifesto, encoding='utf-8') as arquivo:
+                manifesto = json.load(arquivo)
+        except (OSError, ValueError):
+            return {}
+        particoes = manifesto.get('particoes', {})
+        if manifesto.get('colunas') != self.colunas or manifesto.get('formatos') != formatos:
+            # Colunas ou formatos mudaram: todas as partições são regravadas (e as que sumiram, removidas)
+            return {mes: {} for mes in particoes}
+        return particoes
+
+    def _gravar_particao(self, mes, formatos, pyarrow):
+        pasta = os.path.join(self._destino, f"mes={mes}")
+        os.makedirs(pasta, exist_ok=True)
+        origem = os.path.join(self._temporario, f"{mes}.csv.gz")
+        for formato, extensao in (("parquet", "parquet"), ("csv", "csv.gz")):
+            antigo = os.path.join(pasta, f"{self.conjunto}.{extensao}")
+            if formato not in formatos and os.path.exists(antigo):
+                os.remove(antigo)
+        if "parquet" in formatos:
+            # Todas as colunas como texto: o esquema fica igual em todas as partições
+            tabela = pyarrow.csv.read_csv(origem, convert_options=pyarrow.csv.ConvertOptions(
+                column_types={coluna: pyarrow.string() for coluna in self.colunas},
+                strings_can_be_null=False))
+            parquet_temporario = os.path.join(self._temporario, f"{mes}.parquet")
+            pyarrow.parquet.write_table(tabela, parquet_temporario, compression='snappy')
+            os.replace(parquet_temporario, os.path.join(pasta, f"{self.conjunto}.parquet"))
+        if "csv" in formatos:
+            os.replace(origem, os.path.join(pasta, f"{self.conjunto}.csv.gz"))
+
+    def fechar(self):
+        """
+        Compara as partições com o manifesto e grava só as alteradas.
+        Retorna {'gravadas': [meses], 'inalteradas': quantidade, 'removidas': [meses]}.
+        """
+        for arquivo, _ in self._arquivos.values():
+            arquivo.close()
+        formatos = [formato for formato in ("parquet", "csv") if formato in self.formatos]
+        pyarrow = _pyarrow() if "parquet" in formatos else None
+        if "parquet" in formatos and not pyarrow:
+            print("⚠️ pyarrow não instalado: a exportação em Parquet foi ignorada (apenas CSV gzip).")
+            formatos.remove("parquet")
+        anteriores = self._ler_manifesto(formatos)
+
+        agora = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        particoes, gravadas = {}, []
+        try:
+            for mes, (soma, linhas) in sorted(self._impressoes.items()):
+                impressao = f"{soma:064x}"
+                anterior = anteriores.get(mes)
+                if anterior and anterior.get('impressao') == impressao and anterior.get('linhas') == linhas:
+                    particoes[mes] = anterior
+                    continue
+                self._gravar_particao(mes, formatos, pyarrow)
+                particoes[mes] = {"impressao": impressao, "linhas": linhas, "gravada_em": agora}
+                gravadas.append(mes)
+
+            removidas = sorted(set(anteriores) - set(particoes))
+            for mes in removidas:
+                shutil.rmtree(os.path.join(self._destino, f"mes={mes}"), ignore_errors=True)
+
+            manifesto_temporario = f"{self._caminho_manifesto}.tmp"
+            with open(manifesto_temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump({"colunas": self.colunas, "formatos": formatos, "atualizado_em": agora, "particoes": particoes},
+                          arquivo, ensure_ascii=False, indent=2)
+            os.replace(manifesto_temporario, self._caminho_manifesto)
+        finally:
+            self.descartar()
+        return {"gravadas": gravadas, "inalteradas": len(particoes) - len(gravadas), "removidas": removidas}
+
+    def descartar(self):
+        """Apaga os arquivos temporários sem tocar nas partições (ex: a busca falhou no meio)."""
+        for arquivo, _ in self._arquivos.values():
+            if not arquivo.closed:
+                arquivo.close()
+        shutil.rmtree(self._temporario, ignore_errors=True)
@@ -0,0 +1,170 @@
+# fila_bugs.py - Reporte de bugs em lote, em segundo plano, agrupando falhas idênticas
+
+import os
+import copy
+import queue
+import hashlib
+import threading
+import requests
+from comum import criacao_lote, jira_cliente, idempotencia
+from comum.concorrencia import em_ordem
+from comum.transicoes import comentario_adf
+
+# --- Configuração ---
+INTERVALO_DESCARGA = float(os.getenv("BUGS_INTERVALO_DESCARGA", 10))  # segundos entre envios em segundo plano
+
+def assinatura(*partes):
+    """Identifica uma falha: reportes com as mesmas partes (ex: resumo, erro, funcionalidade) viram um único bug."""
+    conteudo = "\x1f".join(str(parte or "").strip() for parte in partes)
+    return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+
+def _com_ocorrencias(payload, ocorrencias):
+    """Copia o payload acrescentando à descrição o número de ocorrências agrupadas."""
+    if ocorrencias <= 1:
+        return payload
+    payload = copy.deepcopy(payload)
+    descricao = payload['fields'].setdefault('description', {"type": "doc", "version": 1, "content": []})
+    descricao['content'].append({"type": "paragraph", "content": [
+        {"type": "text", "text": f"Ocorrências nesta execução: {ocorrencias}"}]})
+    return payload
+
+class RelatorEmLote:
+    """
+    Recebe reportes sem bloquear quem chama (ex: a suíte do Robot Framework) e os envia
+    ao Jira por /issue/bulk, em uma thread de segundo plano a cada 'intervalo' segundos
+    e ao encerrar. Reportes com a mesma assinatura viram um único bug com a contagem de
+    ocorrências; as que chegam depois da criação viram um comentário no encerramento.
+    Com 'procurar_existente' (payload -> chave de um bug já aberto ou None), a busca por
+    duplicatas também roda em segundo plano, antes de cada criação; 'ao_criar' (chave, payload)
+    é avisado de cada bug criado.
+    """
+
+    def __init__(self, intervalo=INTERVALO_DESCARGA, procurar_existente=None, ao_criar=None):
+        self._intervalo = intervalo
+        self._procurar_existente = procurar_existente
+        self._ao_criar = ao_criar
+        self._fila = queue.Queue()
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+        self._pendentes = {}  # assinatura -> [payload, ocorrências]
+        self._criados = {}    # assinatura -> [chave, ocorrências na criação, ocorrências totais]
+        self._falhas = []
+
+    def enfileirar(self, assinatura_falha, payload, existente=None):
+        """
+        Coloca o reporte na fila e retorna imediatamente. Com 'existente' (chave de um bug
+        já aberto para a mesma falha), nada é criado: a ocorrência vira comentário nele.
+        """
+        self._fila.put((assinatura_falha, payload, existente))
+        if self._thread is None:
+            with self._trava:
+                if self._thread is None and self._intervalo > 0:
+                    self._thread = threading.Thread(target=self._laco, daemon=True)
+                    self._thread.start()
+
+    def _laco(self):
+        while not self._parar.wait(self._intervalo):
+            try:
+                self.descarregar()
+            except Exception as e:
+                # Qualquer erro (resposta inesperada, falha na busca por duplicatas...) não pode
+                # encerrar a thread: os reportes ficariam parados na fila
+                print(f"⚠️ Falha ao enviar bugs em lote (nova tentativa no próximo ciclo): {e}")
+
+    def _drenar(self):
+        """Agrupa os reportes da fila por assinatura."""
+        while True:
+            try:
+                chave, payload, existente = self._fila.get_nowait()
+            except queue.Empty:
+                return
+            if existente and chave not in self._criados:
+                self._criados[chave] = [existente, 0, 0]
+            if chave in self._criados:
+                self._criados[chave][2] += 1
+            elif chave in self._pendentes:
+                self._pendentes[chave][1] += 1
+            else:
+                self._pendentes[chave] = [payload, 1]
+
+    def _associar_existentes(self):
+        """Falhas novas parecidas com um bug já aberto viram recorrências dele em vez de um bug novo."""
+        for chave, (payload, ocorrencias) in list(self._pendentes.items()):
+            existente = self._procurar_existente(payload)
+            if existente:
+                del self._pendentes[chave]
+                self._criados[chave] = [existente, 0, ocorrencias]
+
+    def descarregar(self):
+        """Cria agora, em lote, os bugs pendentes. Retorna a quantidade criada."""
+        with self._trava:
+            self._drenar()
+            if self._procurar_existente:
+                self._associar_existentes()
+            if not self._pendentes:
+                return 0
+            lote, self._pendentes = self._pendentes, {}
+            # A etiqueta de idempotência vai no payload original: as cópias com a contagem de
+            # ocorrências e um reenvio no próximo ciclo usam a mesma, sem duplicar o bug
+            for payload, _ in lote.values():
+                idempotencia.marcar(payload)
+            itens = ((chave, _com_ocorrencias(payload, ocorrencias)) for chave, (payload, ocorrencias) in lote.items())
+            resolvidos = set()
+            criados = 0
+            try:
+                for chave, issue_key, erro in criacao_lote.criar_em_lote(itens):
+                    resolvidos.add(chave)
+                    resumo = lote[chave][0]['fields'].get('summary', '')
+                    if issue_key:
+                        criados += 1
+                        self._criados[chave] = [issue_key, lote[chave][1], lote[chave][1]]
+                        print(f"🎉 Bug criado: {issue_key} - {resumo} ({lote[chave][1]}x)")
+                        if self._ao_criar:
+                            self._ao_criar(issue_key, lote[chave][0])
+                    else:
+                        self._falhas.append((resumo, erro))
+                        print(f"❌ ERRO ao criar o bug '{resumo}': {erro}")
+            except Exception:
+                # Devolve à fila de pendentes o que não teve resultado, para o próximo ciclo
+                for chave, item in lote.items():
+                    if chave not in resolvidos:
+                        self._pendentes[chave] = item
+                raise
+            return criados
+
+    def _comentar_recorrencias(self):
+        """Comenta nos bugs já criados as ocorrências que chegaram depois da criação."""
+        recorrentes = [(issue_key, total - iniciais, total)
+                       for issue_key, iniciais, total in self._criados.values() if total > iniciais]
+
+        def comentar(item):
+            issue_key, novas, total = item
+            texto = f"A falha ocorreu mais {novas} vez(es) nesta execução (total: {total})."
+            try:
+                response = jira_cliente.post(f"/rest/api/3/issue/{issue_key}/comment", json={"body": comentario_adf(texto)})
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️ Falha ao registrar recorrências em {issue_key}: {e}")
+
+        for _ in em_ordem(comentar, recorrentes, criacao_lote.WORKERS_LOTE):
+            pass
+
+    def encerrar(self):
+        """
+        Para a thread de segundo plano, envia o que falta e registra as recorrências.
+        Retorna um resumo {'bugs': {chave_issue: ocorrências}, 'falhas': [(resumo, erro)]}.
+        """
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.descarregar()
+        except Exception as e:
+            print(f"❌ ERRO ao enviar os bugs restantes: {e}")
+        with self._trava:
+            self._comentar_recorrencias()
+            return {
+                "bugs": {issue_key: total for issue_key, _, total in self._criados.values()},
+                "falhas": list(self._falhas),
+            }
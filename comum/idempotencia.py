@@ -0,0 +1,158 @@
+# idempotencia.py - Criação de issues com novas tentativas, sem duplicar issues
+
+import os
+import time
+import random
+import secrets
+import requests
+from comum import busca, jira_cliente
+
+# --- Configuração das Tentativas (pode ser sobrescrita pelo .env) ---
+TENTATIVAS = int(os.getenv("JIRA_TENTATIVAS_CRIACAO", 4))
+ESPERA_BASE = float(os.getenv("JIRA_ESPERA_BASE", 1.0))      # segundos antes da 1ª nova tentativa
+ESPERA_MAXIMA = float(os.getenv("JIRA_ESPERA_MAXIMA", 16.0))
+
+# Etiqueta temporária de cada criação: "idem-" + identificador aleatório. Vai no POST para que
+# as novas tentativas encontrem a issue e é removida quando a criação é confirmada (ver
+# remover_rotulo). Relatórios e exportações ignoram as que sobrarem (ver rotulos_visiveis).
+PREFIXO_ROTULO = "idem-"
+
+def rotulos_visiveis(labels):
+    """Remove da lista as etiquetas internas de idempotência."""
+    return [label for label in labels if not label.startswith(PREFIXO_ROTULO)]
+
+def nova_chave_idempotencia():
+    """
+    Gera a etiqueta de idempotência de uma criação. É aleatória (e não um hash do conteúdo)
+    para valer só para as tentativas desta criação: uma issue idêntica criada antes, de
+    propósito (ex: a mesma linha do CSV importada de novo, uma falha recorrente do Robot),
+    nunca é confundida com um reenvio.
+    """
+    return PREFIXO_ROTULO + secrets.token_hex(10)
+
+def marcar(payload):
+    """
+    Adiciona a etiqueta de idempotência ao payload (antes da primeira tentativa) e a retorna.
+    Se o payload já tiver uma, ela é mantida: as novas tentativas reutilizam a mesma etiqueta.
+    """
+    fields = payload.setdefault('fields', {})
+    existente = next((l for l in fields.get('labels', []) if l.startswith(PREFIXO_ROTULO)), None)
+    if existente:
+        return existente
+    rotulo = nova_chave_idempotencia()
+    fields['labels'] = [*fields.get('labels', []), rotulo]
+    return rotulo
+
+def espera(tentativa):
+    """Backoff exponencial com jitter completo para a n-ésima nova tentativa (1, 2, ...)."""
+    return random.uniform(0, min(ESPERA_MAXIMA, ESPERA_BASE * 2 ** tentativa))
+
+def _jql_rotulos(rotulos):
+    return "labels in ({})".format(", ".join(f'"{r}"' for r in rotulos))
+
+def buscar_existentes(rotulos):
+    """Retorna {etiqueta: chave} das issues que já existem com alguma das etiquetas informadas."""
+    if not rotulos:
+        return {}
+    params = {'jql': _jql_rotulos(rotulos), 'fields': 'labels', 'maxResults': len(rotulos)}
+    response = jira_cliente.get(busca.ENDPOINT_BUSCA, params=params)
+    response.raise_for_status()
+    pendentes = set(rotulos)
+    encontrados = {}
+    for issue in response.json().get('issues', []):
+        for label in issue['fields'].get('labels', []):
+            if label in pendentes:
+                encontrados.setdefault(label, issue['key'])
+    return encontrados
+
+def resposta_ambigua(status):
+    """
+    Respostas em que o Jira pode (ou não) ter criado a issue antes de falhar. A 429 não entra:
+    o Jira a rejeita sem processar, e jira_cliente.requisitar já a reenvia.
+    """
+    return status >= 500
+
+def remover_rotulo(issue_key, rotulo):
+    """
+    Tira a etiqueta de idempotência da issue depois de confirmada a criação, para que não se
+    acumulem etiquetas no projeto. Uma falha aqui só gera aviso: a issue já foi criada.
+    """
+    try:
+        response = jira_cliente.put(f"/rest/api/3/issue/{issue_key}", json={"update": {"labels": [{"remove": rotulo}]}})
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Não foi possível remover a etiqueta interna '{rotulo}' de {issue_key}: {e}")
+
+def _criar_com_tentativas(payload, rotulo, tentativas):
+    ultimo_erro = None
+    for tentativa in range(tentativas):
+        if tentativa:
+            time.sleep(espera(tentativa))
+            try:
+                existente = buscar_existentes([rotulo]).get(rotulo)
+            except requests.exceptions.RequestException as e:
+                ultimo_erro = e
+                continue  # Sem como confirmar, não reenvia às cegas nesta rodada
+            if existente:
+                return existente
+        try:
+            response = jira_cliente.post("/rest/api/3/issue", json=payload)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            ultimo_erro = e
+            continue
+        if resposta_ambigua(response.status_code):
+            ultimo_erro = requests.exceptions.HTTPError(f"HTTP {response.status_code}", response=response)
+            continue
+        response.raise_for_status()
+        return response.json()['key']
+    raise ultimo_erro
+
+def criar_issue(payload, tentativas=TENTATIVAS):
+    """
+    Cria a issue com novas tentativas (backoff exponencial + jitter) em falhas de rede e 5xx.
+    Antes de cada reenvio, procura a etiqueta de idempotência no Jira: se o POST anterior
+    foi gravado apesar do timeout/erro 5xx, devolve a issue existente em vez de duplicar.
+    As 429 ficam com jira_cliente.requisitar. Confirmada a criação, a etiqueta é removida.
+    Retorna a chave criada; erros definitivos (4xx ou tentativas esgotadas) são relançados
+    como requests.exceptions.RequestException.
+    """
+    rotulo = marcar(payload)
+    issue_key = _criar_com_tentativas(payload, rotulo, tentativas)
+    remover_rotulo(issue_key, rotulo)
+    return issue_key
+
+async def _criar_com_tentativas_async(cliente, payload, rotulo, tentativas):
+    # Importados aqui: os scripts síncronos usam este módulo sem carregar asyncio/aiohttp
+    import asyncio
+    from comum.jira_assincrono import ErroJiraAsync, ErroRespostaJira
+    ultimo_erro = None
+    for tentativa in range(tentativas):
+        if tentativa:
+            await asyncio.sleep(espera(tentativa))
+            try:
+                dados = await cliente.get(busca.ENDPOINT_BUSCA, params={'jql': _jql_rotulos([rotulo]), 'fields': 'key', 'maxResults': 1})
+            except ErroJiraAsync as e:
+                ultimo_erro = e
+                continue
+            if dados.get('issues'):
+                return dados['issues'][0]['key']
+        try:
+            return (await cliente.post("/rest/api/3/issue", json=payload))['key']
+        except ErroRespostaJira as e:
+            if not resposta_ambigua(e.status):
+                raise
+            ultimo_erro = e
+        except ErroJiraAsync as e:
+            ultimo_erro = e
+    raise ultimo_erro
+
+async def criar_issue_async(cliente, payload, tentativas=TENTATIVAS):
+    """Equivalente assíncrono de criar_issue, usando um ClienteJiraAsync. Relança ErroJiraAsync."""
+    from comum.jira_assincrono import ErroJiraAsync
+    rotulo = marcar(payload)
+    issue_key = await _criar_com_tentativas_async(cliente, payload, rotulo, tentativas)
+    try:
+        await cliente.put(f"/rest/api/3/issue/{issue_key}", json={"update": {"labels": [{"remove": rotulo}]}})
+    except ErroJiraAsync as e:
+        print(f"⚠️ Não foi possível remover a etiqueta interna '{rotulo}' de {issue_key}: {e}")
+    return issue_key
@@ -0,0 +1,263 @@
+# indice_duplicatas.py - Índice local de similaridade dos bugs abertos (MinHash + LSH sobre trigramas)
+
+import os
+import re
+import json
+import math
+import time
+import zlib
+import threading
+import unicodedata
+from collections import Counter
+from comum import busca, adf
+from comum.jira_cliente import JIRA_PROJECT_KEY, raiz_projeto
+
+# --- Configuração ---
+CAMINHO_INDICE = os.getenv("BUGS_INDICE_DUPLICATAS", str(raiz_projeto / '.cache' / 'indice_duplicatas.json'))
+LIMIAR_SIMILARIDADE = float(os.getenv("BUGS_LIMIAR_DUPLICATA", 0.6))  # Jaccard estimado mínimo
+VALIDADE_SEGUNDOS = int(os.getenv("BUGS_VALIDADE_INDICE", 300))        # idade máxima antes de atualizar
+# 32 posições em 8 bandas de 4: pares com Jaccard acima de ~0,6 caem no mesmo balde
+# em pelo menos uma banda com alta probabilidade (limiar do LSH ≈ (1/8)^(1/4)).
+PERMUTACOES = 32
+BANDAS = 8
+LINHAS_POR_BANDA = PERMUTACOES // BANDAS
+# Trigramas presentes em mais desta fração dos bugs (ex: o "[Automação] Falha em" de todo bug
+# gerado pelo Robot) são ignorados: não distinguem um bug do outro e inflariam a similaridade.
+FRACAO_TRIGRAMA_COMUM = 0.2
+MINIMO_BUGS_PARA_FILTRO = 20
+MARGEM_MINUTOS = 5
+CAMPOS_INDICE = 'summary,description,status'
+
+_REGEX_NAO_PALAVRA = re.compile(r'[^a-z0-9]+')
+_REGEX_RESULTADO_ATUAL = re.compile(r'\*Resultado Atual:\*\s*(.*?)(?:\n\s*\*[^*\n]+:\*|\Z)', re.DOTALL)
+
+# --- Texto e Esboço ---
+
+def normalizar(texto):
+    """Minúsculas, sem acentos e com pontuação trocada por espaço."""
+    sem_acentos = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return _REGEX_NAO_PALAVRA.sub(' ', sem_acentos.lower()).strip()
+
+def texto_comparavel(resumo, descricao=""):
+    """
+    Texto usado na comparação: o resumo mais o "Resultado Atual" da descrição (formato
+    gerado por reportar_bug) ou, se ele não existir, o começo da descrição.
+    """
+    trecho = _REGEX_RESULTADO_ATUAL.search(descricao or "")
+    complemento = trecho.group(1) if trecho else (descricao or "")[:300]
+    return f"{resumo} {complemento}"
+
+_MASCARA = 0xFFFFFFFF
+_BITS_POSICAO = PERMUTACOES.bit_length() - 1  # PERMUTACOES deve ser potência de 2
+_DESLOCAMENTO_VAZIA = 0x9E3779B1              # soma às posições vazias preenchidas por rotação
+
+def trigramas(texto):
+    """Hashes dos trigramas de caracteres do texto normalizado."""
+    normalizado = f" {normalizar(texto)} "
+    return {zlib.crc32(normalizado[i:i + 3].encode()) for i in range(len(normalizado) - 2)}
+
+def esboco(hashes, ignorar=frozenset()):
+    """
+    Assinatura MinHash de "permutação única" dos trigramas (ver trigramas()): cada trigrama
+    é hasheado uma vez e cai em uma das PERMUTACOES posições, que guardam o menor valor.
+    Posições vazias copiam a próxima posição preenchida (densificação por rotação), mantendo
+    a assinatura compatível com o LSH. Custa O(trigramas), e não O(trigramas x permutações).
+    """
+    minimos = [None] * PERMUTACOES
+    for trigrama in hashes:
+        if trigrama in ignorar:
+            continue
+        h = (trigrama * 0x9E3779B1) & _MASCARA
+        posicao, valor = h >> (32 - _BITS_POSICAO), h & (_MASCARA >> _BITS_POSICAO)
+        if minimos[posicao] is None or valor < minimos[posicao]:
+            minimos[posicao] = valor
+    if all(m is None for m in minimos):
+        return ()
+    for posicao in range(PERMUTACOES):
+        distancia = 0
+        while minimos[(posicao + distancia) % PERMUTACOES] is None:
+            distancia += 1
+        if distancia:
+            minimos[posicao] = -(minimos[(posicao + distancia) % PERMUTACOES] + distancia * _DESLOCAMENTO_VAZIA)
+    return tuple(minimos)
+
+def similaridade(esboco_a, esboco_b):
+    """Estimativa de Jaccard: fração das posições em que os dois esboços coincidem."""
+    if not esboco_a or not esboco_b:
+        return 0.0
+    return sum(1 for x, y in zip(esboco_a, esboco_b) if x == y) / PERMUTACOES
+
+def _baldes(valores):
+    """Chaves LSH do esboço: uma por banda de LINHAS_POR_BANDA posições."""
+    return [(banda, valores[banda * LINHAS_POR_BANDA:(banda + 1) * LINHAS_POR_BANDA]) for banda in range(BANDAS)]
+
+# --- Índice ---
+
+class IndiceDuplicatas:
+    """
+    Esboços MinHash dos bugs abertos, agrupados em baldes LSH (banda -> bugs). A consulta só
+    compara o esboço novo com os bugs que caem em algum balde em comum, então custa
+    O(candidatos), não O(bugs). Persistido em disco e atualizado de forma incremental pelo
+    campo 'updated'.
+    """
+
+    def __init__(self, caminho=CAMINHO_INDICE):
+        self._caminho = caminho
+        self._trava = threading.Lock()
+        self._bugs = {}        # chave -> (esboço, resumo)
+        self._baldes = {}      # (banda, valores) -> set(chaves)
+        self._comuns = frozenset()  # trigramas ignorados (ver FRACAO_TRIGRAMA_COMUM)
+        self.atualizado_em = None
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                dados = json.load(arquivo)
+            for chave, (valores, resumo) in dados.get('bugs', {}).items():
+                self._incluir(chave, tuple(valores), resumo)
+            self._comuns = frozenset(dados.get('comuns', []))
+            self.atualizado_em = dados.get('atualizado_em')
+        except (OSError, ValueError):
+            pass
+
+    def __len__(self):
+        return len(self._bugs)
+
+    def _incluir(self, chave, valores, resumo):
+        self._remover(chave)
+        self._bugs[chave] = (valores, resumo)
+        for balde in _baldes(valores):
+            self._baldes.setdefault(balde, set()).add(chave)
+
+    def _remover(self, chave):
+        anterior = self._bugs.pop(chave, None)
+        if anterior:
+            for balde in _baldes(anterior[0]):
+                chaves = self._baldes.get(balde)
+                if chaves:
+                    chaves.discard(chave)
+                    if not chaves:
+                        del self._baldes[balde]
+
+    def adicionar(self, chave, resumo, descricao=""):
+        """Inclui (ou atualiza) um bug no índice, ex: logo depois de criá-lo."""
+        with self._trava:
+            self._incluir(chave, esboco(trigramas(texto_comparavel(resumo, descricao)), self._comuns), resumo)
+
+    def reconstruir(self, bugs):
+        """
+        Refaz o índice do zero a partir de {chave: (resumo, descricao)}, recalculando antes
+        quais trigramas são comuns demais para distinguir bugs.
+        """
+        conjuntos = {chave: (trigramas(texto_comparavel(resumo, descricao)), resumo)
+                     for chave, (resumo, descricao) in bugs.items()}
+        frequencia = Counter(h for hashes, _ in conjuntos.values() for h in hashes)
+        comuns = frozenset()
+        if len(conjuntos) >= MINIMO_BUGS_PARA_FILTRO:
+            comuns = frozenset(h for h, n in frequencia.items() if n > FRACAO_TRIGRAMA_COMUM * len(conjuntos))
+        with self._trava:
+            self._bugs, self._baldes, self._comuns = {}, {}, comuns
+            for chave, (hashes, resumo) in conjuntos.items():
+                self._incluir(chave, esboco(hashes, comuns), resumo)
+
+    def procurar(self, resumo, descricao="", limiar=LIMIAR_SIMILARIDADE):
+        """Retorna (chave, resumo, similaridade) do bug aberto mais parecido acima do limiar, ou None."""
+        consulta = esboco(trigramas(texto_comparavel(resumo, descricao)), self._comuns)
+        if not consulta:
+            return None
+        with self._trava:
+            candidatos = set()
+            for balde in _baldes(consulta):
+                candidatos.update(self._baldes.get(balde, ()))
+            melhor = None
+            for chave in candidatos:
+                valores, resumo_bug = self._bugs[chave]
+                nota = similaridade(consulta, valores)
+                if nota >= limiar and (melhor is None or nota > melhor[2]):
+                    melhor = (chave, resumo_bug, nota)
+            return melhor
+
+    # --- Sincronização com o Jira ---
+
+    def atualizar(self, completo=False):
+        """
+        Busca os bugs alterados desde a última atualização (ou todos os abertos, na primeira vez):
+        bugs resolvidos saem do índice, os demais entram ou são atualizados. Retorna o total indexado.
+        """
+        inicio = time.time()
+        incremental = bool(self.atualizado_em) and not completo
+        jql = f'project = "{JIRA_PROJECT_KEY}" AND issuetype = Bug'
+        if incremental:
+            minutos = math.ceil((inicio - self.atualizado_em) / 60) + MARGEM_MINUTOS
+            jql += f' AND updated >= "-{minutos}m"'
+        else:
+            jql += ' AND statusCategory != Done'
+
+        resolvidos = set()
+        abertos = {}
+        for issue in busca.iterar_issues_paralelo(jql, fields=CAMPOS_INDICE):
+            fields = issue['fields']
+            if ((fields.get('status') or {}).get('statusCategory') or {}).get('key') == 'done':
+                resolvidos.add(issue['key'])
+            else:
+                abertos[issue['key']] = (fields.get('summary', ''), adf.para_texto(fields.get('description')))
+
+        if not incremental:
+            self.reconstruir(abertos)
+        with self._trava:
+            if incremental:
+                for chave in resolvidos:
+                    self._remover(chave)
+                for chave, (resumo, descricao) in abertos.items():
+                    self._incluir(chave, esboco(trigramas(texto_comparavel(resumo, descricao)), self._comuns), resumo)
+            self.atualizado_em = inicio
+            self._salvar()
+            return len(self._bugs)
+
+    def desatualizado(self):
+        return not self.atualizado_em or time.time() - self.atualizado_em > VALIDADE_SEGUNDOS
+
+    def _salvar(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self._caminho)), exist_ok=True)
+        temporario = f"{self._caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump({"atualizado_em": self.atualizado_em, "comuns": sorted(self._comuns),
+                       "bugs": {chave: [list(valores), resumo] for chave, (valores, resumo) in self._bugs.items()}},
+                      arquivo, ensure_ascii=False)
+        os.replace(temporario, self._caminho)
+
+_indice = None
+_trava_indice = threading.Lock()
+_atualizacao_em_curso = None  # thread da atualização em segundo plano, se houver
+
+def _atualizar_em_segundo_plano(indice):
+    try:
+        indice.atualizar()
+    except Exception as e:
+        print(f"⚠️ Não foi possível atualizar o índice de duplicatas (segue com o anterior): {e}")
+
+def indice_padrao():
+    """
+    Índice compartilhado do processo, carregado do disco. Só a primeira atualização (sem nada em
+    disco) espera o Jira; depois, quando passa da validade, o índice atual é devolvido na hora e
+    a atualização roda em uma thread de segundo plano (uma por vez).
+    Lança requests.exceptions.RequestException se a primeira atualização falhar.
+    """
+    global _indice, _atualizacao_em_curso
+    with _trava_indice:
+        if _indice is None:
+            _indice = IndiceDuplicatas()
+        if _indice.atualizado_em is None:
+            _indice.atualizar()
+        elif _indice.desatualizado() and (_atualizacao_em_curso is None or not _atualizacao_em_curso.is_alive()):
+            _atualizacao_em_curso = threading.Thread(target=_atualizar_em_segundo_plano, args=(_indice,),
+                                                     name="indice-duplicatas", daemon=True)
+            _atualizacao_em_curso.start()
+        return _indice
+
+def registrar_criado(chave, resumo, descricao=""):
+    """
+    Inclui um bug recém-criado no índice compartilhado, só em memória: não vai ao Jira nem ao
+    disco. Se o índice ainda não foi carregado, a próxima atualização incremental traz o bug.
+    """
+    indice = _indice
+    if indice is not None:
+        indice.adicionar(chave, resumo, descricao)
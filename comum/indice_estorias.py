@@ -0,0 +1,89 @@
+# indice_estorias.py - Índice título -> chave das estórias do projeto, carregado uma vez e com validade
+
+import os
+import json
+import time
+import threading
+from comum import busca
+from comum.jira_cliente import JIRA_PROJECT_KEY, raiz_projeto
+
+# --- Configuração ---
+CAMINHO_INDICE = os.getenv("JIRA_INDICE_ESTORIAS", str(raiz_projeto / '.cache' / 'estorias.json'))
+VALIDADE_SEGUNDOS = int(os.getenv("JIRA_VALIDADE_ESTORIAS", 900))
+# Tipos que não são requisitos: tudo o mais no projeto (Story, Estória, Épico...) entra no índice
+TIPOS_IGNORADOS = ("Caso de Teste", "Bug")
+
+def normalizar(titulo):
+    return " ".join((titulo or "").split()).casefold()
+
+class IndiceEstorias:
+    """
+    Mapa título -> chave de todas as estórias do projeto, buscado de uma vez (paginado) e
+    reaproveitado até expirar. Substitui uma busca "summary ~" (o tipo de JQL mais caro
+    do Jira) por Caso de Teste vinculado.
+    """
+
+    def __init__(self, caminho=CAMINHO_INDICE, validade=VALIDADE_SEGUNDOS):
+        self._caminho = caminho
+        self._validade = validade
+        self._trava = threading.Lock()
+        self._titulos = {}   # título normalizado -> chave
+        self.carregado_em = None
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                dados = json.load(arquivo)
+            self._titulos = dados.get('titulos', {})
+            self.carregado_em = dados.get('carregado_em')
+        except (OSError, ValueError):
+            pass
+
+    def expirado(self):
+        return not self.carregado_em or time.time() - self.carregado_em > self._validade
+
+    def carregar(self):
+        """Busca todas as estórias do projeto e substitui o índice. Retorna a quantidade."""
+        tipos = ", ".join(f'"{t}"' for t in TIPOS_IGNORADOS)
+        jql = f'project = "{JIRA_PROJECT_KEY}" AND issuetype not in ({tipos})'
+        titulos = {}
+        for issue in busca.iterar_issues_paralelo(jql, fields='summary'):
+            titulos.setdefault(normalizar(issue['fields'].get('summary')), issue['key'])
+        with self._trava:
+            self._titulos = titulos
+            self.carregado_em = time.time()
+            os.makedirs(os.path.dirname(os.path.abspath(self._caminho)), exist_ok=True)
+            temporario = f"{self._caminho}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump({"carregado_em": self.carregado_em, "titulos": titulos}, arquivo, ensure_ascii=False)
+            os.replace(temporario, self._caminho)
+        return len(titulos)
+
+    def procurar(self, titulo):
+        """
+        Retorna a chave da estória cujo título é 'titulo' ou, se não houver igual, a primeira
+        cujo título o contém (ex: 'US-AUTH-001' encontra 'US-AUTH-001 - Login'). None se não achar.
+        """
+        alvo = normalizar(titulo)
+        if not alvo:
+            return None
+        with self._trava:
+            if alvo in self._titulos:
+                return self._titulos[alvo]
+            return next((chave for texto, chave in self._titulos.items() if alvo in texto), None)
+
+    def registrar(self, titulo, chave):
+        """Acrescenta uma estória encontrada fora do índice (ex: criada depois do carregamento)."""
+        with self._trava:
+            self._titulos[normalizar(titulo)] = chave
+
+_indice = None
+_trava_indice = threading.Lock()
+
+def indice_padrao():
+    """Índice compartilhado do processo, recarregado do Jira quando passa da validade."""
+    global _indice
+    with _trava_indice:
+        if _indice is None:
+            _indice = IndiceEstorias()
+        if _indice.expirado():
+            _indice.carregar()
+        return _indice
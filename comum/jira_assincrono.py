@@ -0,0 +1,120 @@
+# jira_assincrono.py - Cliente asyncio para a API do Jira (requer o pacote opcional 'aiohttp')
+
+import os
+import json
+from comum import limitador
+from comum.transicoes import escolher_transicao
+from comum.jira_cliente import (
+    JIRA_USER_EMAIL, JIRA_API_TOKEN, HEADERS_PADRAO, TIMEOUT_CONEXAO, TIMEOUT_LEITURA, montar_url
+)
+
+# Número máximo de requisições em voo ao mesmo tempo (por cliente)
+CONCORRENCIA_ASYNC = int(os.getenv("JIRA_CONCORRENCIA_ASYNC", 20))
+
+class ErroJiraAsync(Exception):
+    """Falha de uma requisição assíncrona ao Jira (rede, timeout ou resposta de erro)."""
+
+class ErroRespostaJira(ErroJiraAsync):
+    """Resposta HTTP de erro (4xx/5xx) devolvida pelo Jira a uma requisição assíncrona."""
+
+    def __init__(self, status, texto):
+        super().__init__(f"HTTP {status}: {texto[:300]}")
+        self.status = status
+        self.texto = texto
+
+class ClienteJiraAsync:
+    """
+    Sessão aiohttp compartilhada (keep-alive) com um semáforo que limita as requisições
+    simultâneas. Uso:
+
+        async with ClienteJiraAsync() as cliente:
+            chaves = await asyncio.gather(*(reportar_bug_async(cliente, ...) for ... in falhas))
+    """
+
+    def __init__(self, concorrencia=CONCORRENCIA_ASYNC):
+        try:
+            import aiohttp
+        except ImportError as e:
+            raise ImportError("O cliente assíncrono requer o pacote 'aiohttp' (pip install aiohttp).") from e
+        import asyncio  # só importado por quem usa o cliente: os scripts síncronos não pagam a importação
+        self._aiohttp = aiohttp
+        self._semaforo = asyncio.Semaphore(concorrencia)
+        self._concorrencia = concorrencia
+        self._sessao = None
+
+    async def __aenter__(self):
+        aiohttp = self._aiohttp
+        self._sessao = aiohttp.ClientSession(
+            auth=aiohttp.BasicAuth(JIRA_USER_EMAIL or "", JIRA_API_TOKEN or ""),
+            headers=HEADERS_PADRAO,
+            timeout=aiohttp.ClientTimeout(sock_connect=TIMEOUT_CONEXAO, sock_read=TIMEOUT_LEITURA),
+            connector=aiohttp.TCPConnector(limit=self._concorrencia),
+        )
+        return self
+
+    async def __aexit__(self, *_):
+        await self._sessao.close()
+
+    async def requisitar(self, metodo, caminho, **kwargs):
+        """
+        Executa a requisição respeitando o semáforo e o limitador compartilhado (reenviando
+        respostas 429); retorna o JSON da resposta (ou None).
+        """
+        import asyncio
+        controle = limitador.limitador_padrao if limitador.ATIVO else None
+        for tentativa in range(limitador.TENTATIVAS_429 + 1):
+            async with self._semaforo:
+                if controle:
+                    await controle.adquirir_async()
+                try:
+                    async with self._sessao.request(metodo, montar_url(caminho), **kwargs) as resposta:
+                        texto = await resposta.text()
+                except (self._aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if controle:
+                        controle.registrar(None)
+                    raise ErroJiraAsync(f"Falha de comunicação com o Jira: {e!r}") from e
+            if not controle:
+                break
+            controle.registrar(resposta.status, resposta.headers)
+            if resposta.status != 429:
+                break
+        if resposta.status >= 400:
+            raise ErroRespostaJira(resposta.status, texto)
+        return json.loads(texto) if texto else None
+
+    async def get(self, caminho, **kwargs):
+        return await self.requisitar("GET", caminho, **kwargs)
+
+    async def post(self, caminho, **kwargs):
+        return await self.requisitar("POST", caminho, **kwargs)
+
+    async def put(self, caminho, **kwargs):
+        return await self.requisitar("PUT", caminho, **kwargs)
+
+    async def delete(self, caminho, **kwargs):
+        return await self.requisitar("DELETE", caminho, **kwargs)
+
+    # --- Operações comuns a bugs e casos de teste ---
+
+    async def adicionar_comentario(self, issue_key, comentario):
+        """Adiciona um comentário (texto simples) a uma issue."""
+        payload = {"body": {"type": "doc", "version": 1, "content": [{"type": "paragraph", "content": [{"type": "text", "text": comentario}]}]}}
+        return await self.post(f"/rest/api/3/issue/{issue_key}/comment", json=payload)
+
+    async def transicionar(self, issue_key, status_destino, comentario=None):
+        """
+        Move a issue para a transição cujo nome (ou status de destino) é 'status_destino'.
+        Retorna True se a transição existia e foi aplicada, False caso contrário.
+        """
+        dados = await self.get(f"/rest/api/3/issue/{issue_key}/transitions")
+        transicao = escolher_transicao(dados.get('transitions', []), status_destino)
+        if not transicao:
+            return False
+        await self.post(f"/rest/api/3/issue/{issue_key}/transitions", json={"transition": {"id": transicao['id']}})
+        if comentario:
+            await self.adicionar_comentario(issue_key, comentario)
+        return True
+
+    async def excluir(self, issue_key):
+        """Exclui permanentemente uma issue (sem confirmação interativa)."""
+        await self.delete(f"/rest/api/3/issue/{issue_key}")
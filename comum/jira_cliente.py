@@ -0,0 +1,115 @@
+# jira_cliente.py - Cliente HTTP compartilhado para a API do Jira
+
+import os
+import sys
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from pathlib import Path
+from comum import limitador
+
+# --- Configuração Padrão ---
+# O .env é lido uma única vez aqui; os scripts importam as credenciais deste módulo.
+raiz_projeto = Path(__file__).resolve().parent.parent
+load_dotenv(dotenv_path=raiz_projeto / '.env')
+
+JIRA_URL = (os.getenv("JIRA_URL") or "").rstrip('/')
+JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
+JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
+JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
+
+# --- Ajustes de Conexão (podem ser sobrescritos pelo .env) ---
+TIMEOUT_CONEXAO = float(os.getenv("JIRA_TIMEOUT_CONEXAO", 5))
+TIMEOUT_LEITURA = float(os.getenv("JIRA_TIMEOUT_LEITURA", 30))
+TAMANHO_POOL = int(os.getenv("JIRA_TAMANHO_POOL", 20))
+
+HEADERS_PADRAO = {"Accept": "application/json", "Content-Type": "application/json"}
+
+# --- Validação da Configuração ---
+CREDENCIAIS = ("JIRA_URL", "JIRA_USER_EMAIL", "JIRA_API_TOKEN")
+_validacoes = {}
+
+def validar_configuracao(exigir_projeto=True, encerrar=True):
+    """
+    Confere (uma única vez por processo) se as variáveis obrigatórias do .env foram definidas.
+    Se faltar alguma, informa quais e encerra o programa; com encerrar=False apenas avisa
+    e retorna False (ex: listener do Robot, que não deve derrubar a suíte).
+    """
+    obrigatorias = CREDENCIAIS + (("JIRA_PROJECT_KEY",) if exigir_projeto else ())
+    if obrigatorias not in _validacoes:
+        faltando = [nome for nome in obrigatorias if not globals()[nome]]
+        if faltando:
+            print(f"❌ ERRO: Verifique se as variáveis {', '.join(faltando)} estão no arquivo .env.")
+        _validacoes[obrigatorias] = not faltando
+    if not _validacoes[obrigatorias] and encerrar:
+        sys.exit(1)
+    return _validacoes[obrigatorias]
+
+_sessao = None
+_trava_sessao = threading.Lock()
+
+def obter_sessao():
+    """
+    Retorna a sessão HTTP compartilhada (keep-alive), criando-a na primeira chamada.
+    Todas as requisições reaproveitam as mesmas conexões TCP/TLS do pool.
+    """
+    global _sessao
+    if _sessao is None:
+        with _trava_sessao:
+            if _sessao is None:
+                sessao = requests.Session()
+                sessao.auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
+                sessao.headers.update(HEADERS_PADRAO)
+                adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=TAMANHO_POOL)
+                sessao.mount("https://", adaptador)
+                sessao.mount("http://", adaptador)
+                _sessao = sessao
+    return _sessao
+
+def montar_url(caminho):
+    """Monta a URL completa a partir de um caminho da API (ex: '/rest/api/3/issue')."""
+    if caminho.startswith(("http://", "https://")):
+        return caminho
+    return f"{JIRA_URL}{caminho}"
+
+def link_issue(issue_key):
+    """Retorna o link de navegação de uma issue no Jira."""
+    return f"{JIRA_URL}/browse/{issue_key}"
+
+def requisitar(metodo, caminho, **kwargs):
+    """
+    Executa uma requisição na API do Jira usando a sessão e o timeout padrão.
+    Passa pelo limitador compartilhado e reenvia automaticamente respostas 429
+    (o Jira rejeitou a requisição sem processá-la, então reenviar é seguro).
+    """
+    kwargs.setdefault("timeout", (TIMEOUT_CONEXAO, TIMEOUT_LEITURA))
+    if not limitador.ATIVO:
+        return obter_sessao().request(metodo, montar_url(caminho), **kwargs)
+
+    controle = limitador.limitador_padrao
+    for tentativa in range(limitador.TENTATIVAS_429 + 1):
+        controle.adquirir()
+        try:
+            response = obter_sessao().request(metodo, montar_url(caminho), **kwargs)
+        except requests.exceptions.RequestException:
+            controle.registrar(None)
+            raise
+        controle.registrar(response.status_code, response.headers)
+        if response.status_code != 429:
+            break
+        if tentativa < limitador.TENTATIVAS_429:
+            response.close()  # libera a conexão (necessário com stream=True) antes de reenviar
+    return response
+
+def get(caminho, **kwargs):
+    return requisitar("GET", caminho, **kwargs)
+
+def post(caminho, **kwargs):
+    return requisitar("POST", caminho, **kwargs)
+
+def put(caminho, **kwargs):
+    return requisitar("PUT", caminho, **kwargs)
+
+def delete(caminho, **kwargs):
+    return requisitar("DELETE", caminho, **kwargs)
@@ -0,0 +1,175 @@
+# limitador.py - Controle de vazão adaptativo (token bucket + AIMD) para a API do Jira
+
+import os
+import time
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# --- Configuração do Limitador (pode ser sobrescrita pelo .env) ---
+ATIVO = os.getenv("JIRA_LIMITADOR", "1") != "0"
+TAXA_INICIAL = float(os.getenv("JIRA_TAXA_INICIAL", 10))        # requisições por segundo
+TAXA_MINIMA = float(os.getenv("JIRA_TAXA_MINIMA", 0.5))
+TAXA_MAXIMA = float(os.getenv("JIRA_TAXA_MAXIMA", 100))
+CONCORRENCIA_MAXIMA = int(os.getenv("JIRA_CONCORRENCIA_MAXIMA", 20))
+TENTATIVAS_429 = int(os.getenv("JIRA_TENTATIVAS_429", 5))
+
+INCREMENTO_TAXA = 0.5         # aumento aditivo (req/s) a cada resposta bem-sucedida
+FATOR_REDUCAO = 0.5           # redução multiplicativa ao receber 429/503
+FATOR_QUASE_NO_LIMITE = 0.9   # redução suave quando o Jira avisa que estamos perto da cota
+PAUSA_PADRAO = 5.0            # segundos de pausa em um 429 sem Retry-After
+ESPERA_VAGA = 0.05            # intervalo de nova tentativa quando todas as vagas estão ocupadas
+STATUS_LIMITADOS = (429, 503)
+
+def _segundos_ate(valor, agora):
+    """Interpreta Retry-After / X-RateLimit-Reset (segundos ou data HTTP/ISO) como segundos a esperar."""
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        try:
+            data = datetime.fromisoformat(valor.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return max(0.0, data.timestamp() - agora)
+
+class Limitador:
+    """
+    Token bucket cuja taxa e número de requisições simultâneas se ajustam por AIMD:
+    cada resposta bem-sucedida soma um pouco à taxa; cada 429/503 a corta pela metade
+    e pausa todas as requisições pelo tempo pedido em Retry-After.
+    É compartilhado entre threads (cliente síncrono) e corrotinas (cliente assíncrono).
+    """
+
+    def __init__(self, taxa=TAXA_INICIAL, taxa_minima=TAXA_MINIMA, taxa_maxima=TAXA_MAXIMA,
+                 concorrencia_maxima=CONCORRENCIA_MAXIMA):
+        self._trava = threading.Lock()
+        self._taxa = taxa
+        self._taxa_minima = taxa_minima
+        self._taxa_maxima = taxa_maxima
+        self._concorrencia_maxima = concorrencia_maxima
+        self._concorrencia = max(1, min(concorrencia_maxima, int(taxa)))
+        self._tokens = 1.0
+        self._ultimo_abastecimento = time.monotonic()
+        self._pausado_ate = 0.0
+        self._em_voo = 0
+        self._sucessos_seguidos = 0
+        self._limitadas = 0
+
+    # --- Aquisição ---
+
+    def _tentar_adquirir(self):
+        """Reserva um token e uma vaga; retorna 0 se conseguiu ou quantos segundos esperar."""
+        with self._trava:
+            agora = time.monotonic()
+            if agora < self._pausado_ate:
+                return self._pausado_ate - agora
+            capacidade = max(1.0, self._taxa)
+            self._tokens = min(capacidade, self._tokens + (agora - self._ultimo_abastecimento) * self._taxa)
+            self._ultimo_abastecimento = agora
+            if self._tokens < 1.0:
+                return (1.0 - self._tokens) / self._taxa
+            if self._em_voo >= self._concorrencia:
+                return ESPERA_VAGA
+            self._tokens -= 1.0
+            self._em_voo += 1
+            return 0
+
+    def adquirir(self):
+        """Bloqueia a thread até que a requisição possa ser enviada."""
+        while (espera := self._tentar_adquirir()) > 0:
+            time.sleep(espera)
+
+    async def adquirir_async(self):
+        """Equivalente assíncrono de adquirir(), sem bloquear o loop de eventos."""
+        import asyncio  # só o cliente assíncrono usa; os scripts síncronos não pagam a importação
+        while (espera := self._tentar_adquirir()) > 0:
+            await asyncio.sleep(espera)
+
+    # --- Retorno das respostas ---
+
+    def registrar(self, status=None, headers=None):
+        """
+        Libera a vaga da requisição e ajusta a taxa conforme a resposta.
+        'status' None indica falha de rede (só libera a vaga, sem ajustar a taxa).
+        Retorna os segundos de pausa impostos quando a resposta foi limitada, senão 0.
+        """
+        headers = headers or {}
+        with self._trava:
+            self._em_voo = max(0, self._em_voo - 1)
+            if status is None:
+                return 0
+            agora = time.monotonic()
+
+            if status in STATUS_LIMITADOS:
+                self._limitadas += 1
+                self._sucessos_seguidos = 0
+                self._taxa = max(self._taxa_minima, self._taxa * FATOR_REDUCAO)
+                self._concorrencia = max(1, int(self._concorrencia * FATOR_REDUCAO))
+                self._tokens = 0.0
+                pausa = _segundos_ate(headers.get("Retry-After"), time.time())
+                if pausa is None:
+                    pausa = _segundos_ate(headers.get("X-RateLimit-Reset"), time.time())
+                if pausa is None:
+                    pausa = PAUSA_PADRAO if status == 429 else 0
+                self._pausado_ate = max(self._pausado_ate, agora + pausa)
+                return pausa
+
+            if status >= 400:
+                return 0
+
+            if self._perto_da_cota(headers):
+                self._taxa = max(self._taxa_minima, self._taxa * FATOR_QUASE_NO_LIMITE)
+                self._sucessos_seguidos = 0
+                return 0
+
+            self._taxa = min(self._taxa_maxima, self._taxa + INCREMENTO_TAXA)
+            self._sucessos_seguidos += 1
+            # Uma vaga a mais a cada "rodada" completa de sucessos (≈ uma por RTT)
+            if self._sucessos_seguidos >= self._concorrencia:
+                self._sucessos_seguidos = 0
+                self._concorrencia = min(self._concorrencia_maxima, self._concorrencia + 1)
+            return 0
+
+    @staticmethod
+    def _perto_da_cota(headers):
+        if str(headers.get("X-RateLimit-NearLimit", "")).lower() == "true":
+            return True
+        try:
+            restante = float(headers.get("X-RateLimit-Remaining"))
+            limite = float(headers.get("X-RateLimit-Limit"))
+        except (TypeError, ValueError):
+            return False
+        return limite > 0 and restante / limite < 0.1
+
+    # --- Consulta ---
+
+    def taxa_atual(self):
+        """Taxa (requisições por segundo) que o limitador está permitindo agora."""
+        with self._trava:
+            return self._taxa
+
+    def estado(self):
+        """Retrato do limitador: taxa, vagas, requisições em voo, respostas limitadas e pausa restante."""
+        with self._trava:
+            return {
+                "taxa": round(self._taxa, 2),
+                "concorrencia": self._concorrencia,
+                "em_voo": self._em_voo,
+                "limitadas": self._limitadas,
+                "pausa_restante": round(max(0.0, self._pausado_ate - time.monotonic()), 2),
+            }
+
+# Instância compartilhada por todo o processo (clientes síncrono e assíncrono)
+limitador_padrao = Limitador()
+
+def taxa_atual():
+    """Taxa atual (req/s) do limitador compartilhado."""
+    return limitador_padrao.taxa_atual()
@@ -0,0 +1,81 @@
+# planilha.py - Escrita de .xlsx em fluxo (memória constante), linha a linha, conforme as páginas chegam
+
+import os
+import warnings
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+# Cabeçalho no mesmo estilo do DataFrame.to_excel do pandas (negrito, centralizado, com borda)
+_BORDA_FINA = Side(style='thin')
+ESTILO_CABECALHO_PANDAS = {
+    "font": Font(bold=True),
+    "alignment": Alignment(horizontal='center', vertical='top'),
+    "border": Border(left=_BORDA_FINA, right=_BORDA_FINA, top=_BORDA_FINA, bottom=_BORDA_FINA),
+}
+ESTILO_TABELA = "TableStyleMedium9"  # estilo padrão das tabelas do Excel (o mesmo do xlsxwriter)
+
+class PlanilhaEmFluxo:
+    """
+    Escreve uma aba .xlsx sem montar os dados em memória: cada linha vai direto para o arquivo
+    temporário do openpyxl (modo write_only) e a planilha é gravada no fechamento. Com 'tabela',
+    o intervalo escrito vira uma Tabela do Excel com esse nome; 'larguras' é {coluna: largura}.
+    Se a escrita for interrompida (ex: erro na busca), nada é gravado em 'caminho'.
+    """
+
+    def __init__(self, caminho, aba, colunas, larguras=None, tabela=None, estilo_cabecalho=None):
+        self.caminho = caminho
+        self.colunas = list(colunas)
+        self.linhas = 0
+        self._tabela = tabela
+        self._livro = Workbook(write_only=True)
+        self._aba = self._livro.create_sheet(aba)
+        # Larguras precisam ser definidas antes da primeira linha no modo write_only
+        for indice, coluna in enumerate(self.colunas, start=1):
+            if larguras and coluna in larguras:
+                self._aba.column_dimensions[get_column_letter(indice)].width = larguras[coluna]
+        if estilo_cabecalho:
+            self._aba.append([self._celula(coluna, estilo_cabecalho) for coluna in self.colunas])
+        else:
+            self._aba.append(self.colunas)
+
+    def _celula(self, valor, estilo=None):
+        celula = WriteOnlyCell(self._aba, value=valor)
+        for atributo, formato in (estilo or {}).items():
+            setattr(celula, atributo, formato)
+        return celula
+
+    def escrever(self, linha):
+        """Acrescenta uma linha a partir de um dicionário {coluna: valor} (colunas ausentes ficam vazias)."""
+        valores = []
+        for coluna in self.colunas:
+            valor = linha.get(coluna)
+            if isinstance(valor, str):
+                valor = ILLEGAL_CHARACTERS_RE.sub('', valor)
+                if valor.startswith('='):
+                    # Textos como "=> erro" não podem virar fórmula
+                    valor = self._celula(valor)
+                    valor.data_type = 's'
+            valores.append(valor)
+        self._aba.append(valores)
+        self.linhas += 1
+
+    def fechar(self):
+        """Define a tabela (se pedida) sobre as linhas escritas e grava o arquivo."""
+        if self._tabela:
+            # Uma Tabela do Excel precisa de ao menos uma linha além do cabeçalho
+            ultima_linha = max(self.linhas, 1) + 1
+            tabela = Table(displayName=self._tabela, ref=f"A1:{get_column_letter(len(self.colunas))}{ultima_linha}")
+            tabela.tableColumns = [TableColumn(id=indice, name=coluna) for indice, coluna in enumerate(self.colunas, start=1)]
+            tabela.tableStyleInfo = TableStyleInfo(name=ESTILO_TABELA, showRowStripes=True)
+            tabela.autoFilter = AutoFilter(ref=tabela.ref)
+            with warnings.catch_warnings():
+                # O openpyxl sempre avisa que, no modo write_only, as colunas vão à mão (como feito acima)
+                warnings.simplefilter("ignore", UserWarning)
+                self._aba.add_table(tabela)
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+        self._livro.save(self.caminho)
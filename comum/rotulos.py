@@ -0,0 +1,76 @@
+# rotulos.py - Taxonomia única das etiquetas usada pelos relatórios da Bússola
+
+import re
+import unicodedata
+from functools import lru_cache
+from comum.idempotencia import PREFIXO_ROTULO
+
+# --- Taxonomia ---
+# Uma única expressão reconhece todas as categorias. 'funcionalidade:' (reportar_bug) e
+# 'funcionalidade_' (etiquetas antigas) são a mesma coisa; 'criticidade-' é sinônimo de 'gravidade-'.
+_REGEX_ROTULO = re.compile(
+    r'^(?:(?P<contexto>endpoint|funcionalidade)[:_]|(?P<nivel>gravidade|criticidade|risco|prioridade)-)(?P<valor>.+)$',
+    re.IGNORECASE,
+)
+SINONIMOS = {"criticidade": "gravidade"}
+SEPARADOR = {"endpoint": ":", "funcionalidade": ":"}  # as demais categorias usam '-'
+CATEGORIAS = ("endpoint", "funcionalidade", "gravidade", "risco", "prioridade")
+SEM_CATEGORIA = "outras"
+
+# Peso de cada nível (quanto maior o número, mais crítico)
+ORDEM = {
+    "gravidade": {"critico": 4, "alto": 3, "medio": 2, "baixo": 1},
+    "risco": {"critico": 4, "alto": 3, "medio": 2, "baixo": 1},
+    "prioridade": {"alta": 3, "media": 2, "baixa": 1},
+}
+
+@lru_cache(maxsize=4096)
+def classificar(rotulo):
+    """
+    Retorna (categoria, valor) de uma etiqueta, ex: 'endpoint:get_/movies' -> ('endpoint', 'get_/movies').
+    Etiquetas fora da taxonomia voltam como (SEM_CATEGORIA, etiqueta); as de idempotência, como None.
+    O valor mantém a grafia original (é o que os relatórios exibem); para agrupar, use chave_grupo().
+    """
+    if rotulo.startswith(PREFIXO_ROTULO):
+        return None
+    encontrado = _REGEX_ROTULO.match(rotulo)
+    if not encontrado:
+        return SEM_CATEGORIA, rotulo
+    categoria = (encontrado.group('contexto') or encontrado.group('nivel')).lower()
+    return SINONIMOS.get(categoria, categoria), encontrado.group('valor')
+
+@lru_cache(maxsize=4096)
+def chave_grupo(valor):
+    """Chave de agrupamento de um valor: 'Login' e 'login' caem no mesmo grupo."""
+    return valor.lower() if isinstance(valor, str) else valor
+
+def classificar_rotulos(labels):
+    """Agrupa as etiquetas de uma issue em {categoria: [valores na ordem original]}."""
+    classificacao = {}
+    for rotulo in labels or ():
+        item = classificar(rotulo)
+        if item:
+            classificacao.setdefault(item[0], []).append(item[1])
+    return classificacao
+
+def primeiro(classificacao, *categorias, padrao=None):
+    """Primeiro valor da primeira categoria presente, ex: primeiro(c, 'endpoint', 'funcionalidade')."""
+    for categoria in categorias:
+        if classificacao.get(categoria):
+            return classificacao[categoria][0]
+    return padrao
+
+def rotulo_canonico(categoria, valor):
+    """Escreve a etiqueta no formato canônico da categoria, ex: ('endpoint', 'login') -> 'endpoint:login'."""
+    if categoria == SEM_CATEGORIA:
+        return valor
+    return f"{categoria}{SEPARADOR.get(categoria, '-')}{valor}"
+
+@lru_cache(maxsize=256)
+def _sem_acentos(valor):
+    return unicodedata.normalize('NFKD', valor).encode('ascii', 'ignore').decode('ascii')
+
+def nivel(classificacao, categoria):
+    """Maior peso (ver ORDEM) entre os valores da categoria, sem diferenciar acentos nem maiúsculas ('Médio' = 'medio'); 0 se não houver."""
+    pesos = ORDEM[categoria]
+    return max((pesos.get(_sem_acentos(valor.lower()), 0) for valor in classificacao.get(categoria, ())), default=0)
@@ -0,0 +1,111 @@
+# transicoes.py - Transição de status em massa (por JQL), concorrente e com simulação
+
+import os
+import requests
+from comum import busca, cache_transicoes, jira_cliente
+from comum.concorrencia import em_ordem
+
+# --- Configuração ---
+WORKERS_TRANSICAO = int(os.getenv("JIRA_WORKERS_TRANSICAO", 8))
+
+# Situações possíveis de cada issue no resultado
+MOVIDA = "movida"
+SIMULADA = "simulada"
+JA_NO_STATUS = "já no status"
+INDISPONIVEL = "transição indisponível"
+ERRO = "erro"
+
+def comentario_adf(texto):
+    """Monta o corpo ADF de um comentário de texto simples."""
+    return {"type": "doc", "version": 1, "content": [{"type": "paragraph", "content": [{"type": "text", "text": texto}]}]}
+
+def escolher_transicao(transicoes, status_destino):
+    """Encontra a transição cujo nome ou status de destino é 'status_destino' (sem diferenciar maiúsculas)."""
+    alvo = status_destino.strip().lower()
+    return next((t for t in transicoes
+                 if t['name'].lower() == alvo or t.get('to', {}).get('name', '').lower() == alvo), None)
+
+def aplicar_transicao(issue_key, id_transicao, comentario=None):
+    """
+    Executa a transição em uma única requisição (o comentário vai junto, no bloco 'update').
+    Lança requests.exceptions.RequestException em caso de falha.
+    """
+    payload = {"transition": {"id": id_transicao}}
+    if comentario:
+        payload["update"] = {"comment": [{"add": {"body": comentario_adf(comentario)}}]}
+    response = jira_cliente.post(f"/rest/api/3/issue/{issue_key}/transitions", json=payload)
+    response.raise_for_status()
+
+def _descrever_falha(erro):
+    if erro.response is not None:
+        return f"HTTP {erro.response.status_code}: {erro.response.text[:200]}"
+    return str(erro)
+
+def buscar_transicoes(issue_key):
+    """Consulta as transições disponíveis de uma issue (GET /transitions)."""
+    response = jira_cliente.get(f"/rest/api/3/issue/{issue_key}/transitions")
+    response.raise_for_status()
+    return response.json().get('transitions', [])
+
+def _resolver_transicao(issue_key, estado, status_destino, cache, usar_cache=True):
+    """
+    Escolhe a transição para 'status_destino' usando o cache do estado quando possível.
+    Retorna (transicao_ou_None, veio_do_cache).
+    """
+    lista = cache.obter(*estado) if usar_cache else None
+    if lista is not None:
+        transicao = escolher_transicao(lista, status_destino)
+        if transicao or cache.confirmado(*estado):
+            return transicao, True
+        cache.invalidar(*estado)  # O cache (de outra execução) pode estar desatualizado; confirma no Jira
+    lista = buscar_transicoes(issue_key)
+    cache.registrar(*estado, lista)
+    return escolher_transicao(lista, status_destino), False
+
+def transicionar_issue(issue, status_destino, comentario=None, simular=False, cache=None):
+    """
+    Move uma issue vinda da busca (com fields project, issuetype e status) para 'status_destino'.
+    As transições vêm do cache por estado de workflow; só há GET em /transitions na primeira
+    issue de cada estado ou quando o Jira recusa uma transição em cache (o estado é invalidado).
+    Retorna (chave, situacao, detalhe).
+    """
+    cache = cache or cache_transicoes.cache_padrao()
+    chave = issue['key']
+    estado = cache_transicoes.estado_da_issue(issue)
+    status_atual = estado[2]
+    if status_atual.lower() == status_destino.strip().lower():
+        return chave, JA_NO_STATUS, status_atual
+
+    try:
+        transicao, do_cache = _resolver_transicao(chave, estado, status_destino, cache)
+        if not transicao:
+            return chave, INDISPONIVEL, f"a partir de '{status_atual}'"
+        if simular:
+            return chave, SIMULADA, f"'{status_atual}' → '{transicao['name']}'"
+        try:
+            aplicar_transicao(chave, transicao['id'], comentario)
+        except requests.exceptions.HTTPError as e:
+            # Transição em cache recusada: invalida o estado e tenta uma vez com a lista atual
+            if not do_cache or e.response is None or e.response.status_code not in (400, 409):
+                raise
+            cache.invalidar(*estado)
+            transicao, _ = _resolver_transicao(chave, estado, status_destino, cache, usar_cache=False)
+            if not transicao:
+                return chave, INDISPONIVEL, f"a partir de '{status_atual}'"
+            aplicar_transicao(chave, transicao['id'], comentario)
+    except requests.exceptions.RequestException as e:
+        return chave, ERRO, _descrever_falha(e)
+    return chave, MOVIDA, f"'{status_atual}' → '{transicao['name']}'"
+
+def transicionar_por_jql(jql, status_destino, comentario=None, simular=False, workers=WORKERS_TRANSICAO):
+    """
+    Move todas as issues da JQL para 'status_destino', em paralelo, gerando
+    (chave, situacao, detalhe) na ordem da busca.
+    Com o cache de transições por estado, cada issue custa normalmente uma única requisição.
+    A lista é carregada por inteiro antes de começar: se a JQL filtra pelo status, mover as
+    issues durante a paginação faria a busca pular resultados.
+    """
+    cache = cache_transicoes.cache_padrao()
+    issues = list(busca.iterar_issues_paralelo(jql, fields='project,issuetype,status'))
+    yield from em_ordem(lambda issue: transicionar_issue(issue, status_destino, comentario, simular, cache),
+                        issues, workers)
@@ -0,0 +1,36 @@
+# vinculos.py - Criação concorrente de vínculos (issueLink) entre issues
+
+import os
+import requests
+from comum import jira_cliente
+from comum.concorrencia import em_ordem
+
+# --- Configuração ---
+WORKERS_VINCULOS = int(os.getenv("JIRA_WORKERS_VINCULOS", 8))
+
+def montar_payload_vinculo(chave_saida, chave_entrada, tipo):
+    """Payload de /issueLink: 'chave_saida' -> 'chave_entrada' com o tipo de vínculo informado."""
+    return {
+        "outwardIssue": {"key": chave_saida},
+        "inwardIssue": {"key": chave_entrada},
+        "type": {"name": tipo}
+    }
+
+def criar_vinculo(chave_saida, chave_entrada, tipo):
+    """Cria um vínculo. Retorna None em caso de sucesso ou a mensagem de erro."""
+    try:
+        response = jira_cliente.post("/rest/api/3/issueLink", json=montar_payload_vinculo(chave_saida, chave_entrada, tipo))
+        response.raise_for_status()
+        return None
+    except requests.exceptions.RequestException as e:
+        return e.response.text[:200] if e.response is not None else str(e)
+
+def criar_vinculos(pares, tipo, workers=WORKERS_VINCULOS):
+    """
+    Cria em paralelo os vínculos de 'pares' [(chave_saida, chave_entrada), ...]. O Jira não tem
+    endpoint de vínculos em lote, então as requisições são concorrentes (dentro do limitador).
+    Gera (chave_saida, chave_entrada, erro_ou_None) na ordem de 'pares'.
+    """
+    def vincular(par):
+        return (*par, criar_vinculo(*par, tipo))
+    yield from em_ordem(vincular, pares, workers)
@@ -0,0 +1,88 @@
+# jira_qa.py - Ponto de entrada único: um subcomando para cada script de bugs, testes e Bússola
+#
+# Uso:
+#   python jira_qa.py                      # lista os comandos
+#   python jira_qa.py listar_bug
+#   python jira_qa.py pareto --cache       # os argumentos seguintes vão para o script
+#
+# Só o script escolhido é carregado: pandas, openpyxl e o cliente HTTP entram apenas nos
+# comandos que os usam, e nada acessa o Jira (nem lê o .env) antes de o comando rodar.
+
+import os
+import sys
+import runpy
+from pathlib import Path
+
+raiz_projeto = Path(__file__).resolve().parent
+
+# --- Comandos ---
+# nome: (script, descrição, configuração exigida)
+# "projeto" = credenciais + JIRA_PROJECT_KEY; "credenciais" = só URL, e-mail e token
+COMANDOS = {
+    # Bugs
+    "reportar_bug": ("bugs/reportar_bug.py", "Reporta um bug (entrevista no terminal)", "projeto"),
+    "listar_bug": ("bugs/listar_bug.py", "Lista os bugs mais recentes do projeto", "projeto"),
+    "atualizar_bug": ("bugs/atualizar_bug.py", "Atualiza título, detalhes, gravidade ou status de um bug", "credenciais"),
+    "excluir_bug": ("bugs/excluir_bug.py", "Exclui um bug (com confirmação)", "credenciais"),
+    # Casos de Teste
+    "adicionar_teste": ("testes/adicionar_teste.py", "Cria um Caso de Teste (entrevista no terminal)", "projeto"),
+    "importar_csv": ("testes/importar_csv.py", "Importa Casos de Teste de um CSV (--individual: um a um)", "projeto"),
+    "listar_teste": ("testes/listar_teste.py", "Lista os Casos de Teste do projeto", "projeto"),
+    "buscar_teste": ("testes/buscar_teste.py", "Mostra os detalhes de um Caso de Teste", "credenciais"),
+    "atualizar_teste": ("testes/atualizar_teste.py", "Atualiza um Caso de Teste (status, descrição, endpoint...)", "credenciais"),
+    "excluir_teste": ("testes/excluir_teste.py", "Exclui um Caso de Teste (com confirmação)", "credenciais"),
+    "excluir_em_lote": ("testes/excluir_em_lote.py", "Exclusão em massa por JQL ou lista de chaves", "credenciais"),
+    "transicionar_em_lote": ("testes/transicionar_em_lote.py", "Transição de status em massa por JQL", "projeto"),
+    # Bússola (relatórios)
+    "sincronizar": ("bussula/sincronizar.py", "Atualiza o armazém local usado com --cache (--completo: do zero)", "projeto"),
+    "panorama": ("bussula/panorama.py", "Panorama do projeto com as issues prioritárias", "projeto"),
+    "pareto": ("bussula/pareto.py", "Análise de Pareto de bugs e testes por endpoint", "projeto"),
+    "mapa_bugs": ("bussula/mapa_bugs.py", "Concentração de bugs por endpoint", "projeto"),
+    "mapa_cobertura": ("bussula/mapa_cobertura.py", "Cobertura de testes por endpoint", "projeto"),
+    "exportar_bugs": ("bussula/exportar_bugs.py", "Exporta os bugs para Excel e partições mensais", "projeto"),
+    "exportar_testes_excel": ("bussula/exportar_testes_excel.py", "Exporta os Casos de Teste para Excel e partições mensais", "projeto"),
+    "servico": ("bussula/servico.py", "Serviço HTTP local com os relatórios em JSON (snapshot sempre aquecido)", "projeto"),
+}
+# Com o armazém local (--cache ou BUSSOLA_FONTE=cache) estes relatórios não acessam o Jira
+LEEM_DO_ARMAZEM = {"panorama", "pareto", "mapa_bugs", "mapa_cobertura", "exportar_bugs", "exportar_testes_excel"}
+
+def listar_comandos():
+    print("Uso: python jira_qa.py <comando> [argumentos do script]\n")
+    largura = max(map(len, COMANDOS))
+    for nome, (script, descricao, _) in COMANDOS.items():
+        print(f"  {nome:<{largura}}  {descricao}")
+
+def _usa_armazem(nome, argumentos):
+    return nome in LEEM_DO_ARMAZEM and ("--cache" in argumentos or os.getenv("BUSSOLA_FONTE", "").lower() == "cache")
+
+def executar(nome, argumentos):
+    """Valida a configuração (uma vez, antes de qualquer pergunta ao usuário) e roda o script como __main__."""
+    script, _, configuracao = COMANDOS[nome]
+    caminho = str(raiz_projeto / script)
+    sys.path.insert(0, str(raiz_projeto))
+    if configuracao and not _usa_armazem(nome, argumentos):
+        from comum import jira_cliente
+        jira_cliente.validar_configuracao(exigir_projeto=configuracao == "projeto")
+    # Os scripts leem sys.argv (argparse, --cache, --individual...) como se fossem chamados diretamente
+    sys.argv = [caminho, *argumentos]
+    runpy.run_path(caminho, run_name="__main__")
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else list(argumentos)
+    if not argumentos or argumentos[0] in ("-h", "--help", "--ajuda", "ajuda"):
+        listar_comandos()
+        return 0
+    nome, resto = argumentos[0], argumentos[1:]
+    if nome not in COMANDOS:
+        print(f"❌ Comando desconhecido: '{nome}'.\n")
+        listar_comandos()
+        return 2
+    try:
+        executar(nome, resto)
+    except KeyboardInterrupt:
+        print("\n⏹️ Interrompido.")
+        return 130
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,48 +1,54 @@
 # adicionar_teste.py (Versão Aprimorada com Endpoint e para Automação)
 
-import os
+import sys
 import requests
 import json
-from dotenv import load_dotenv
 from pathlib import Path
 
 # --- Configuração ---
 script_dir = Path(__file__).parent
-env_path = script_dir.parent / '.env'
-load_dotenv(dotenv_path=env_path)
-
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import jira_cliente, idempotencia, criacao_lote, indice_estorias, vinculos
+from comum.jira_assincrono import ErroJiraAsync
+from comum.jira_cliente import JIRA_PROJECT_KEY
 
 # Nome do tipo de vínculo que conecta um Caso de Teste a uma Estória.
 # Ex: "Test", "Relates", "Tests". Verifique na sua configuração do Jira.
 JIRA_LINK_TYPE = "Test"
 
+def procurar_no_indice(titulo):
+    """Procura a estória no índice título -> chave (carregado uma vez, com validade). None se não achar."""
+    try:
+        return indice_estorias.indice_padrao().procurar(titulo)
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Não foi possível carregar o índice de estórias: {e}")
+        return None
+
 def buscar_chave_por_titulo(titulo):
-    """Busca a chave de uma issue (ex: AC-2) pelo seu título (ex: US-AUTH-001)."""
+    """
+    Busca a chave de uma issue (ex: AC-2) pelo seu título (ex: US-AUTH-001).
+    Consulta primeiro o índice local de estórias; a busca "summary ~" no Jira só é feita
+    quando a estória não está no índice (ex: criada depois do último carregamento).
+    """
+    chave = procurar_no_indice(titulo)
+    if chave:
+        return chave
     jql = f'project = "{JIRA_PROJECT_KEY}" AND summary ~ \'"{titulo}"\''
-    url = f"{JIRA_URL}/rest/api/3/search"
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-    headers = {"Accept": "application/json"}
     params = {'jql': jql, 'fields': 'key', 'maxResults': 1}
     try:
-        r = requests.get(url, headers=headers, params=params, auth=auth)
+        r = jira_cliente.get("/rest/api/3/search", params=params)
         r.raise_for_status()
         issues = r.json().get('issues', [])
-        return issues[0]['key'] if issues else None
+        if not issues:
+            return None
+        indice_estorias.indice_padrao().registrar(titulo, issues[0]['key'])
+        return issues[0]['key']
     except requests.exceptions.RequestException as e:
         print(f"ERRO ao buscar issue '{titulo}': {e}")
         return None
 
-def criar_caso_de_teste(titulo, passos, resultado_esperado, pre_condicoes=None, endpoint=None, id_estoria=None):
-    """
-    Cria um 'Caso de Teste' no Jira e o vincula a uma Estória se especificado.
-    Função projetada para ser importada e usada por automações.
-    """
-    print(f"\n🚀 Criando o Caso de Teste '{titulo}' no Jira...")
-    
+def montar_payload_caso_de_teste(titulo, passos, resultado_esperado, pre_condicoes=None, endpoint=None):
+    """Monta o payload de criação do Caso de Teste (compartilhado pelas versões síncrona e assíncrona)."""
     # Formata a descrição usando o markup do Jira
     passos_formatados = "\n".join([f"# {p.strip()}" for p in passos])
     descricao_texto = (
@@ -67,21 +73,28 @@ def criar_caso_de_teste(titulo, passos, resultado_esperado, pre_condicoes=None,
     if endpoint:
         endpoint_label = f"endpoint:{endpoint.lower().replace(' ', '_')}"
         fields['labels'] = [endpoint_label]
-        print(f"   Adicionando etiqueta de endpoint: {endpoint_label}")
 
-    payload = {"fields": fields}
+    return {"fields": fields}
+
+def montar_payload_vinculo(issue_key, chave_estoria):
+    """Monta o payload do vínculo entre o Caso de Teste e a Estória."""
+    return vinculos.montar_payload_vinculo(issue_key, chave_estoria, JIRA_LINK_TYPE)
+
+def criar_caso_de_teste(titulo, passos, resultado_esperado, pre_condicoes=None, endpoint=None, id_estoria=None):
+    """
+    Cria um 'Caso de Teste' no Jira e o vincula a uma Estória se especificado.
+    Função projetada para ser importada e usada por automações.
+    """
+    print(f"\n🚀 Criando o Caso de Teste '{titulo}' no Jira...")
+    payload = montar_payload_caso_de_teste(titulo, passos, resultado_esperado, pre_condicoes, endpoint)
+    if 'labels' in payload['fields']:
+        print(f"   Adicionando etiqueta de endpoint: {payload['fields']['labels'][0]}")
     
     # Envia a requisição para criar o Caso de Teste
-    api_url = f"{JIRA_URL}/rest/api/3/issue"
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-    
     try:
-        response = requests.post(api_url, headers=headers, auth=auth, json=payload)
-        response.raise_for_status()
-        issue_data = response.json()
-        issue_key = issue_data['key']
-        issue_url = f"{JIRA_URL}/browse/{issue_key}"
+        # Reenvia em falhas de rede/5xx sem duplicar o teste (etiqueta de idempotência)
+        issue_key = idempotencia.criar_issue(payload)
+        issue_url = jira_cliente.link_issue(issue_key)
         
         print("\n" + "="*50)
         print("🎉 SUCESSO! O Caso de Teste foi criado.")
@@ -97,23 +110,85 @@ def criar_caso_de_teste(titulo, passos, resultado_esperado, pre_condicoes=None,
                 print(f"   ⚠️ Falha ao vincular: Estória com título '{id_estoria}' não encontrada.")
             else:
                 print(f"   Vinculando {issue_key} ao requisito {chave_estoria_real}...")
-                link_payload = {
-                    "outwardIssue": {"key": issue_key},
-                    "inwardIssue": {"key": chave_estoria_real},
-                    "type": {"name": JIRA_LINK_TYPE}
-                }
-                link_api_url = f"{JIRA_URL}/rest/api/3/issueLink"
-                link_response = requests.post(link_api_url, headers=headers, auth=auth, json=link_payload)
-                if link_response.status_code == 201:
+                erro_vinculo = vinculos.criar_vinculo(issue_key, chave_estoria_real, JIRA_LINK_TYPE)
+                if not erro_vinculo:
                     print(f"   ✅ Vinculado com sucesso!")
                 else:
-                    print(f"   ⚠️ Falha ao vincular: {link_response.text}")
+                    print(f"   ⚠️ Falha ao vincular: {erro_vinculo}")
         print("="*50)
         return issue_key
 
     except requests.exceptions.RequestException as e:
-        print(f"\n❌ ERRO ao criar o Caso de Teste: {e.response.text if e.response else str(e)}")
+        print(f"\n❌ ERRO ao criar o Caso de Teste: {e.response.text if e.response is not None else str(e)}")
+        return None
+
+async def buscar_chave_por_titulo_async(cliente, titulo):
+    """Versão assíncrona de buscar_chave_por_titulo (o índice de estórias é consultado fora do loop de eventos)."""
+    import asyncio
+    chave = await asyncio.to_thread(procurar_no_indice, titulo)
+    if chave:
+        return chave
+    jql = f'project = "{JIRA_PROJECT_KEY}" AND summary ~ \'"{titulo}"\''
+    try:
+        dados = await cliente.get("/rest/api/3/search", params={'jql': jql, 'fields': 'key', 'maxResults': 1})
+        issues = dados.get('issues', [])
+        return issues[0]['key'] if issues else None
+    except ErroJiraAsync as e:
+        print(f"ERRO ao buscar issue '{titulo}': {e}")
+        return None
+
+async def criar_caso_de_teste_async(cliente, titulo, passos, resultado_esperado, pre_condicoes=None, endpoint=None, id_estoria=None):
+    """
+    Versão assíncrona de criar_caso_de_teste, para criar vários casos em paralelo
+    com um ClienteJiraAsync (comum/jira_assincrono.py). Retorna a chave ou None.
+    """
+    payload = montar_payload_caso_de_teste(titulo, passos, resultado_esperado, pre_condicoes, endpoint)
+    try:
+        issue_key = await idempotencia.criar_issue_async(cliente, payload)
+    except ErroJiraAsync as e:
+        print(f"❌ ERRO ao criar o Caso de Teste '{titulo}': {e}")
         return None
+    print(f"🎉 Caso de Teste criado: {issue_key} - {titulo}")
+
+    if id_estoria:
+        chave_estoria_real = await buscar_chave_por_titulo_async(cliente, id_estoria)
+        if not chave_estoria_real:
+            print(f"   ⚠️ Falha ao vincular {issue_key}: Estória com título '{id_estoria}' não encontrada.")
+        else:
+            try:
+                await cliente.post("/rest/api/3/issueLink", json=montar_payload_vinculo(issue_key, chave_estoria_real))
+            except ErroJiraAsync as e:
+                print(f"   ⚠️ Falha ao vincular {issue_key}: {e}")
+    return issue_key
+
+def criar_casos_de_teste_em_lote(casos):
+    """
+    Cria muitos Casos de Teste de uma vez: os testes vão em lotes por /issue/bulk, as estórias
+    são resolvidas pelo índice local (sem uma busca "summary ~" por teste) e os vínculos são
+    criados em paralelo no final.
+    'casos' é uma lista de dicionários com os mesmos parâmetros de criar_caso_de_teste.
+    Retorna uma lista de (titulo, chave_ou_None, erro_ou_None), na ordem de 'casos'.
+    """
+    itens = ((i, montar_payload_caso_de_teste(caso['titulo'], caso['passos'], caso['resultado_esperado'],
+                                              caso.get('pre_condicoes'), caso.get('endpoint')))
+             for i, caso in enumerate(casos))
+    resultados = [None] * len(casos)
+    pares = []
+    for i, issue_key, erro in criacao_lote.criar_em_lote(itens):
+        resultados[i] = [casos[i]['titulo'], issue_key, erro]
+        id_estoria = casos[i].get('id_estoria')
+        if issue_key and id_estoria:
+            chave_estoria = buscar_chave_por_titulo(id_estoria)
+            if chave_estoria:
+                pares.append((issue_key, chave_estoria, i))
+            else:
+                resultados[i][2] = f"Estória com título '{id_estoria}' não encontrada para o vínculo."
+
+    indices = {issue_key: i for issue_key, _, i in pares}
+    for issue_key, chave_estoria, erro in vinculos.criar_vinculos([(t, e) for t, e, _ in pares], JIRA_LINK_TYPE):
+        if erro:
+            resultados[indices[issue_key]][2] = f"Falha ao vincular a {chave_estoria}: {erro}"
+    return [tuple(resultado) for resultado in resultados]
 
 def main_interativo():
     """Coleta os detalhes do teste via terminal e chama a função de criação."""
@@ -1,33 +1,32 @@
 # atualizar_teste.py (v4 - Com Edição de Endpoint/Funcionalidade)
 
 import os
+import sys
 import requests
 import json
 import subprocess
 import tempfile
-from dotenv import load_dotenv
 from pathlib import Path
 
 # --- Configuração ---
 script_dir = Path(__file__).parent
-env_path = script_dir.parent / '.env'
-load_dotenv(dotenv_path=env_path)
-
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import jira_cliente, transicoes, cache_transicoes, adf
+from comum.jira_assincrono import ErroJiraAsync
 
 def buscar_dados_teste(issue_key):
     """Busca os dados atuais de uma issue, incluindo transições e labels."""
     print(f"\n🔎 Buscando dados para o teste {issue_key}...")
     # Expandimos para buscar transições e pedimos os campos de labels e descrição
-    api_url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}?expand=transitions&fields=summary,status,description,labels"
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
+    params = {'expand': 'transitions', 'fields': 'summary,status,description,labels,project,issuetype'}
     try:
-        response = requests.get(api_url, auth=auth)
+        response = jira_cliente.get(f"/rest/api/3/issue/{issue_key}", params=params)
         response.raise_for_status()
         print("✅ Dados encontrados.")
-        return response.json()
+        dados = response.json()
+        # Guarda as transições do estado atual para as próximas mudanças de status
+        cache_transicoes.cache_padrao().registrar(*cache_transicoes.estado_da_issue(dados), dados.get('transitions', []))
+        return dados
     except requests.exceptions.RequestException as e:
         print(f"❌ ERRO ao buscar o teste: {e.response.text if e.response else str(e)}")
         return None
@@ -35,19 +34,69 @@ def buscar_dados_teste(issue_key):
 def adicionar_comentario(issue_key, comentario):
     """Adiciona um comentário a uma issue."""
     print(f"   ...adicionando comentário ao teste '{issue_key}'...")
-    api_url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}/comment"
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
     payload = {"body": {"type": "doc", "version": 1, "content": [{"type": "paragraph", "content": [{"type": "text", "text": comentario}]}]}}
     try:
-        r = requests.post(api_url, headers=headers, auth=auth, json=payload)
+        r = jira_cliente.post(f"/rest/api/3/issue/{issue_key}/comment", json=payload)
         r.raise_for_status()
         print("   ✅ Comentário adicionado com sucesso.")
     except requests.exceptions.RequestException as e:
         print(f"   ❌ Falha ao adicionar comentário: {e.response.text if e.response else str(e)}")
 
-def mudar_status_do_teste(issue_key, transicoes_disponiveis):
-    """Mostra as transições e permite ao usuário mudar o status."""
+async def adicionar_comentario_async(cliente, issue_key, comentario):
+    """Versão assíncrona de adicionar_comentario (usa um ClienteJiraAsync). Retorna True em caso de sucesso."""
+    try:
+        await cliente.adicionar_comentario(issue_key, comentario)
+        return True
+    except ErroJiraAsync as e:
+        print(f"   ❌ Falha ao adicionar comentário em '{issue_key}': {e}")
+        return False
+
+async def mudar_status_async(cliente, issue_key, status_destino, comentario=None):
+    """
+    Move o teste para 'status_destino' (nome da transição ou do status) sem interação,
+    comentando em seguida se informado. Retorna True se a transição foi aplicada.
+    """
+    try:
+        if await cliente.transicionar(issue_key, status_destino, comentario):
+            return True
+        print(f"⚠️ Transição '{status_destino}' indisponível para {issue_key}.")
+    except ErroJiraAsync as e:
+        print(f"❌ ERRO ao mudar o status de {issue_key}: {e}")
+    return False
+
+def obter_transicoes(dados, issue_key):
+    """Transições do estado atual do teste: do cache por estado de workflow ou, se ausentes, do Jira."""
+    cache = cache_transicoes.cache_padrao()
+    estado = cache_transicoes.estado_da_issue(dados)
+    lista = cache.obter(*estado)
+    if lista is None:
+        try:
+            lista = transicoes.buscar_transicoes(issue_key)
+        except requests.exceptions.RequestException as e:
+            print(f"❌ ERRO ao buscar as transições: {e}")
+            return []
+        cache.registrar(*estado, lista)
+    return lista
+
+def _transicao_recusada(erro):
+    """O Jira recusou o id da transição (400), ex: um id do cache em disco que não vale mais para a issue."""
+    return erro.response is not None and erro.response.status_code == 400
+
+def _confirmar_transicao_no_jira(issue_key, estado, nome_transicao):
+    """Descarta o estado do cache, consulta as transições atuais (GET /transitions) e reencontra a escolhida."""
+    cache = cache_transicoes.cache_padrao()
+    cache.invalidar(*estado)
+    lista = transicoes.buscar_transicoes(issue_key)
+    cache.registrar(*estado, lista)
+    return transicoes.escolher_transicao(lista, nome_transicao)
+
+def mudar_status_do_teste(issue_key, transicoes_disponiveis, estado=None):
+    """
+    Mostra as transições e permite ao usuário mudar o status.
+    Com 'estado' (projeto, tipo, status), se o Jira recusar o id da transição (possivelmente
+    vindo do cache), o estado é invalidado e a transição é refeita com a lista atual do Jira.
+    Retorna a transição aplicada, ou None se nada mudou.
+    """
     print("\n--- Mudar Status ---")
     if not transicoes_disponiveis:
         print("⚠️ Não há transições de status disponíveis para este teste no momento.")
@@ -72,29 +121,28 @@ def mudar_status_do_teste(issue_key, transicoes_disponiveis):
         comentario = input(f"  ➡️ Por favor, adicione um comentário explicando o motivo para '{nome_transicao}': ")
 
     print(f"\n🚀 Movendo teste {issue_key} para '{nome_transicao}'...")
-    api_url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}/transitions"
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-    payload = {"transition": {"id": id_transicao}}
 
     try:
-        r = requests.post(api_url, headers=headers, auth=auth, json=payload)
-        r.raise_for_status()
+        try:
+            transicoes.aplicar_transicao(issue_key, id_transicao)
+        except requests.exceptions.HTTPError as e:
+            if estado is None or not _transicao_recusada(e):
+                raise
+            transicao_escolhida = _confirmar_transicao_no_jira(issue_key, estado, nome_transicao)
+            if not transicao_escolhida:
+                print(f"⚠️ A transição '{nome_transicao}' não está mais disponível para {issue_key}.")
+                return None
+            transicoes.aplicar_transicao(issue_key, transicao_escolhida['id'])
         print(f"✅ Status do teste {issue_key} atualizado para '{nome_transicao}'.")
         if comentario: adicionar_comentario(issue_key, comentario)
+        return transicao_escolhida
     except requests.exceptions.RequestException as e:
-        print(f"❌ ERRO ao mudar o status: {e.response.text if e.response else str(e)}")
+        print(f"❌ ERRO ao mudar o status: {e.response.text if e.response is not None else str(e)}")
+        return None
 
 def editar_descricao(descricao_atual_adf):
     """Abre um editor de texto para o usuário editar a descrição."""
-    texto_simples = ""
-    if descricao_atual_adf and descricao_atual_adf.get('content'):
-        for block in descricao_atual_adf['content']:
-            if block.get('type') == 'paragraph':
-                for content in block.get('content', []):
-                    if content.get('type') == 'text':
-                        texto_simples += content.get('text', '')
-                texto_simples += "\n\n" # Adiciona parágrafos entre os blocos
+    texto_simples = adf.para_texto(descricao_atual_adf, separador="\n\n")  # linha em branco entre os parágrafos
     
     with tempfile.NamedTemporaryFile(mode='w+', suffix=".txt", delete=False, encoding='utf-8') as tf:
         tf.write(texto_simples.strip())
@@ -144,10 +192,17 @@ def main():
         escolha = input("➡️ O que você deseja fazer?: ").lower()
 
         if escolha == '1':
-            transicoes = buscar_dados_teste(issue_id).get('transitions', [])
-            mudar_status_do_teste(issue_id, transicoes)
-            # Recarrega os dados após mudar o status
-            dados_iniciais = buscar_dados_teste(issue_id)
+            estado_anterior = cache_transicoes.estado_da_issue(dados_iniciais)
+            transicao = mudar_status_do_teste(issue_id, dados_iniciais.get('transitions', []), estado_anterior)
+            if transicao and transicao.get('to', {}).get('name'):
+                # Atualiza o status localmente; as transições do novo estado vêm do cache
+                dados_iniciais['fields']['status'] = {'name': transicao['to']['name']}
+                dados_iniciais['transitions'] = obter_transicoes(dados_iniciais, issue_id)
+            elif transicao:
+                dados_iniciais = buscar_dados_teste(issue_id) or dados_iniciais
+            else:
+                # Se o Jira recusou a transição, o cache do estado já foi refeito com a lista atual
+                dados_iniciais['transitions'] = obter_transicoes(dados_iniciais, issue_id)
         
         elif escolha == '2':
             comentario_texto = input("   Digite o comentário: ")
@@ -177,10 +232,9 @@ def main():
             if not update_payload['fields']:
                 print("Nenhuma alteração pendente para salvar. Saindo."); break
             
-            api_url = f"{JIRA_URL}/rest/api/3/issue/{issue_id}"
             print(f"\n💾 Salvando alterações no teste {issue_id}...")
             try:
-                r = requests.put(api_url, headers={"Accept": "application/json", "Content-Type": "application/json"}, auth=(JIRA_USER_EMAIL, JIRA_API_TOKEN), json=update_payload)
+                r = jira_cliente.put(f"/rest/api/3/issue/{issue_id}", json=update_payload)
                 r.raise_for_status()
                 print(f"🎉 SUCESSO! O Caso de Teste foi atualizado.")
             except requests.exceptions.RequestException as e:
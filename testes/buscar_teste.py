@@ -1,19 +1,14 @@
 # buscar_teste.py
 
-import os
+import sys
 import requests
 import json
-from dotenv import load_dotenv
 from pathlib import Path
 
 # --- Configuração Padrão ---
 script_dir = Path(__file__).parent
-env_path = script_dir.parent / '.env'
-load_dotenv(dotenv_path=env_path)
-
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import jira_cliente, idempotencia, adf
 
 def buscar_e_exibir_teste(issue_key):
     """
@@ -22,12 +17,8 @@ def buscar_e_exibir_teste(issue_key):
     print(f"\n🔎 Buscando dados do Caso de Teste '{issue_key}'...")
     
     # Este é o endpoint da API para buscar uma issue específica
-    api_url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}"
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-    headers = {"Accept": "application/json"}
-    
     try:
-        response = requests.get(api_url, headers=headers, auth=auth)
+        response = jira_cliente.get(f"/rest/api/3/issue/{issue_key}")
         response.raise_for_status() # Lança um erro se a requisição falhar (ex: 404)
         
         data = response.json()
@@ -43,16 +34,10 @@ def buscar_e_exibir_teste(issue_key):
         else:
             responsavel_nome = "Não atribuído"
             
-        etiquetas = ", ".join(fields.get('labels', [])) or "Nenhuma"
+        etiquetas = ", ".join(idempotencia.rotulos_visiveis(fields.get('labels', []))) or "Nenhuma"
         
-        # Extrai o texto do campo Descrição, que está em um formato complexo (ADF)
-        descricao = ""
-        if fields.get('description') and fields['description'].get('content'):
-            for content_block in fields['description']['content']:
-                if content_block.get('type') == 'paragraph':
-                    for text_content in content_block.get('content', []):
-                        descricao += text_content.get('text', '')
-                    descricao += "\n\n" # Adiciona uma quebra de linha entre parágrafos
+        # Converte o campo Descrição, que está em um formato complexo (ADF), para Markdown
+        descricao = adf.para_markdown(fields.get('description'))
 
         # --- Exibindo os Dados ---
         print("\n" + "="*60)
@@ -61,7 +46,7 @@ def buscar_e_exibir_teste(issue_key):
         
         print(f"➡️ Título: {titulo}")
         print(f"➡️ Status: {status}")
-        print(f"➡️ Link: {JIRA_URL}/browse/{issue_key}")
+        print(f"➡️ Link: {jira_cliente.link_issue(issue_key)}")
         print(f"➡️ Criador: {criador}")
         print(f"➡️ Responsável: {responsavel_nome}")
         print(f"➡️ Etiquetas: [{etiquetas}]")
@@ -0,0 +1,79 @@
+# excluir_em_lote.py - Exclui em massa as issues de uma JQL ou de uma lista de chaves (ex: limpeza de importação)
+#
+# Uso:
+#   python testes/excluir_em_lote.py --jql 'project = AC AND issuetype = "Caso de Teste" AND created >= -1d' --simular
+#   python testes/excluir_em_lote.py --jql 'project = AC AND labels = "importacao-ruim"'
+#   python testes/excluir_em_lote.py --chaves AC-10,AC-11,AC-12
+#   python testes/excluir_em_lote.py --arquivo chaves.txt        (uma chave por linha)
+
+import sys
+import argparse
+import requests
+from collections import Counter
+from pathlib import Path
+
+# --- Configuração de Caminho e Ambiente ---
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import exclusao
+
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description="Exclusão em massa de issues, com simulação e log de auditoria.")
+    origem = parser.add_mutually_exclusive_group(required=True)
+    origem.add_argument("--jql", help="Exclui todas as issues desta JQL.")
+    origem.add_argument("--chaves", help="Lista de chaves separadas por vírgula (ex: AC-1,AC-2).")
+    origem.add_argument("--arquivo", help="Arquivo com uma chave por linha.")
+    parser.add_argument("--simular", action="store_true", help="Apenas conta e lista o que seria excluído.")
+    parser.add_argument("--subtarefas", action="store_true", help="Exclui também as subtarefas das issues.")
+    parser.add_argument("--workers", type=int, default=exclusao.WORKERS_EXCLUSAO, help="Exclusões simultâneas.")
+    return parser.parse_args()
+
+def main():
+    args = ler_argumentos()
+    chaves = None
+    if args.chaves:
+        chaves = args.chaves.split(",")
+    elif args.arquivo:
+        try:
+            with open(args.arquivo, encoding='utf-8') as arquivo:
+                chaves = arquivo.read().split()
+        except OSError as e:
+            print(f"❌ ERRO ao ler o arquivo de chaves: {e}"); return
+
+    print("🔎 Buscando as issues a excluir...")
+    try:
+        alvos = exclusao.listar_alvos(jql=args.jql, chaves=chaves)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ ERRO ao buscar as issues no Jira: {e}"); return
+
+    if not alvos:
+        print("🤷 Nenhuma issue encontrada."); return
+
+    por_tipo = Counter((issue['fields'].get('issuetype') or {}).get('name', 'N/D') for issue in alvos)
+    print(f"📋 {len(alvos)} issues encontradas: " + ", ".join(f"{q} {t}" for t, q in por_tipo.most_common()))
+    for issue in alvos[:10]:
+        print(f"   - {issue['key']}: {issue['fields'].get('summary', '')}")
+    if len(alvos) > 10:
+        print(f"   ... e mais {len(alvos) - 10}.")
+
+    if args.simular:
+        print("📝 Simulação: nada foi excluído."); return
+
+    confirmacao = input(f"🔴 ATENÇÃO: Esta ação é IRREVERSÍVEL. Excluir as {len(alvos)} issues? (digite 'sim' para confirmar): ")
+    if confirmacao.lower() != 'sim':
+        print("🛑 Exclusão cancelada."); return
+
+    excluidas, falhas = 0, 0
+    for chave, excluida, detalhe in exclusao.excluir_em_massa(alvos, args.workers, args.subtarefas):
+        if excluida:
+            excluidas += 1
+            print(f"   ✅ {chave} excluída.")
+        else:
+            falhas += 1
+            print(f"   ❌ {chave}: {detalhe}")
+
+    print(f"\n📦 Resultado: {excluidas} excluídas | {falhas} com erro")
+    print(f"   Auditoria: {exclusao.CAMINHO_AUDITORIA}")
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,14 @@
 # excluir_teste.py
 
-import os
+import sys
 import requests
-from dotenv import load_dotenv
 from pathlib import Path
 
 # --- Configuração de Caminho e Ambiente ---
 script_dir = Path(__file__).parent
-env_path = script_dir.parent / '.env'
-load_dotenv(dotenv_path=env_path)
-
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import jira_cliente
+from comum.jira_assincrono import ErroJiraAsync
 
 def excluir_caso_de_teste(issue_key):
     """
@@ -26,11 +22,8 @@ def excluir_caso_de_teste(issue_key):
         print("🛑 Exclusão cancelada.")
         return
 
-    api_url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}"
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-
     try:
-        response = requests.delete(api_url, auth=auth)
+        response = jira_cliente.delete(f"/rest/api/3/issue/{issue_key}")
         response.raise_for_status()
         print(f"✅ Caso de Teste {issue_key} excluído permanentemente.")
 
@@ -40,6 +33,18 @@ def excluir_caso_de_teste(issue_key):
             print(f"   Verifique se o ID '{issue_key}' está correto e se você tem permissão para excluir.")
             print(f"   Resposta: {e.response.text}")
 
+async def excluir_caso_de_teste_async(cliente, issue_key):
+    """
+    Versão assíncrona (e sem confirmação) de excluir_caso_de_teste, para automações
+    que já confirmaram a exclusão. Retorna True se o Caso de Teste foi excluído.
+    """
+    try:
+        await cliente.excluir(issue_key)
+        return True
+    except ErroJiraAsync as e:
+        print(f"❌ ERRO ao excluir o Caso de Teste {issue_key}: {e}")
+        return False
+
 if __name__ == "__main__":
     issue_id = input("➡️ Qual o ID do Caso de Teste a ser EXCLUÍDO? (ex: AC-123): ")
     
@@ -1,21 +1,19 @@
 # importar_csv.py (Versão Nativa - Final)
 
-import os
+import sys
 import requests
-import json
 import csv
-from dotenv import load_dotenv
 from pathlib import Path
 
 # --- Configuração de Caminho e Ambiente ---
 script_dir = Path(__file__).parent
-env_path = script_dir.parent / '.env'
-load_dotenv(dotenv_path=env_path)
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import criacao_lote, limitador, idempotencia
+from comum.concorrencia import ler_em_segundo_plano
+from comum.jira_cliente import JIRA_PROJECT_KEY
 
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
+# Linhas já convertidas em payload aguardando envio (limita a memória em arquivos enormes)
+TAMANHO_FILA = 1000
 
 def detectar_formato(headers):
     """Analisa os cabeçalhos do CSV e retorna o formato."""
@@ -96,51 +94,85 @@ def construir_payload_jira(linha_csv, formato):
 
 def criar_issue_no_jira(payload):
     """Envia a requisição para criar a issue no Jira."""
-    api_url = f"{JIRA_URL}/rest/api/3/issue"
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
-    
     try:
-        response = requests.post(api_url, headers=headers, auth=auth, data=json.dumps(payload))
-        response.raise_for_status()
-        issue_key = response.json()['key']
+        issue_key = idempotencia.criar_issue(payload)
         print(f"   🎉 SUCESSO! Criado com o ID: {issue_key}")
         return True
     except requests.exceptions.RequestException as e:
         print(f"   ❌ ERRO ao criar issue.")
-        if e.response:
+        if e.response is not None:
             print(f"      Resposta: {e.response.text}")
         return False
 
+def importar_em_lote(linhas, formato):
+    """
+    Pipeline de importação em streaming: as linhas são lidas e convertidas em payloads
+    em segundo plano (fila limitada), agrupadas em lotes (/issue/bulk) e enviadas em
+    paralelo enquanto a leitura continua. Retorna (criados, falhas).
+    """
+    itens = ((i + 2, construir_payload_jira(linha_csv, formato)) for i, linha_csv in enumerate(linhas))
+    criados, falhas = 0, 0
+    for numero_linha, issue_key, erro in criacao_lote.criar_em_lote(ler_em_segundo_plano(itens, TAMANHO_FILA)):
+        if issue_key:
+            criados += 1
+            print(f"   🎉 Linha #{numero_linha}: criado com o ID {issue_key}")
+        else:
+            falhas += 1
+            print(f"   ❌ Linha #{numero_linha}: ERRO ao criar issue. {erro}")
+    print(f"\n📦 Resultado: {criados} criados | {falhas} com erro")
+    estado = limitador.limitador_padrao.estado()
+    print(f"   ⏱️ Vazão final: {estado['taxa']} req/s, {estado['concorrencia']} em paralelo "
+          f"({estado['limitadas']} respostas limitadas pelo Jira)")
+    return criados, falhas
+
+def importar_individualmente(linhas, formato):
+    """Modo antigo: uma requisição por linha, útil para depurar uma linha problemática."""
+    processadas = 0
+    for i, linha_csv in enumerate(linhas):
+        titulo_preview = linha_csv.get("Nome do Caso de Teste") or linha_csv.get("Caso de Teste")
+        print(f"\nProcessando linha #{i+2}: {titulo_preview}")
+        
+        payload = construir_payload_jira(linha_csv, formato)
+        criar_issue_no_jira(payload)
+        processadas += 1
+    return processadas
+
 def main():
     nome_arquivo = input("➡️ Qual o nome do seu arquivo CSV a ser importado? (ex: api_tests.csv): ")
     caminho_arquivo = script_dir / nome_arquivo
     
     try:
-        with open(caminho_arquivo, mode='r', encoding='utf-8-sig') as f:
-            leitor = csv.DictReader(f)
-            linhas = list(leitor)
-            formato = detectar_formato(leitor.fieldnames)
+        arquivo = open(caminho_arquivo, mode='r', encoding='utf-8-sig')
     except FileNotFoundError:
         print(f"❌ ERRO: Arquivo '{nome_arquivo}' não encontrado. Verifique se ele está na mesma pasta que o script.")
         return
-    except Exception as e:
-        print(f"❌ ERRO ao ler o arquivo CSV: {e}")
-        return
 
-    if not formato or not linhas:
-        print("❌ ERRO: Não foi possível determinar o formato ou o arquivo está vazio.")
+    # As linhas nunca são carregadas todas de uma vez: o leitor é consumido sob demanda
+    with arquivo:
+        try:
+            leitor = csv.DictReader(arquivo)
+            formato = detectar_formato(leitor.fieldnames or [])
+        except (csv.Error, UnicodeDecodeError) as e:
+            print(f"❌ ERRO ao ler o arquivo CSV: {e}")
+            return
+
+        if not formato:
+            print("❌ ERRO: Não foi possível determinar o formato ou o arquivo está vazio.")
+            return
+
+        print("\n--- Processando Casos de Teste (leitura em streaming) ---")
+        try:
+            if "--individual" in sys.argv:
+                processadas = importar_individualmente(leitor, formato)
+            else:
+                processadas = sum(importar_em_lote(leitor, formato))
+        except (csv.Error, UnicodeDecodeError) as e:
+            print(f"❌ ERRO ao ler o arquivo CSV: {e}")
+            return
+
+    if not processadas:
+        print("❌ ERRO: O arquivo não contém Casos de Teste.")
         return
-
-    print(f"\n--- Processando {len(linhas)} Casos de Teste ---")
-    
-    for i, linha_csv in enumerate(linhas):
-        titulo_preview = linha_csv.get("Nome do Caso de Teste") or linha_csv.get("Caso de Teste")
-        print(f"\nProcessando linha #{i+2}: {titulo_preview}")
-        
-        payload = construir_payload_jira(linha_csv, formato)
-        criar_issue_no_jira(payload)
-        
     print("\n--- Importação Finalizada ---")
 
 if __name__ == "__main__":
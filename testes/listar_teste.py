@@ -1,19 +1,14 @@
 # listar_teste.py (Versão Nativa - Final)
 
-import os
+import sys
 import requests
-from dotenv import load_dotenv
 from pathlib import Path
 
 # --- Configuração de Caminho e Ambiente ---
 script_dir = Path(__file__).parent
-env_path = script_dir.parent / '.env'
-load_dotenv(dotenv_path=env_path)
-
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import jira_cliente
+from comum.jira_cliente import JIRA_PROJECT_KEY
 
 def listar_casos_de_teste():
     """
@@ -24,13 +19,10 @@ def listar_casos_de_teste():
     # A MUDANÇA PRINCIPAL: Buscando pelo nosso tipo de item customizado
     jql_query = f'project = "{JIRA_PROJECT_KEY}" AND issuetype = "Caso de Teste" ORDER BY created DESC'
     
-    api_url = f"{JIRA_URL}/rest/api/3/search"
-    headers = {"Accept": "application/json"}
-    auth = (JIRA_USER_EMAIL, JIRA_API_TOKEN)
     params = {'jql': jql_query, 'maxResults': 250}
 
     try:
-        response = requests.get(api_url, headers=headers, auth=auth, params=params)
+        response = jira_cliente.get("/rest/api/3/search", params=params)
         response.raise_for_status()
         
         issues = response.json().get('issues', [])
@@ -44,7 +36,7 @@ def listar_casos_de_teste():
             issue_key = issue['key']
             issue_summary = issue['fields']['summary']
             issue_status = issue['fields']['status']['name']
-            issue_url = f"{JIRA_URL}/browse/{issue_key}"
+            issue_url = jira_cliente.link_issue(issue_key)
             
             print(f"🔑 ID: {issue_key:<10} |  Status: {issue_status:<15} | Título: {issue_summary}")
             print(f"   🔗 Link: {issue_url}\n")
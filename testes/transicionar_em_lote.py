@@ -0,0 +1,56 @@
+# transicionar_em_lote.py - Move todas as issues de uma JQL para um status (ex: fim do ciclo de regressão)
+#
+# Uso:
+#   python testes/transicionar_em_lote.py --para "Aprovado" --simular
+#   python testes/transicionar_em_lote.py --para "Aprovado" --comentario "Regressão 3.2 concluída"
+#   python testes/transicionar_em_lote.py --jql 'project = AC AND issuetype = Bug AND status = "Resolvido"' --para "Fechado"
+
+import sys
+import argparse
+import requests
+from collections import Counter
+from pathlib import Path
+
+# --- Configuração de Caminho e Ambiente ---
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir.resolve().parent))
+from comum import transicoes
+from comum.jira_cliente import JIRA_PROJECT_KEY
+
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description="Transição de status em massa por JQL.")
+    parser.add_argument("--jql", help="Issues a mover (padrão: todos os Casos de Teste do projeto).")
+    parser.add_argument("--para", dest="status_destino", help="Status (ou nome da transição) de destino.")
+    parser.add_argument("--comentario", help="Comentário adicionado a cada issue movida.")
+    parser.add_argument("--simular", action="store_true", help="Apenas mostra o que seria feito (dry-run).")
+    parser.add_argument("--workers", type=int, default=transicoes.WORKERS_TRANSICAO, help="Transições simultâneas.")
+    return parser.parse_args()
+
+def main():
+    args = ler_argumentos()
+    jql = args.jql or f'project = "{JIRA_PROJECT_KEY}" AND issuetype = "Caso de Teste"'
+    status_destino = args.status_destino or input("➡️ Para qual status as issues devem ser movidas? ").strip()
+    if not status_destino:
+        print("❌ O status de destino não pode ser vazio."); return
+
+    modo = "SIMULAÇÃO de transição" if args.simular else "Transição"
+    print(f"🔎 {modo} para '{status_destino}' das issues da JQL: {jql}")
+
+    contagem = Counter()
+    try:
+        for chave, situacao, detalhe in transicoes.transicionar_por_jql(
+                jql, status_destino, args.comentario, args.simular, args.workers):
+            contagem[situacao] += 1
+            icone = {transicoes.MOVIDA: "✅", transicoes.SIMULADA: "📝", transicoes.JA_NO_STATUS: "➖"}.get(situacao, "❌")
+            print(f"   {icone} {chave}: {situacao} {detalhe}")
+    except requests.exceptions.RequestException as e:
+        print(f"\n❌ ERRO ao buscar as issues no Jira: {e}")
+        return
+
+    if not contagem:
+        print("🤷 Nenhuma issue encontrada para a JQL informada.")
+        return
+    print("\n📦 Resultado: " + " | ".join(f"{quantidade} {situacao}" for situacao, quantidade in contagem.most_common()))
+
+if __name__ == "__main__":
+    main()